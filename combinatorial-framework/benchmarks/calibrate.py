@@ -0,0 +1,62 @@
+"""
+Fit the cost models of the 'auto' strategy to benchmark results.
+
+Run from the project root on one or more result files of the suite:
+
+    python -m benchmarks.suite --sizes tsp=6,8,11,13,20,100,500,2000 knapsack=10,14,18,22,100,1000,10000 \\
+        --seeds 0 1 --repeat 1 --output results.json
+    python -m benchmarks.calibrate results.json --output optimization/cost_models.json
+
+Every strategy needs results at several sizes for its models to grow at
+the right rate; results of strategies that were not run keep the models
+of --merge, if given.
+"""
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from optimization.registry import calibrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('results', nargs='+', help='Result files written by benchmarks.suite --output')
+    parser.add_argument('--output', required=True, help='Cost model file to write')
+    parser.add_argument('--merge', help='Existing cost model file whose other strategies are kept')
+    args = parser.parse_args()
+
+    results = []
+    for path in args.results:
+        with open(path) as f:
+            results.extend(json.load(f)['results'])
+    models = {}
+    if args.merge:
+        with open(args.merge) as f:
+            models = json.load(f)['models']
+    for problem, fitted in calibrate(results).items():
+        models.setdefault(problem, {}).update(fitted)
+
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'results': len(results),
+        },
+        'models': models,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    for problem, fitted in sorted(models.items()):
+        for strategy, model in sorted(fitted.items()):
+            print(f"{problem:>8} {strategy:>15} time={model['time']} memory={model['memory']} "
+                  f"gap={model['gap']} samples={model['samples']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the vectorized distance-matrix builder against the nested loop that
+``views.solve_tsp`` used before.
+
+Run from the project root:
+
+    python -m benchmarks.distance_matrix
+    python -m benchmarks.distance_matrix --sizes 500 2000 5000 --loop-rows 50
+
+The loop is only timed on the first ``--loop-rows`` rows and extrapolated to
+the full matrix, since running it to completion at n=5000 takes minutes.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from optimization.algorithms.distance import distance_matrix
+
+
+def loop_distance_rows(coords: np.ndarray, rows: int) -> np.ndarray:
+    """The original per-cell loop, restricted to the first ``rows`` rows."""
+    n = len(coords)
+    distances = np.zeros((rows, n))
+    for i in range(rows):
+        for j in range(n):
+            distances[i, j] = np.sqrt(np.sum((coords[i] - coords[j]) ** 2))
+    return distances
+
+
+def run(sizes, loop_rows: int, repeat: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        coords = rng.uniform(0, 1000, size=(n, 2))
+
+        rows = min(n, loop_rows)
+        start = time.perf_counter()
+        expected = loop_distance_rows(coords, rows)
+        loop_time = (time.perf_counter() - start) * n / rows
+
+        timings = {}
+        for dtype in (np.float64, np.float32):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                matrix = distance_matrix(coords, dtype=dtype)
+                best = min(best, time.perf_counter() - start)
+            np.testing.assert_allclose(matrix[:rows], expected, rtol=1e-4, atol=1e-3)
+            timings[np.dtype(dtype).name] = best
+
+        results.append({
+            'n': n,
+            'loop': loop_time,
+            'loop_extrapolated': rows < n,
+            **timings,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 5000])
+    parser.add_argument('--loop-rows', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'loop (s)':>12} {'float64 (s)':>12} {'float32 (s)':>12} {'speedup':>9}")
+    for row in run(args.sizes, args.loop_rows, args.repeat):
+        marker = '*' if row['loop_extrapolated'] else ' '
+        print(f"{row['n']:>6} {row['loop']:>11.3f}{marker} {row['float64']:>12.4f} "
+              f"{row['float32']:>12.4f} {row['loop'] / row['float64']:>8.0f}x")
+    print('* extrapolated from the first --loop-rows rows')
+
+
+if __name__ == '__main__':
+    main()
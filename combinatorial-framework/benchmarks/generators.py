@@ -0,0 +1,89 @@
+"""
+Seeded instance generators for the benchmark suite.
+
+TSP families:
+
+- ``uniform``: points uniform in a 1000 x 1000 square
+- ``clustered``: Gaussian clusters around uniform centres (as in the DIMACS
+  TSP challenge), which rewards spatial partitioning and punishes greedy
+- ``tsplib``: integer coordinates with the TSPLIB EUC_2D metric (distances
+  rounded to the nearest integer)
+
+Knapsack families follow Pisinger's classic definitions with data range R:
+
+- ``uncorrelated``: weights and values independent in [1, R]
+- ``weakly_correlated``: values within R/10 of the weight
+- ``strongly_correlated``: value = weight + R/10
+- ``subset_sum``: value = weight
+
+Capacities are half the total weight. Every generator takes the size and a
+seed and returns a problem instance dictionary as the solvers expect it.
+"""
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+# Data range of the knapsack families
+KNAPSACK_RANGE = 1000
+
+
+def uniform_tsp(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    return {'coordinates': rng.uniform(0, 1000, size=(n, 2)), 'metric': 'euclidean'}
+
+
+def clustered_tsp(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform(0, 1000, size=(max(1, n // 100), 2))
+    coords = centres[rng.integers(len(centres), size=n)] + rng.normal(0, 1000 / np.sqrt(n), size=(n, 2))
+    return {'coordinates': coords, 'metric': 'euclidean'}
+
+
+def tsplib_tsp(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    return {'coordinates': rng.integers(0, 10 * n, size=(n, 2)).astype(np.float64), 'metric': 'euc_2d'}
+
+
+def _knapsack(weights: np.ndarray, values: np.ndarray) -> Dict[str, Any]:
+    return {'weights': weights.astype(np.float64), 'values': values.astype(np.float64),
+            'capacity': float(weights.sum() // 2)}
+
+
+def uncorrelated_knapsack(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    return _knapsack(rng.integers(1, KNAPSACK_RANGE + 1, size=n), rng.integers(1, KNAPSACK_RANGE + 1, size=n))
+
+
+def weakly_correlated_knapsack(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, KNAPSACK_RANGE + 1, size=n)
+    spread = KNAPSACK_RANGE // 10
+    values = np.maximum(weights + rng.integers(-spread, spread + 1, size=n), 1)
+    return _knapsack(weights, values)
+
+
+def strongly_correlated_knapsack(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, KNAPSACK_RANGE + 1, size=n)
+    return _knapsack(weights, weights + KNAPSACK_RANGE // 10)
+
+
+def subset_sum_knapsack(n: int, seed: int = 0) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, KNAPSACK_RANGE + 1, size=n)
+    return _knapsack(weights, weights)
+
+
+GENERATORS: Dict[str, Dict[str, Callable[[int, int], Dict[str, Any]]]] = {
+    'tsp': {
+        'uniform': uniform_tsp,
+        'clustered': clustered_tsp,
+        'tsplib': tsplib_tsp,
+    },
+    'knapsack': {
+        'uncorrelated': uncorrelated_knapsack,
+        'weakly_correlated': weakly_correlated_knapsack,
+        'strongly_correlated': strongly_correlated_knapsack,
+        'subset_sum': subset_sum_knapsack,
+    },
+}
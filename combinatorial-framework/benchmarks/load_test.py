@@ -0,0 +1,188 @@
+"""
+Load-test the solver endpoints and compare WSGI and ASGI throughput.
+
+Sends a mix of small TSP and knapsack requests (optionally with a share of
+heavy ones) from many concurrent clients and reports throughput, latency
+percentiles and status codes per target. Only the standard library is used
+on the client side.
+
+Run from the project root against servers you started yourself:
+
+    python manage.py runserver 127.0.0.1:8000 --noreload
+    uvicorn combi_opt.asgi:application --port 8001
+    python -m benchmarks.load_test --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001/async --concurrency 200
+
+or let the harness start both (the ASGI server needs uvicorn or daphne):
+
+    python -m benchmarks.load_test --start --requests 2000 --heavy 0.05
+
+The sync views live at /tsp/ and /knapsack/, their async variants at
+/async/tsp/ and /async/knapsack/, so an ASGI target's base URL ends in
+/async. Caching is disabled in every request so each one is solved.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+def make_payloads(count: int, heavy: float, seed: int = 0) -> List[Tuple[str, bytes]]:
+    """(endpoint, JSON body) pairs: small instances plus a ``heavy`` share of slow ones."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(count):
+        if rng.random() < heavy:
+            coords = rng.uniform(0, 100, size=(11, 2)).round(3).tolist()
+            payloads.append(('tsp', {'coordinates': coords, 'strategy': 'backtrack'}))
+        elif rng.random() < 0.5:
+            coords = rng.uniform(0, 100, size=(int(rng.integers(5, 15)), 2)).round(3).tolist()
+            payloads.append(('tsp', {'coordinates': coords, 'strategy': 'greedy'}))
+        else:
+            n = int(rng.integers(5, 20))
+            payloads.append(('knapsack', {
+                'weights': rng.integers(1, 30, size=n).tolist(),
+                'values': rng.integers(1, 50, size=n).tolist(),
+                'capacity': int(rng.integers(20, 100)),
+                'strategy': 'dynamic',
+            }))
+    return [(endpoint, json.dumps({**body, 'cache': False}).encode()) for endpoint, body in payloads]
+
+
+async def post(base: str, endpoint: str, body: bytes, timeout: float) -> int:
+    """POST with a fresh HTTP/1.1 connection; returns the status code (0 on failure)."""
+    url = urlsplit(base)
+    path = f"{url.path.rstrip('/')}/{endpoint}/"
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, url.port or 80), timeout)
+        writer.write((f'POST {path} HTTP/1.1\r\nHost: {url.hostname}\r\n'
+                      f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                      f'Connection: close\r\n\r\n').encode() + body)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+        return int(status_line.split()[1])
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        return 0
+
+
+async def run_target(base: str, payloads: List[Tuple[str, bytes]], concurrency: int,
+                     timeout: float) -> Dict[str, object]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    pending = iter(payloads)
+
+    async def client():
+        for endpoint, body in pending:
+            start = time.perf_counter()
+            status = await post(base, endpoint, body, timeout)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0.0, 0.0, 0.0)
+    return {
+        'requests': len(latencies),
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'statuses': dict(sorted(statuses.items())),
+    }
+
+
+def start_servers(wsgi_port: int, asgi_port: int) -> Tuple[Dict[str, str], List[subprocess.Popen]]:
+    """Start a WSGI and, when an ASGI server is installed, an ASGI server."""
+    targets = {}
+    processes = [subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{wsgi_port}', '--noreload'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)]
+    targets['wsgi'] = f'http://127.0.0.1:{wsgi_port}'
+
+    if importlib.util.find_spec('uvicorn'):
+        command = ['-m', 'uvicorn', 'combi_opt.asgi:application', '--port', str(asgi_port),
+                   '--log-level', 'warning']
+    elif importlib.util.find_spec('daphne'):
+        command = ['-m', 'daphne', '-p', str(asgi_port), 'combi_opt.asgi:application']
+    else:
+        print('No ASGI server installed (pip install uvicorn); benchmarking WSGI only')
+        command = None
+    if command:
+        processes.append(subprocess.Popen([sys.executable, *command],
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        targets['asgi'] = f'http://127.0.0.1:{asgi_port}/async'
+    return targets, processes
+
+
+async def wait_until_listening(base: str, deadline: float) -> bool:
+    url = urlsplit(base)
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--target', action='append', default=[], metavar='NAME=URL',
+                        help='Server to test; repeat to compare several')
+    parser.add_argument('--start', action='store_true', help='Start WSGI and ASGI servers locally')
+    parser.add_argument('--wsgi-port', type=int, default=8000)
+    parser.add_argument('--asgi-port', type=int, default=8001)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--heavy', type=float, default=0.0, help='Share of slow (backtracking) requests')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    targets = dict(target.split('=', 1) for target in args.target)
+    processes = []
+    if args.start:
+        started, processes = start_servers(args.wsgi_port, args.asgi_port)
+        targets.update(started)
+    if not targets:
+        parser.error('give at least one --target or use --start')
+
+    payloads = make_payloads(args.requests, args.heavy)
+    results = {}
+    try:
+        for name, base in targets.items():
+            if not asyncio.run(wait_until_listening(base, time.monotonic() + 30)):
+                print(f'{name}: {base} is not reachable')
+                continue
+            # Warm up the solver pool workers before measuring
+            asyncio.run(run_target(base, payloads[:20], 4, args.timeout))
+            results[name] = asyncio.run(run_target(base, payloads, args.concurrency, args.timeout))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print(f"{'target':>8} {'req/s':>9} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}  statuses")
+    for name, row in results.items():
+        print(f"{name:>8} {row['throughput']:>9.1f} {row['p50'] * 1000:>10.1f} {row['p95'] * 1000:>10.1f} "
+              f"{row['p99'] * 1000:>10.1f}  {row['statuses']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+"""
+Time every solver strategy on generated instance families and catch
+regressions against a saved baseline.
+
+Run from the project root:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --preset full --problems tsp --strategies greedy two_opt
+    python -m benchmarks.suite --baseline baseline.json --output current.json
+    python -m benchmarks.suite --files tsplib/berlin52.tsp pisinger/knapPI_1_100_1000.csv
+
+Each run records the best wall-clock time over ``--repeat`` solves, the
+peak memory of one more solve traced with tracemalloc (NumPy allocations
+included), the solution quality as the relative gap to the optimum, and
+the strategy's work measure (see optimization.registry), so that the
+results can calibrate the cost models with benchmarks/calibrate.py.
+Optima are computed with an exact solver for instances small enough (its
+time is not counted); otherwise the best solution found by any strategy
+in the run is the reference. With ``--files`` standard TSPLIB and
+Pisinger instances are run instead of generated ones, with their
+published optima as the reference when available. With ``--baseline``
+the run is compared entry by entry and the command exits with status 1
+on any regression.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.generators import GENERATORS
+from optimization.algorithms.distance import tour_length
+from optimization.algorithms.knapsack_solver import (
+    KnapsackGreedy, KnapsackDynamic, KnapsackBacktracking, KnapsackBranchAndBound, KnapsackFPTAS, KnapsackCore
+)
+from optimization.algorithms.tsp_solver import (
+    TSPGreedy, TSPTwoOpt, TSPDynamic, TSPBacktracking, TSPBranchAndBound, TSPAnytime, TSPDivideAndConquer,
+    num_cities
+)
+from optimization.loaders import load_pisinger, load_tsplib, load_tsplib_tour
+from optimization.registry import STRATEGIES as REGISTERED
+
+# Largest instance each strategy is run on (None: no limit)
+TSP_STRATEGIES: Dict[str, Tuple[Callable[[], Any], Optional[int]]] = {
+    'greedy': (TSPGreedy, None),
+    'two_opt': (TSPTwoOpt, 20_000),
+    'dynamic': (TSPDynamic, 13),
+    'backtrack': (TSPBacktracking, 9),
+    'branch_bound': (lambda: TSPBranchAndBound(max_nodes=20_000), 20),
+    'anytime': (TSPAnytime, 20_000),
+    'divide_conquer': (TSPDivideAndConquer, None),
+}
+
+KNAPSACK_STRATEGIES: Dict[str, Tuple[Callable[[], Any], Optional[int]]] = {
+    'greedy': (KnapsackGreedy, None),
+    'dynamic': (KnapsackDynamic, None),
+    'backtrack': (KnapsackBacktracking, 22),
+    'branch_bound': (lambda: KnapsackBranchAndBound(max_nodes=1_000_000), None),
+    'fptas': (KnapsackFPTAS, None),
+    'core': (KnapsackCore, None),
+}
+
+STRATEGIES = {'tsp': TSP_STRATEGIES, 'knapsack': KNAPSACK_STRATEGIES}
+
+# Instance sizes per problem
+PRESETS = {
+    'quick': {'tsp': [10, 200], 'knapsack': [20, 500]},
+    'full': {'tsp': [10, 1000, 10_000], 'knapsack': [20, 1000, 10_000]},
+}
+
+# Exact references are computed up to these sizes
+TSP_EXACT_LIMIT = 12
+KNAPSACK_EXACT_CELLS = 2 * 10**8
+
+
+def objective(problem: str, solution: Dict[str, Any]) -> float:
+    return float(solution['distance'] if problem == 'tsp' else solution['total_value'])
+
+
+def relative_gap(problem: str, value: float, reference: float) -> float:
+    """How much worse than the reference a value is, as a fraction of it (>= 0 unless better)."""
+    if reference == 0:
+        return 0.0
+    difference = value - reference if problem == 'tsp' else reference - value
+    return difference / abs(reference)
+
+
+def suitable(problem: str, strategy: str, n: int, problem_instance: Dict[str, Any]) -> bool:
+    _, max_size = STRATEGIES[problem][strategy]
+    if max_size is not None and n > max_size:
+        return False
+    if problem == 'tsp' and strategy == 'divide_conquer' and 'coordinates' not in problem_instance:
+        return False
+    if problem == 'knapsack' and strategy == 'dynamic':
+        return KnapsackDynamic().table_cells(problem_instance) <= KNAPSACK_EXACT_CELLS
+    return True
+
+
+def exact_optimum(problem: str, problem_instance: Dict[str, Any]) -> Optional[float]:
+    """The optimum when an exact solver can find it quickly, else None."""
+    if problem == 'tsp':
+        if num_cities(problem_instance) > TSP_EXACT_LIMIT:
+            return None
+        return objective(problem, TSPDynamic().solve(problem_instance))
+    # The generators produce integer weights, for which the DP is exact
+    solver = KnapsackDynamic()
+    if solver.table_cells(problem_instance) > KNAPSACK_EXACT_CELLS:
+        return None
+    return objective(problem, solver.solve(problem_instance))
+
+
+def measure(factory: Callable[[], Any], problem_instance: Dict[str, Any], repeat: int,
+            trace_memory: bool) -> Dict[str, Any]:
+    runtime = float('inf')
+    # At least one solve, which provides the solution to validate
+    for _ in range(max(repeat, 1)):
+        solver = factory()
+        start = time.perf_counter()
+        solution = solver.solve(problem_instance)
+        runtime = min(runtime, time.perf_counter() - start)
+
+    peak_memory = None
+    if trace_memory:
+        # Separate solve: tracing slows pure Python code down considerably
+        tracemalloc.start()
+        try:
+            factory().solve(problem_instance)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'solution': solution, 'valid': bool(solver.validate_solution(solution, problem_instance)),
+            'runtime': runtime, 'peak_memory': peak_memory}
+
+
+def _run_instance(problem: str, family: str, n: int, seed: Optional[int], problem_instance: Dict[str, Any],
+                  optimum: Optional[float], repeat: int, strategies: Optional[List[str]], trace_memory: bool,
+                  log: Callable[[str], None]) -> List[Dict[str, Any]]:
+    entries = []
+    for strategy, (factory, _) in STRATEGIES[problem].items():
+        if strategies and strategy not in strategies:
+            continue
+        if not suitable(problem, strategy, n, problem_instance):
+            continue
+        outcome = measure(factory, problem_instance, repeat, trace_memory)
+        entries.append({
+            'problem': problem, 'family': family, 'n': n, 'seed': seed, 'strategy': strategy,
+            'log_work': REGISTERED[problem][strategy].work(problem_instance),
+            'runtime': outcome['runtime'], 'peak_memory': outcome['peak_memory'],
+            'objective': objective(problem, outcome['solution']), 'valid': outcome['valid'],
+        })
+        log(f"{problem:>8} {family:>20} {n:>7} {seed if seed is not None else '-':>3} {strategy:>15} "
+            f"{outcome['runtime']:>10.4f}s")
+
+    # Without an optimum, the best solution of this run is the reference
+    valid = [entry['objective'] for entry in entries if entry['valid']]
+    if optimum is not None:
+        reference, kind = optimum, 'optimum'
+    elif valid:
+        reference, kind = (min(valid) if problem == 'tsp' else max(valid)), 'best'
+    else:
+        reference, kind = None, None
+    for entry in entries:
+        entry['reference'] = reference
+        entry['reference_kind'] = kind
+        entry['gap'] = relative_gap(problem, entry['objective'], reference) \
+            if reference is not None else None
+    return entries
+
+
+def run(problems: List[str], sizes: Dict[str, List[int]], seeds: List[int], repeat: int = 1,
+        families: Optional[List[str]] = None, strategies: Optional[List[str]] = None,
+        trace_memory: bool = True, log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    results = []
+    for problem in problems:
+        for family, generate in GENERATORS[problem].items():
+            if families and family not in families:
+                continue
+            for n in sizes[problem]:
+                for seed in seeds:
+                    problem_instance = generate(n, seed)
+                    results.extend(_run_instance(problem, family, n, seed, problem_instance,
+                                                 exact_optimum(problem, problem_instance), repeat,
+                                                 strategies, trace_memory, log))
+    return results
+
+
+def _instance_name(path: str) -> str:
+    name = os.path.basename(path)
+    for extension in ('.tsp', '.atsp', '.csv', '.txt'):
+        if name.lower().endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+
+def load_files(paths: List[str]) -> List[Tuple[str, str, Dict[str, Any], Optional[float]]]:
+    """
+    (problem, name, problem_instance, optimum) of each instance in the files.
+
+    TSPLIB files end in .tsp or .atsp; a published optimal tour next to
+    one (berlin52.opt.tour for berlin52.tsp) gives its optimum. Any other
+    file is read as Pisinger knapsack instances, whose optima the
+    benchmark files record.
+    """
+    instances = []
+    for path in paths:
+        name = _instance_name(path)
+        if path.lower().endswith(('.tsp', '.atsp')):
+            problem_instance = load_tsplib(path)
+            tour_path = os.path.join(os.path.dirname(path), name + '.opt.tour')
+            optimum = None
+            if os.path.exists(tour_path):
+                tour = load_tsplib_tour(tour_path)
+                if 'distances' in problem_instance:
+                    optimum = float(problem_instance['distances'][tour[:-1], tour[1:]].sum())
+                else:
+                    optimum = tour_length(problem_instance['coordinates'], tour, problem_instance['metric'])
+            instances.append(('tsp', name, problem_instance, optimum))
+        else:
+            for entry in load_pisinger(path):
+                instances.append(('knapsack', entry['name'] or name, entry['problem_instance'], entry['optimum']))
+    return instances
+
+
+def run_files(paths: List[str], repeat: int = 1, strategies: Optional[List[str]] = None,
+              trace_memory: bool = True, log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    """Like run(), on the instances of TSPLIB and Pisinger files (see load_files)."""
+    results = []
+    for problem, name, problem_instance, optimum in load_files(paths):
+        if optimum is None:
+            optimum = exact_optimum(problem, problem_instance)
+        n = num_cities(problem_instance) if problem == 'tsp' else len(problem_instance['weights'])
+        results.extend(_run_instance(problem, name, n, None, problem_instance, optimum, repeat,
+                                     strategies, trace_memory, log))
+    return results
+
+
+def _key(entry: Dict[str, Any]) -> Tuple:
+    return entry['problem'], entry['family'], entry['n'], entry['seed'], entry['strategy']
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]], time_tolerance: float = 0.25,
+            memory_tolerance: float = 0.25, gap_tolerance: float = 1e-6, min_time: float = 0.005) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``, one message each.
+
+    A runtime regression needs both the relative ``time_tolerance`` and an
+    absolute ``min_time`` seconds to be exceeded, so timer noise on fast
+    solves is ignored. Quality regresses when the gap to an optimum grows
+    by more than ``gap_tolerance``; gaps to a best-known reference are
+    compared only if both runs used the same reference value.
+    """
+    previous = {_key(entry): entry for entry in baseline}
+    regressions = []
+    for entry in current:
+        old = previous.get(_key(entry))
+        if old is None:
+            continue
+        name = '/'.join(str(part) for part in _key(entry))
+        if old['valid'] and not entry['valid']:
+            regressions.append(f'{name}: solution is no longer valid')
+        slower = entry['runtime'] - old['runtime']
+        if slower > min_time and entry['runtime'] > old['runtime'] * (1 + time_tolerance):
+            regressions.append(f"{name}: runtime {old['runtime']:.4f}s -> {entry['runtime']:.4f}s")
+        if entry['peak_memory'] is not None and old['peak_memory'] is not None \
+                and entry['peak_memory'] > old['peak_memory'] * (1 + memory_tolerance) + 1024 * 1024:
+            regressions.append(f"{name}: peak memory {old['peak_memory']} -> {entry['peak_memory']} bytes")
+        comparable = entry['reference_kind'] == 'optimum' or (
+            entry['reference_kind'] == old['reference_kind'] and entry['reference'] == old['reference'])
+        if comparable and entry['gap'] is not None and old['gap'] is not None \
+                and entry['gap'] > old['gap'] + gap_tolerance:
+            regressions.append(f"{name}: gap {old['gap']:.6f} -> {entry['gap']:.6f}")
+    return regressions
+
+
+def _sizes(values: Optional[List[str]], preset: str) -> Dict[str, List[int]]:
+    sizes = {problem: list(ns) for problem, ns in PRESETS[preset].items()}
+    for value in values or []:
+        problem, _, ns = value.partition('=')
+        if problem not in sizes:
+            raise SystemExit(f'Unknown problem in --sizes: {problem}')
+        sizes[problem] = [int(n) for n in ns.split(',') if n]
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--problems', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--families', nargs='+', help='Instance families to run (default: all)')
+    parser.add_argument('--strategies', nargs='+', help='Strategies to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', metavar='PROBLEM=N,N',
+                        help='Override the preset sizes, e.g. tsp=50,500 knapsack=100')
+    parser.add_argument('--files', nargs='+', metavar='FILE',
+                        help='Run TSPLIB (.tsp, .atsp) and Pisinger knapsack files instead of generated instances')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --output')
+    parser.add_argument('--time-tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    if args.files:
+        results = run_files(args.files, args.repeat, strategies=args.strategies, trace_memory=not args.no_memory)
+    else:
+        results = run(args.problems, _sizes(args.sizes, args.preset), args.seeds, args.repeat,
+                      families=args.families, strategies=args.strategies, trace_memory=not args.no_memory)
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'preset': args.preset,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        print(f'{len(regressions)} regression(s) against {args.baseline}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
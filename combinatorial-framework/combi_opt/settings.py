@@ -1,123 +1,226 @@
-"""
-Django settings for combi_opt project.
-
-Generated by 'django-admin startproject' using Django 5.2.6.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.2/topics/settings/
-
-For the full list of settings and their values, see
-https://docs.djangoproject.com/en/5.2/ref/settings/
-"""
-
-from pathlib import Path
-
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
-
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-ww074(1wf-$1amf!!*9-mt7+05xffk^w%2h5e!87%d3p6$qfnp'
-
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
-
-ALLOWED_HOSTS = []
-
-
-# Application definition
-
-INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
-    'optimization',
-]
-
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-ROOT_URLCONF = 'combi_opt.urls'
-
-TEMPLATES = [
-    {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-            ],
-        },
-    },
-]
-
-WSGI_APPLICATION = 'combi_opt.wsgi.application'
-
-
-# Database
-# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
-
-
-# Password validation
-# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
-
-AUTH_PASSWORD_VALIDATORS = [
-    {
-        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
-    },
-    {
-        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
-    },
-]
-
-
-# Internationalization
-# https://docs.djangoproject.com/en/5.2/topics/i18n/
-
-LANGUAGE_CODE = 'en-us'
-
-TIME_ZONE = 'UTC'
-
-USE_I18N = True
-
-USE_TZ = True
-
-
-# Static files (CSS, JavaScript, Images)
-# https://docs.djangoproject.com/en/5.2/howto/static-files/
-
-STATIC_URL = 'static/'
-
-# Default primary key field type
-# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
-
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+"""
+Django settings for combi_opt project.
+
+Generated by 'django-admin startproject' using Django 5.2.6.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-ww074(1wf-$1amf!!*9-mt7+05xffk^w%2h5e!87%d3p6$qfnp'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'optimization',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'combi_opt.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'combi_opt.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Solver limits
+
+# Memory allowed for the Held-Karp tables of the TSP 'dynamic' strategy
+# (400 MB fits 22 cities in float64)
+TSP_DP_MEMORY_BUDGET = 400 * 1024 * 1024
+
+# Largest table accepted by the knapsack 'dynamic' strategy: items x (capacity + 1),
+# items x (total value + 1) for value-indexed tables, or a 64th of the former
+# for subset-sum instances solved with bitsets
+KNAPSACK_DP_MAX_CELLS = 10**9
+
+# The TSP 'divide_conquer' strategy splits coordinate instances into cells
+# of at most CLUSTER_SIZE cities, solves them on WORKERS processes of its
+# own and returns its tour after about TIME_LIMIT seconds (keep it below the
+# solver pool timeout)
+TSP_DIVIDE_AND_CONQUER = {
+    'CLUSTER_SIZE': 200,
+    'WORKERS': 2,
+    'TIME_LIMIT': 20.0,
+}
+
+# Worker processes that run solves outside the request thread. Requests may
+# ask for a shorter 'timeout' (seconds) or 'memory_limit_mb'; both are capped
+# here. Once MAX_WORKERS solves are running and MAX_QUEUE are waiting, new
+# requests get 503 with Retry-After.
+SOLVER_POOL = {
+    'MAX_WORKERS': 2,
+    'MAX_QUEUE': 8,
+    'DEFAULT_TIMEOUT': 30,
+    'MAX_TIMEOUT': 300,
+    'MEMORY_LIMIT_MB': 2048,
+    'START_METHOD': 'spawn',
+}
+
+# Cache of solver responses keyed by a hash of the instance, strategy and
+# solver version. MAX_BYTES bounds the in-process tier; set PERSISTENT_ALIAS
+# to the name of an entry in CACHES (e.g. a FileBasedCache or DatabaseCache)
+# to also keep entries across restarts and share them between processes.
+SOLUTION_CACHE = {
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'PERSISTENT_ALIAS': None,
+    'PERSISTENT_TIMEOUT': None,
+}
+
+# Background jobs (POST /jobs/): finished jobs are kept for RETENTION seconds,
+# at most MAX_FINISHED of them
+SOLVER_JOBS = {
+    'MAX_FINISHED': 1000,
+    'RETENTION': 3600,
+}
+
+# Largest request body accepted; binary payloads (application/x-npy, msgpack,
+# Arrow) carry whole distance matrices, e.g. 72 MB for 3000 x 3000 float64,
+# and TSPLIB files of the largest standard instances take tens of MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024 * 1024
+
+# Batch endpoints (batch/tsp/, batch/knapsack/): instances accepted per
+# request and the most instances sent to a worker at once
+SOLVER_BATCH = {
+    'MAX_INSTANCES': 10000,
+    'CHUNK_SIZE': 500,
+}
+
+# Uploaded instances (POST /instances/) are stored as .npy files under ROOT;
+# the least recently used are deleted to keep them within MAX_BYTES
+INSTANCE_STORE = {
+    'ROOT': BASE_DIR / 'instance_store',
+    'MAX_BYTES': 10 * 1024 ** 3,
+}
+
+# Solve metrics served in the Prometheus text format at GET /metrics.
+# TIME_BUCKETS (seconds) and MEMORY_BUCKETS (bytes) are the histogram bucket
+# upper bounds of phase durations and peak memory.
+SOLVER_METRICS = {
+    'ENABLED': True,
+    'TIME_BUCKETS': (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                     1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+    'MEMORY_BUCKETS': tuple(2 ** exponent for exponent in range(20, 35, 2)),
+}
+
+# On-demand profiling of single solves: tsp/ and knapsack/ requests sending
+# the X-Solver-Profile header or the 'capture' query parameter ('cprofile' or
+# 'sampling') are profiled and the capture saved under ROOT, keeping the
+# newest MAX_FILES. Accepted only when ENABLED, at most RATE per PERIOD
+# seconds; SAMPLE_INTERVAL is the sampling profiler's period in seconds.
+SOLVER_PROFILING = {
+    'ENABLED': DEBUG,
+    'ROOT': BASE_DIR / 'profiles',
+    'RATE': 6,
+    'PERIOD': 60,
+    'MAX_FILES': 100,
+    'SAMPLE_INTERVAL': 0.005,
+}
+
+# Strategy selection for requests with the strategy 'auto': cost models of
+# each strategy, fitted to benchmark results by benchmarks/calibrate.py. A
+# strategy fits the time budget when its predicted runtime times
+# SAFETY_FACTOR does.
+SOLVER_REGISTRY = {
+    'COST_MODELS': BASE_DIR / 'optimization' / 'cost_models.json',
+    'SAFETY_FACTOR': 2.0,
+}
@@ -0,0 +1,32 @@
+import os
+import django
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'combi_opt.settings')
+django.setup()
+
+@pytest.fixture(scope='session')
+def django_db_setup():
+    """Create the test databases once per session, for the django.test.TestCase classes."""
+    from django.test.utils import setup_databases, teardown_databases
+    old_config = setup_databases(verbosity=0, interactive=False)
+    yield
+    teardown_databases(old_config, verbosity=0)
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    """Have the views solve in the test process, on a pool without workers."""
+    from optimization import views
+    from optimization.executor import SolverPool
+    pool = SolverPool(max_workers=0)
+    monkeypatch.setattr(views, 'get_pool', lambda: pool)
+    return pool
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    """Give the views an empty solution cache, so no test is answered from another's results."""
+    from optimization import views
+    from optimization.cache import SolutionCache
+    cache = SolutionCache()
+    monkeypatch.setattr(views, 'get_cache', lambda: cache)
+    return cache
@@ -1,3 +1,10 @@
-from django.contrib import admin
-
-# Register your models here.
+from django.contrib import admin
+
+from .models import ProblemInstance
+
+
+@admin.register(ProblemInstance)
+class ProblemInstanceAdmin(admin.ModelAdmin):
+    list_display = ('id', 'problem', 'size_bytes', 'created_at', 'last_used_at')
+    list_filter = ('problem',)
+    readonly_fields = ('id', 'digest', 'arrays', 'options', 'size_bytes', 'created_at', 'last_used_at')
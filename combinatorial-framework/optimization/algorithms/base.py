@@ -1,80 +1,128 @@
-from abc import ABC, abstractmethod
-from typing import Any, List, Dict, Optional
-
-class OptimizationStrategy(ABC):
-    """Base class for all optimization strategies."""
-    
-    @abstractmethod
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Solve the optimization problem using the specific strategy.
-        
-        Args:
-            problem_instance: Dictionary containing problem-specific data
-            
-        Returns:
-            Dictionary containing solution and metadata
-        """
-        pass
-    
-    @abstractmethod
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        """
-        Validate if the solution is feasible.
-        
-        Args:
-            solution: The solution to validate
-            problem_instance: The original problem instance
-            
-        Returns:
-            True if solution is valid, False otherwise
-        """
-        pass
-
-class GreedyStrategy(OptimizationStrategy):
-    """Implementation of greedy optimization strategy."""
-    
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Specific problem implementation required")
-    
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        raise NotImplementedError("Specific problem implementation required")
-
-class DynamicProgrammingStrategy(OptimizationStrategy):
-    """Implementation of dynamic programming optimization strategy."""
-    
-    def __init__(self):
-        self.memo = {}
-    
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Specific problem implementation required")
-    
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        raise NotImplementedError("Specific problem implementation required")
-
-class BacktrackingStrategy(OptimizationStrategy):
-    """Implementation of backtracking optimization strategy."""
-    
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Specific problem implementation required")
-    
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        raise NotImplementedError("Specific problem implementation required")
-
-class BranchAndBoundStrategy(OptimizationStrategy):
-    """Implementation of branch and bound optimization strategy."""
-    
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Specific problem implementation required")
-    
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        raise NotImplementedError("Specific problem implementation required")
-
-class DivideAndConquerStrategy(OptimizationStrategy):
-    """Implementation of divide and conquer optimization strategy."""
-    
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        raise NotImplementedError("Specific problem implementation required")
-    
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Any, Callable, List, Dict, Optional
+from .instrumentation import Instrumentation
+
+class OptimizationStrategy(ABC):
+    """Base class for all optimization strategies."""
+    
+    # Bump in a subclass when a change alters the solutions it returns, so
+    # cached results from the previous version are not served
+    version = 1
+    
+    # Receives progress dictionaries while solve() runs, see report_progress
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    
+    def set_progress_callback(self, callback: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+        """Register a callable that receives progress updates during solve()."""
+        self.progress_callback = callback
+    
+    def report_progress(self, **progress: Any) -> None:
+        """
+        Publish progress to the registered callback, if any.
+        
+        Strategies report an improved 'incumbent' (a partial solution
+        dictionary), the current 'bound' on the optimum and search counters
+        such as 'nodes_expanded'. Values must be plain Python types.
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(progress)
+    
+    # Receives phase timings and counters while solve() runs, see count()
+    instrumentation: Optional[Instrumentation] = None
+    
+    def set_instrumentation(self, instrumentation: Optional[Instrumentation]) -> None:
+        """Register an Instrumentation that records this strategy's phases and counters."""
+        self.instrumentation = instrumentation
+    
+    def count(self, **counters: int) -> None:
+        """
+        Add to the counters of the current solve, if instrumented.
+        
+        Strategies report totals once per solve, such as 'nodes_expanded',
+        'states_stored', 'memo_hits' and 'pruned', rather than counting
+        inside their hot loops.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count(**counters)
+    
+    def phase(self, name: str):
+        """Context manager timing a phase of solve(), if instrumented."""
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.phase(name)
+    
+    @abstractmethod
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Solve the optimization problem using the specific strategy.
+        
+        Args:
+            problem_instance: Dictionary containing problem-specific data
+            
+        Returns:
+            Dictionary containing solution and metadata
+        """
+        pass
+    
+    @abstractmethod
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        """
+        Validate if the solution is feasible.
+        
+        Args:
+            solution: The solution to validate
+            problem_instance: The original problem instance
+            
+        Returns:
+            True if solution is valid, False otherwise
+        """
+        pass
+
+class GreedyStrategy(OptimizationStrategy):
+    """Implementation of greedy optimization strategy."""
+    
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError("Specific problem implementation required")
+    
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        raise NotImplementedError("Specific problem implementation required")
+
+class DynamicProgrammingStrategy(OptimizationStrategy):
+    """Implementation of dynamic programming optimization strategy."""
+    
+    def __init__(self):
+        self.memo = {}
+    
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError("Specific problem implementation required")
+    
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        raise NotImplementedError("Specific problem implementation required")
+
+class BacktrackingStrategy(OptimizationStrategy):
+    """Implementation of backtracking optimization strategy."""
+    
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError("Specific problem implementation required")
+    
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        raise NotImplementedError("Specific problem implementation required")
+
+class BranchAndBoundStrategy(OptimizationStrategy):
+    """Implementation of branch and bound optimization strategy."""
+    
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError("Specific problem implementation required")
+    
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        raise NotImplementedError("Specific problem implementation required")
+
+class DivideAndConquerStrategy(OptimizationStrategy):
+    """Implementation of divide and conquer optimization strategy."""
+    
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError("Specific problem implementation required")
+    
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
         raise NotImplementedError("Specific problem implementation required")
\ No newline at end of file
@@ -0,0 +1,193 @@
+from math import asin, ceil, cos, floor, hypot, sin, sqrt
+from typing import Optional
+import numpy as np
+
+# Supported metrics for coordinate inputs. ``euc_2d`` and ``ceil_2d`` follow the
+# TSPLIB conventions (Euclidean distance rounded to nearest / rounded up).
+METRICS = ('euclidean', 'sqeuclidean', 'manhattan', 'haversine', 'euc_2d', 'ceil_2d')
+
+EARTH_RADIUS_KM = 6371.0
+
+# Upper bound on the size of the temporary arrays created for a single block.
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _check_coordinates(coords: np.ndarray, metric: str) -> np.ndarray:
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.ndim != 2:
+        raise ValueError('Coordinates must be a 2-D array of points')
+    if metric not in METRICS:
+        raise ValueError(f'Unknown metric: {metric}')
+    if metric in ('haversine', 'euc_2d', 'ceil_2d') and coords.shape[1] != 2:
+        raise ValueError(f'Metric {metric} requires 2-D points')
+    return coords
+
+
+def distance_block(a: np.ndarray, b: np.ndarray, metric: str = 'euclidean',
+                   dtype=np.float64) -> np.ndarray:
+    """
+    Compute the pairwise distances between the rows of ``a`` and ``b``.
+
+    The computation is broadcast one dimension at a time so the only temporary
+    arrays are of shape ``(len(a), len(b))``.
+
+    Args:
+        a: Array of shape (m, d)
+        b: Array of shape (n, d)
+        metric: One of METRICS
+        dtype: Arithmetic dtype of the result
+
+    Returns:
+        Array of shape (m, n)
+    """
+    if metric == 'haversine':
+        lat_a, lon_a = np.radians(a[:, 0])[:, None], np.radians(a[:, 1])[:, None]
+        lat_b, lon_b = np.radians(b[:, 0])[None, :], np.radians(b[:, 1])[None, :]
+        h = (np.sin((lat_b - lat_a) / 2) ** 2
+             + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2)
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))).astype(dtype)
+
+    a = a.astype(dtype, copy=False)
+    b = b.astype(dtype, copy=False)
+    out = np.zeros((len(a), len(b)), dtype=dtype)
+    for k in range(a.shape[1]):
+        diff = a[:, k, None] - b[None, :, k]
+        if metric == 'manhattan':
+            out += np.abs(diff)
+        else:
+            out += diff * diff
+
+    if metric in ('euclidean', 'euc_2d', 'ceil_2d'):
+        np.sqrt(out, out=out)
+    if metric == 'euc_2d':
+        np.floor(out + 0.5, out=out)
+    elif metric == 'ceil_2d':
+        np.ceil(out, out=out)
+    return out
+
+
+def distance_matrix(coords, metric: str = 'euclidean', dtype=np.float64,
+                    block_size: Optional[int] = None) -> np.ndarray:
+    """
+    Build the full distance matrix for a set of points.
+
+    Rows are computed in blocks so that peak temporary memory stays around
+    DEFAULT_BLOCK_BYTES regardless of the number of points.
+
+    Args:
+        coords: Array-like of shape (n, d)
+        metric: One of METRICS
+        dtype: Output dtype (np.float64 or np.float32)
+        block_size: Number of rows computed per block (derived from n if None)
+
+    Returns:
+        Array of shape (n, n) with the requested dtype
+    """
+    coords = _check_coordinates(coords, metric)
+    n = len(coords)
+    if block_size is None:
+        block_size = max(1, DEFAULT_BLOCK_BYTES // (8 * 4 * max(n, 1)))
+
+    result = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        result[start:stop] = distance_block(coords[start:stop], coords, metric, dtype)
+    return result
+
+
+def nearest_neighbors(coords, k: int, metric: str = 'euclidean',
+                      block_size: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the k nearest other points of every point, closest first.
+
+    Uses the same row blocks as distance_matrix, so the full matrix is never
+    held in memory.
+
+    Returns:
+        int array of shape (n, min(k, n - 1))
+    """
+    coords = _check_coordinates(coords, metric)
+    n = len(coords)
+    k = min(k, n - 1)
+    if block_size is None:
+        block_size = max(1, DEFAULT_BLOCK_BYTES // (8 * 4 * max(n, 1)))
+
+    result = np.empty((n, max(k, 0)), dtype=np.int64)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = distance_block(coords[start:stop], coords, metric)
+        block[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        result[start:stop] = nearest_in_rows(block, k)
+    return result
+
+
+def nearest_in_rows(block: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k smallest entries of each row, sorted by value."""
+    if k <= 0:
+        return np.empty((len(block), 0), dtype=np.int64)
+    candidates = np.argpartition(block, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(block, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def paired_distances(a: np.ndarray, b: np.ndarray, metric: str = 'euclidean') -> np.ndarray:
+    """Distances between corresponding rows of ``a`` and ``b`` (e.g. consecutive tour stops)."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if metric == 'haversine':
+        lat_a, lat_b = np.radians(a[:, 0]), np.radians(b[:, 0])
+        h = (np.sin((lat_b - lat_a) / 2) ** 2
+             + np.cos(lat_a) * np.cos(lat_b) * np.sin(np.radians(b[:, 1] - a[:, 1]) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+    diff = a - b
+    if metric == 'manhattan':
+        return np.abs(diff).sum(axis=1)
+    squared = (diff * diff).sum(axis=1)
+    if metric == 'sqeuclidean':
+        return squared
+    result = np.sqrt(squared)
+    if metric == 'euc_2d':
+        return np.floor(result + 0.5)
+    if metric == 'ceil_2d':
+        return np.ceil(result)
+    return result
+
+
+def tour_length(coords, path, metric: str = 'euclidean') -> float:
+    """Length of a path given as point indices, computed without a distance matrix."""
+    coords = np.asarray(coords, dtype=np.float64)
+    path = np.asarray(path, dtype=np.int64)
+    if len(path) < 2:
+        return 0.0
+    return float(paired_distances(coords[path[:-1]], coords[path[1:]], metric).sum())
+
+
+def point_distance_function(coords, metric: str = 'euclidean'):
+    """
+    Scalar ``dist(i, j)`` over plain Python floats for hot loops that only
+    need a few distances at a time.
+    """
+    coords = _check_coordinates(coords, metric)
+    if metric in ('euclidean', 'euc_2d', 'ceil_2d') and coords.shape[1] == 2:
+        xs, ys = coords[:, 0].tolist(), coords[:, 1].tolist()
+        if metric == 'euclidean':
+            return lambda i, j: hypot(xs[i] - xs[j], ys[i] - ys[j])
+        if metric == 'euc_2d':
+            return lambda i, j: float(floor(hypot(xs[i] - xs[j], ys[i] - ys[j]) + 0.5))
+        return lambda i, j: float(ceil(hypot(xs[i] - xs[j], ys[i] - ys[j])))
+
+    if metric == 'haversine':
+        lats, lons = np.radians(coords[:, 0]).tolist(), np.radians(coords[:, 1]).tolist()
+
+        def haversine(i, j):
+            h = (sin((lats[j] - lats[i]) / 2) ** 2
+                 + cos(lats[i]) * cos(lats[j]) * sin((lons[j] - lons[i]) / 2) ** 2)
+            return 2 * EARTH_RADIUS_KM * asin(sqrt(min(max(h, 0.0), 1.0)))
+        return haversine
+
+    rows = coords.tolist()
+    if metric == 'manhattan':
+        return lambda i, j: sum(abs(p - q) for p, q in zip(rows[i], rows[j]))
+    if metric == 'sqeuclidean':
+        return lambda i, j: sum((p - q) ** 2 for p, q in zip(rows[i], rows[j]))
+    return lambda i, j: sqrt(sum((p - q) ** 2 for p, q in zip(rows[i], rows[j])))
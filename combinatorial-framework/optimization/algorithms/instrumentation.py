@@ -0,0 +1,113 @@
+"""
+Phase timings, search counters and memory peaks of a solve.
+
+An Instrumentation object is attached to a strategy with
+OptimizationStrategy.set_instrumentation; the strategy then reports
+counters through count() and times its internal phases through phase().
+Both are no-ops on strategies without one, and strategies call count()
+once per solve with totals kept in local variables, so hot loops pay
+nothing for it.
+"""
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, if the platform reports it."""
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def reset_peak_rss() -> None:
+    """Restart the peak RSS measurement where the kernel allows it (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+class Instrumentation:
+    """
+    Collects what happened during one solve.
+
+    Phases nest: a phase started inside another is recorded as
+    'outer/inner', so 'solve/matrix' is the part of 'solve' that built the
+    distance matrix. Repeated phases add up.
+
+    Args:
+        trace_memory: Also record the peak of Python allocations (NumPy
+            arrays included) with tracemalloc, which slows pure Python code
+            down noticeably
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.memory: Dict[str, int] = {}
+        self._stack: List[str] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        path = '/'.join(self._stack + [name])
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[path] = self.phases.get(path, 0.0) + time.perf_counter() - start
+            self._stack.pop()
+
+    def count(self, **counters: int) -> None:
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    @contextmanager
+    def measure_memory(self):
+        """Record the peak RSS (and traced allocations, if enabled) of the enclosed code."""
+        reset_peak_rss()
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            if self.trace_memory:
+                self.memory['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            rss = peak_rss()
+            if rss is not None:
+                self.memory['peak_rss_bytes'] = rss
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Add the phases, counters and memory of another instrumentation's to_dict()."""
+        for name, seconds in other.get('phases', {}).items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.count(**other.get('counters', {}))
+        for name, value in other.get('memory', {}).items():
+            self.memory[name] = max(self.memory.get(name, 0), value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'phases': dict(self.phases), 'counters': dict(self.counters), 'memory': dict(self.memory)}
@@ -1,170 +1,878 @@
-from typing import Dict, Any, List
-import numpy as np
-from optimization.algorithms.base import (
-    GreedyStrategy,
-    DynamicProgrammingStrategy,
-    BacktrackingStrategy
-)
-
-class KnapsackGreedy(GreedyStrategy):
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        weights = problem_instance['weights']
-        values = problem_instance['values']
-        capacity = problem_instance['capacity']
-        
-        # Calculate value-to-weight ratios
-        ratios = [(v/w, i) for i, (v, w) in enumerate(zip(values, weights))]
-        ratios.sort(reverse=True)  # Sort by ratio in descending order
-        
-        selected_items = []
-        total_weight = 0
-        total_value = 0
-        
-        for ratio, idx in ratios:
-            if total_weight + weights[idx] <= capacity:
-                selected_items.append(idx)
-                total_weight += weights[idx]
-                total_value += values[idx]
-        
-        return {
-            'selected_items': selected_items,
-            'total_weight': float(total_weight),
-            'total_value': float(total_value),
-            'strategy': 'greedy'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        weights = problem_instance['weights']
-        capacity = problem_instance['capacity']
-        selected_items = solution['selected_items']
-        
-        total_weight = sum(weights[i] for i in selected_items)
-        return total_weight <= capacity
-
-class KnapsackDynamic(DynamicProgrammingStrategy):
-    def __init__(self):
-        super().__init__()
-        self.memo = {}
-
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        weights = problem_instance['weights']
-        values = problem_instance['values']
-        capacity = problem_instance['capacity']
-        n = len(weights)
-        
-        # Create DP table
-        dp = np.zeros((n + 1, int(capacity) + 1))
-        
-        # Build table bottom-up
-        for i in range(1, n + 1):
-            for w in range(int(capacity) + 1):
-                if weights[i-1] <= w:
-                    dp[i][w] = max(
-                        values[i-1] + dp[i-1][int(w-weights[i-1])],
-                        dp[i-1][w]
-                    )
-                else:
-                    dp[i][w] = dp[i-1][w]
-        
-        # Backtrack to find selected items
-        selected_items = []
-        w = int(capacity)
-        for i in range(n, 0, -1):
-            if dp[i][w] != dp[i-1][w]:
-                selected_items.append(i-1)
-                w = int(w - weights[i-1])
-        
-        selected_items.reverse()
-        total_weight = sum(weights[i] for i in selected_items)
-        total_value = sum(values[i] for i in selected_items)
-        
-        return {
-            'selected_items': selected_items,
-            'total_weight': float(total_weight),
-            'total_value': float(total_value),
-            'strategy': 'dynamic'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        return KnapsackGreedy().validate_solution(solution, problem_instance)
-
-class KnapsackBacktracking(BacktrackingStrategy):
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        weights = problem_instance['weights']
-        values = problem_instance['values']
-        capacity = problem_instance['capacity']
-        n = len(weights)
-        
-        best_value = 0
-        best_solution = []
-        
-        def bound(items: List[int], curr_value: float, curr_weight: float, idx: int) -> float:
-            """Calculate upper bound for remaining capacity using fractional knapsack"""
-            if curr_weight >= capacity:
-                return curr_value
-            
-            bound_value = curr_value
-            bound_weight = curr_weight
-            
-            # Sort remaining items by value/weight ratio
-            remaining = [(values[i]/weights[i], values[i], weights[i]) 
-                        for i in range(idx, n) if i not in items]
-            remaining.sort(reverse=True)
-            
-            for ratio, v, w in remaining:
-                if bound_weight + w <= capacity:
-                    bound_value += v
-                    bound_weight += w
-                else:
-                    # Take fraction of last item
-                    remaining_capacity = capacity - bound_weight
-                    bound_value += v * (remaining_capacity / w)
-                    break
-            
-            return bound_value
-        
-        def backtrack(items: List[int], curr_value: float, curr_weight: float, idx: int) -> None:
-            nonlocal best_value, best_solution
-            
-            if curr_weight > capacity:
-                return
-                
-            if curr_value > best_value:
-                best_value = curr_value
-                best_solution = items.copy()
-                
-            if idx == n:
-                return
-                
-            # Calculate bound
-            if bound(items, curr_value, curr_weight, idx) <= best_value:
-                return  # Prune this branch
-            
-            # Include item at idx
-            items.append(idx)
-            backtrack(
-                items, 
-                curr_value + values[idx],
-                curr_weight + weights[idx],
-                idx + 1
-            )
-            items.pop()
-            
-            # Exclude item at idx
-            backtrack(items, curr_value, curr_weight, idx + 1)
-        
-        # Start backtracking
-        backtrack([], 0, 0, 0)
-        
-        total_weight = sum(weights[i] for i in best_solution)
-        total_value = sum(values[i] for i in best_solution)
-        
-        return {
-            'selected_items': best_solution,
-            'total_weight': float(total_weight),
-            'total_value': float(total_value),
-            'strategy': 'backtrack'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        return KnapsackGreedy().validate_solution(solution, problem_instance)
\ No newline at end of file
+from bisect import bisect_right
+from typing import Dict, Any, List
+import numpy as np
+from optimization.algorithms.base import (
+    GreedyStrategy,
+    DynamicProgrammingStrategy,
+    BacktrackingStrategy,
+    BranchAndBoundStrategy
+)
+
+
+def _ratio_order(weights: np.ndarray, values: np.ndarray, capacity: float) -> np.ndarray:
+    """Items that may fit and add value, by value/weight ratio, best first."""
+    useful = np.flatnonzero((weights > 0) & (values > 0) & (weights <= capacity))
+    return useful[np.argsort(-(values[useful] / weights[useful]), kind='stable')]
+
+
+def _dantzig_bound(weights, values, capacity: float) -> float:
+    """Upper bound of the LP relaxation: items by ratio, the break item fractionally."""
+    weights = np.asarray(weights, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    free_value = float(values[(weights <= 0) & (values > 0)].sum())
+    order = _ratio_order(weights, values, capacity)
+    prefix_w = np.concatenate(([0.0], np.cumsum(weights[order])))
+    prefix_v = np.concatenate(([0.0], np.cumsum(values[order])))
+    b = int(np.searchsorted(prefix_w, capacity, side='right')) - 1
+    bound = prefix_v[b]
+    if b < len(order):
+        bound += (capacity - prefix_w[b]) * values[order[b]] / weights[order[b]]
+    return free_value + float(bound)
+
+
+def _relative_gap(value: float, upper: float) -> float:
+    """(upper - value) / upper, the bound_gap reported by approximate strategies."""
+    return max(0.0, (upper - value) / upper) if upper > 0 else 0.0
+
+
+class KnapsackGreedy(GreedyStrategy):
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        weights = problem_instance['weights']
+        values = problem_instance['values']
+        capacity = problem_instance['capacity']
+        
+        # Calculate value-to-weight ratios
+        ratios = [(v/w, i) for i, (v, w) in enumerate(zip(values, weights))]
+        ratios.sort(reverse=True)  # Sort by ratio in descending order
+        
+        selected_items = []
+        total_weight = 0
+        total_value = 0
+        
+        for ratio, idx in ratios:
+            if total_weight + weights[idx] <= capacity:
+                selected_items.append(idx)
+                total_weight += weights[idx]
+                total_value += values[idx]
+        
+        return {
+            'selected_items': selected_items,
+            'total_weight': float(total_weight),
+            'total_value': float(total_value),
+            'strategy': 'greedy'
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        weights = problem_instance['weights']
+        capacity = problem_instance['capacity']
+        selected_items = solution['selected_items']
+        
+        total_weight = sum(weights[i] for i in selected_items)
+        return total_weight <= capacity
+
+class KnapsackDynamic(DynamicProgrammingStrategy):
+    """
+    0/1 knapsack by dynamic programming.
+
+    The 'rolling' method indexes the table by capacity: it keeps a single row
+    of best values indexed by capacity and updates it per item with
+    vectorized slices. Selected items are recovered from a bit-packed keep
+    matrix (one bit per item and capacity) when it fits in ``memory_budget``;
+    larger instances split the items in half, locate the optimal capacity
+    split from two forward rows and recurse, which needs only O(capacity)
+    memory beyond the base cases. Weights are rounded up to integers so
+    returned selections stay feasible.
+
+    The 'value' method indexes the table by total value instead and keeps
+    the minimum weight reaching each value. It needs integer values but
+    handles any weights exactly, so it suits huge capacities with small
+    values.
+
+    The 'bitset' method is for subset-sum instances (values equal to integer
+    weights): the set of reachable weights is a Python integer used as a
+    bitset, updated with one shift-or per item.
+
+    'auto' (the default) picks 'bitset' for subset-sum instances and
+    otherwise whichever of the weight- and value-indexed tables is smaller.
+    The 'table' method is the original full (n + 1) x (capacity + 1) table.
+
+    Rounding weights up keeps selections feasible but may miss the optimum;
+    'bound_gap' reports how far from the LP bound the result can be in that
+    case and is 0 whenever no weight was rounded.
+    """
+
+    version = 2
+
+    METHODS = ('auto', 'rolling', 'value', 'bitset', 'table')
+
+    # Memory allowed for the packed keep bits of a single subproblem
+    DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+    def __init__(self, method: str = 'auto', memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        super().__init__()
+        if method not in self.METHODS:
+            raise ValueError(f'Unknown dynamic programming method: {method}')
+        self.memo = {}
+        self.method = method
+        self.memory_budget = memory_budget
+
+    @staticmethod
+    def _prepare(problem_instance: Dict[str, Any]):
+        """Integer capacity, rounded-up weights, float weights and values, useful items."""
+        capacity = int(np.floor(problem_instance['capacity']))
+        float_weights = np.asarray(problem_instance['weights'], dtype=np.float64)
+        float_values = np.asarray(problem_instance['values'], dtype=np.float64)
+        int_weights = np.ceil(float_weights).astype(np.int64)
+        # Items that can never fit or add nothing are dropped up front
+        candidates = np.flatnonzero((float_weights <= problem_instance['capacity']) & (float_values > 0))
+        return capacity, int_weights, float_weights, float_values, candidates
+
+    def choose_method(self, problem_instance: Dict[str, Any]) -> str:
+        """The method solve() uses for this instance."""
+        if self.method != 'auto':
+            return self.method
+        capacity, int_weights, float_weights, float_values, candidates = self._prepare(problem_instance)
+        weights, values = float_weights[candidates], float_values[candidates]
+        if np.array_equal(weights, np.floor(weights)) and np.array_equal(weights, values):
+            return 'bitset'
+        if np.array_equal(values, np.floor(values)):
+            value_cells = int(values.sum()) + 1
+            fits = len(candidates) * ((value_cells + 7) // 8) <= self.memory_budget
+            if fits and value_cells < capacity + 1:
+                return 'value'
+        return 'rolling'
+
+    def table_cells(self, problem_instance: Dict[str, Any]) -> int:
+        """Cells the chosen method updates, a measure of its running time."""
+        method = self.choose_method(problem_instance)
+        num_items = len(problem_instance['weights'])
+        capacity = max(int(np.floor(problem_instance['capacity'])), 0)
+        if method == 'value':
+            values = np.asarray(problem_instance['values'], dtype=np.float64)
+            return num_items * (int(values[values > 0].sum()) + 1)
+        if method == 'bitset':
+            # One machine word covers 64 capacities
+            return num_items * (capacity // 64 + 1)
+        return num_items * (capacity + 1)
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        method = self.choose_method(problem_instance)
+        weights = problem_instance['weights']
+        values = problem_instance['values']
+        capacity, int_weights, float_weights, float_values, candidates = self._prepare(problem_instance)
+
+        if capacity < 0:
+            selected_items = []
+        elif method == 'value':
+            selected_items = self._select_by_value(candidates, float_weights, float_values,
+                                                   float(problem_instance['capacity']))
+        elif method == 'bitset':
+            selected_items = self._select_bitset(candidates, int_weights, capacity)
+        elif method == 'table':
+            selected_items = self._select_table(candidates, int_weights, float_values, capacity)
+        else:
+            candidates = candidates[int_weights[candidates] <= capacity]
+            selected_items = self._select(candidates, int_weights, float_values, capacity)
+        selected_items = sorted(selected_items)
+        total_weight = sum(weights[i] for i in selected_items)
+        total_value = sum(values[i] for i in selected_items)
+        self.count(states_stored=self.table_cells(problem_instance))
+
+        return {
+            'selected_items': [int(i) for i in selected_items],
+            'total_weight': float(total_weight),
+            'total_value': float(total_value),
+            'strategy': 'dynamic',
+            'method': method,
+            'bound_gap': self._rounding_gap(problem_instance, method, float(total_value))
+        }
+
+    @staticmethod
+    def _rounding_gap(problem_instance: Dict[str, Any], method: str, total_value: float) -> float:
+        """Relative gap to the LP bound when weight-indexed methods rounded a weight, else 0."""
+        if method in ('value', 'bitset'):
+            return 0.0
+        weights = np.asarray(problem_instance['weights'], dtype=np.float64)
+        values = np.asarray(problem_instance['values'], dtype=np.float64)
+        useful = (weights <= problem_instance['capacity']) & (values > 0)
+        if np.array_equal(weights[useful], np.ceil(weights[useful])):
+            return 0.0
+        return _relative_gap(total_value, _dantzig_bound(weights, values, float(problem_instance['capacity'])))
+
+    def _select_by_value(self, items: np.ndarray, weights: np.ndarray, values: np.ndarray,
+                         capacity: float) -> List[int]:
+        """Rolling DP over total values: row[v] = least weight reaching value v exactly."""
+        if not np.array_equal(values[items], np.floor(values[items])):
+            raise ValueError('The value-indexed method requires integer values')
+        int_values = values.astype(np.int64)
+        total = int(int_values[items].sum())
+        if len(items) * ((total + 8) // 8) > self.memory_budget:
+            raise MemoryError(f'Value-indexed table for total value {total} exceeds the memory budget')
+
+        row = np.full(total + 1, np.inf)
+        row[0] = 0.0
+        keep = np.zeros((len(items), (total + 8) // 8), dtype=np.uint8)
+        decision = np.zeros(total + 1, dtype=bool)
+        for k, i in enumerate(items):
+            v = int_values[i]
+            candidate = row[:total + 1 - v] + weights[i]
+            decision[:v] = False
+            np.less(candidate, row[v:], out=decision[v:])
+            keep[k] = np.packbits(decision)
+            np.minimum(row[v:], candidate, out=row[v:])
+
+        v = int(np.flatnonzero(row <= capacity)[-1])
+        selected = []
+        for k in range(len(items) - 1, -1, -1):
+            if (keep[k, v >> 3] >> (7 - (v & 7))) & 1:
+                selected.append(int(items[k]))
+                v -= int_values[items[k]]
+        return selected
+
+    @staticmethod
+    def _reachable(items: np.ndarray, weights: np.ndarray, capacity: int) -> int:
+        """Bitset of the weights up to ``capacity`` reachable by subsets of ``items``."""
+        mask = (1 << (capacity + 1)) - 1
+        reachable = 1
+        for i in items:
+            reachable = (reachable | (reachable << int(weights[i]))) & mask
+        return reachable
+
+    @staticmethod
+    def _bits(bitset: int, length: int) -> np.ndarray:
+        data = np.frombuffer(bitset.to_bytes((length + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(data, bitorder='little')[:length].astype(bool)
+
+    def _select_bitset(self, items: np.ndarray, weights: np.ndarray, capacity: int) -> List[int]:
+        """Subset sum: the largest reachable weight, with one shift-or per item."""
+        target = self._reachable(items, weights, capacity).bit_length() - 1
+        return self._select_subset_sum(items, weights, target)
+
+    def _select_subset_sum(self, items: np.ndarray, weights: np.ndarray, target: int) -> List[int]:
+        """Items of ``items`` whose weights sum to exactly ``target`` (which must be reachable)."""
+        if len(items) == 0 or target == 0:
+            return []
+        if len(items) * ((target + 8) // 8) > self.memory_budget and len(items) > 1:
+            # Divide and conquer, as in _select: split the target between the halves
+            half = len(items) // 2
+            first, second = items[:half], items[half:]
+            first_bits = self._bits(self._reachable(first, weights, target), target + 1)
+            second_bits = self._bits(self._reachable(second, weights, target), target + 1)
+            split = int(np.flatnonzero(first_bits & second_bits[::-1])[0])
+            return (self._select_subset_sum(first, weights, split)
+                    + self._select_subset_sum(second, weights, target - split))
+
+        mask = (1 << (target + 1)) - 1
+        reachable = 1
+        snapshots = []
+        for i in items:
+            snapshots.append(reachable)
+            reachable = (reachable | (reachable << int(weights[i]))) & mask
+
+        selected = []
+        for k in range(len(items) - 1, -1, -1):
+            if not (snapshots[k] >> target) & 1:
+                selected.append(int(items[k]))
+                target -= int(weights[items[k]])
+        return selected
+
+    @staticmethod
+    def _forward_row(items: np.ndarray, weights: np.ndarray, values: np.ndarray,
+                     capacity: int) -> np.ndarray:
+        """row[c] = best value of a subset of ``items`` with weight at most c."""
+        row = np.zeros(capacity + 1)
+        for i in items:
+            w = weights[i]
+            if w > capacity:
+                continue
+            candidate = row[:capacity + 1 - w] + values[i]
+            np.maximum(row[w:], candidate, out=row[w:])
+        return row
+
+    def _select_packed(self, items: np.ndarray, weights: np.ndarray, values: np.ndarray,
+                       capacity: int) -> List[int]:
+        """Rolling DP that records one keep bit per (item, capacity)."""
+        row = np.zeros(capacity + 1)
+        keep = np.zeros((len(items), (capacity + 8) // 8), dtype=np.uint8)
+        decision = np.zeros(capacity + 1, dtype=bool)
+        for k, i in enumerate(items):
+            w = weights[i]
+            if w > capacity:
+                continue
+            candidate = row[:capacity + 1 - w] + values[i]
+            decision[:w] = False
+            np.greater(candidate, row[w:], out=decision[w:])
+            keep[k] = np.packbits(decision)
+            np.maximum(row[w:], candidate, out=row[w:])
+
+        selected = []
+        c = capacity
+        for k in range(len(items) - 1, -1, -1):
+            if (keep[k, c >> 3] >> (7 - (c & 7))) & 1:
+                selected.append(int(items[k]))
+                c -= weights[items[k]]
+        return selected
+
+    def _select(self, items: np.ndarray, weights: np.ndarray, values: np.ndarray,
+                capacity: int) -> List[int]:
+        if len(items) == 0:
+            return []
+        if len(items) * ((capacity + 8) // 8) <= self.memory_budget or len(items) == 1:
+            return self._select_packed(items, weights, values, capacity)
+
+        # Divide and conquer: find how the optimal solution splits the capacity
+        # between the two halves, then solve each half independently
+        half = len(items) // 2
+        first, second = items[:half], items[half:]
+        first_row = self._forward_row(first, weights, values, capacity)
+        second_row = self._forward_row(second, weights, values, capacity)
+        split = int(np.argmax(first_row + second_row[::-1]))
+        return (self._select(first, weights, values, split)
+                + self._select(second, weights, values, capacity - split))
+
+    # Instances with at most this many items x (capacity + 1) cells are
+    # solved together by solve_batch; a group's keep bits stay under
+    # BATCH_MAX_CELLS
+    BATCH_INSTANCE_MAX_CELLS = 100_000
+    BATCH_MAX_CELLS = 1 << 18
+
+    @classmethod
+    def batchable(cls, problem_instance: Dict[str, Any]) -> bool:
+        """Whether an instance is small and well-formed enough for solve_batch."""
+        weights = np.asarray(problem_instance['weights'], dtype=float)
+        values = np.asarray(problem_instance['values'], dtype=float)
+        # The vectorized DP indexes its rows by weight; anything else is
+        # left to solve() so that it fails (or not) on its own
+        if not (np.isfinite(weights).all() and np.isfinite(values).all()) or (weights < 0).any() \
+                or (values < 0).any():
+            return False
+        capacity = np.floor(problem_instance['capacity'])
+        return 0 <= capacity and len(problem_instance['weights']) * (capacity + 1) <= cls.BATCH_INSTANCE_MAX_CELLS
+
+    @classmethod
+    def solve_batch(cls, problem_instances: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Solve many small instances with one vectorized DP per group.
+
+        Instances are sorted by capacity and grouped so that padding stays
+        small; each group runs the rolling DP on a (group, capacity) array,
+        one item position at a time, so the per-item Python overhead is paid
+        once per group instead of once per instance. Padding items have zero
+        weight and value and are never selected. Results match solve().
+        """
+        results: List[Dict[str, Any]] = [None] * len(problem_instances)
+        order = sorted(range(len(problem_instances)), key=lambda i: (
+            np.floor(problem_instances[i]['capacity']), len(problem_instances[i]['weights'])))
+
+        group: List[int] = []
+        group_items = 0
+        for i in order:
+            num_items = len(problem_instances[i]['weights'])
+            capacity = int(np.floor(problem_instances[i]['capacity']))
+            # Sorted by capacity, so this instance sets the group's width
+            cells = max(group_items, num_items) * (capacity + 1) * (len(group) + 1)
+            if group and cells > cls.BATCH_MAX_CELLS:
+                cls._store_group(problem_instances, group, results)
+                group, group_items = [], 0
+            group.append(i)
+            group_items = max(group_items, num_items)
+        if group:
+            cls._store_group(problem_instances, group, results)
+        return results
+
+    @classmethod
+    def _store_group(cls, problem_instances: List[Dict[str, Any]], group: List[int],
+                     results: List[Dict[str, Any]]) -> None:
+        for i, solution in zip(group, cls._solve_group([problem_instances[i] for i in group])):
+            results[i] = solution
+
+    @staticmethod
+    def _solve_group(problem_instances: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        count = len(problem_instances)
+        items = max(len(p['weights']) for p in problem_instances)
+        capacities = np.array([int(np.floor(p['capacity'])) for p in problem_instances])
+        max_capacity = int(capacities.max())
+
+        weights = np.zeros((count, items), dtype=np.int64)
+        values = np.zeros((count, items))
+        for b, p in enumerate(problem_instances):
+            n = len(p['weights'])
+            weights[b, :n] = np.ceil(np.asarray(p['weights'], dtype=np.float64))
+            values[b, :n] = np.maximum(np.asarray(p['values'], dtype=np.float64), 0)
+
+        rows = np.arange(count)[:, None]
+        columns = np.arange(max_capacity + 1)
+        row = np.zeros((count, max_capacity + 1))
+        keep = np.zeros((items, count, max_capacity + 1), dtype=bool)
+        for k in range(items):
+            source = columns - weights[:, k:k + 1]
+            fits = source >= 0
+            candidate = np.where(fits, row[rows, np.maximum(source, 0)] + values[:, k:k + 1], -np.inf)
+            np.greater(candidate, row, out=keep[k])
+            np.maximum(row, candidate, out=row)
+
+        # Walk back from each instance's own capacity
+        selected = np.zeros((count, items), dtype=bool)
+        c = capacities.copy()
+        batch = np.arange(count)
+        for k in range(items - 1, -1, -1):
+            taken = keep[k, batch, c]
+            selected[:, k] = taken
+            c -= np.where(taken, weights[:, k], 0)
+
+        solutions = []
+        for b, p in enumerate(problem_instances):
+            selected_items = [int(i) for i in np.flatnonzero(selected[b])]
+            total_value = float(sum(p['values'][i] for i in selected_items))
+            solutions.append({
+                'selected_items': selected_items,
+                'total_weight': float(sum(p['weights'][i] for i in selected_items)),
+                'total_value': total_value,
+                'strategy': 'dynamic',
+                'method': 'rolling',
+                'bound_gap': KnapsackDynamic._rounding_gap(p, 'rolling', total_value)
+            })
+        return solutions
+
+    @staticmethod
+    def _select_table(items: np.ndarray, weights: np.ndarray, values: np.ndarray,
+                      capacity: int) -> List[int]:
+        n = len(items)
+
+        # Create DP table
+        dp = np.zeros((n + 1, capacity + 1))
+
+        # Build table bottom-up
+        for i in range(1, n + 1):
+            w_i = weights[items[i-1]]
+            for w in range(capacity + 1):
+                if w_i <= w:
+                    dp[i][w] = max(
+                        values[items[i-1]] + dp[i-1][w - w_i],
+                        dp[i-1][w]
+                    )
+                else:
+                    dp[i][w] = dp[i-1][w]
+
+        # Backtrack to find selected items
+        selected_items = []
+        w = capacity
+        for i in range(n, 0, -1):
+            if dp[i][w] != dp[i-1][w]:
+                selected_items.append(int(items[i-1]))
+                w -= weights[items[i-1]]
+        return selected_items
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return KnapsackGreedy().validate_solution(solution, problem_instance)
+
+class KnapsackBacktracking(BacktrackingStrategy):
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        weights = problem_instance['weights']
+        values = problem_instance['values']
+        capacity = problem_instance['capacity']
+        n = len(weights)
+        
+        best_value = 0
+        best_solution = []
+        nodes_expanded = pruned = 0
+        
+        def bound(items: List[int], curr_value: float, curr_weight: float, idx: int) -> float:
+            """Calculate upper bound for remaining capacity using fractional knapsack"""
+            if curr_weight >= capacity:
+                return curr_value
+            
+            bound_value = curr_value
+            bound_weight = curr_weight
+            
+            # Sort remaining items by value/weight ratio
+            remaining = [(values[i]/weights[i], values[i], weights[i]) 
+                        for i in range(idx, n) if i not in items]
+            remaining.sort(reverse=True)
+            
+            for ratio, v, w in remaining:
+                if bound_weight + w <= capacity:
+                    bound_value += v
+                    bound_weight += w
+                else:
+                    # Take fraction of last item
+                    remaining_capacity = capacity - bound_weight
+                    bound_value += v * (remaining_capacity / w)
+                    break
+            
+            return bound_value
+        
+        def backtrack(items: List[int], curr_value: float, curr_weight: float, idx: int) -> None:
+            nonlocal best_value, best_solution, nodes_expanded, pruned
+            nodes_expanded += 1
+            
+            if curr_weight > capacity:
+                return
+                
+            if curr_value > best_value:
+                best_value = curr_value
+                best_solution = items.copy()
+                self.report_progress(incumbent={'selected_items': best_solution,
+                                                'total_value': float(best_value)})
+                
+            if idx == n:
+                return
+                
+            # Calculate bound
+            if bound(items, curr_value, curr_weight, idx) <= best_value:
+                pruned += 1
+                return  # Prune this branch
+            
+            # Include item at idx
+            items.append(idx)
+            backtrack(
+                items, 
+                curr_value + values[idx],
+                curr_weight + weights[idx],
+                idx + 1
+            )
+            items.pop()
+            
+            # Exclude item at idx
+            backtrack(items, curr_value, curr_weight, idx + 1)
+        
+        # Start backtracking
+        backtrack([], 0, 0, 0)
+        self.count(nodes_expanded=nodes_expanded, pruned=pruned)
+        
+        total_weight = sum(weights[i] for i in best_solution)
+        total_value = sum(values[i] for i in best_solution)
+        
+        return {
+            'selected_items': best_solution,
+            'total_weight': float(total_weight),
+            'total_value': float(total_value),
+            'strategy': 'backtrack'
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return KnapsackGreedy().validate_solution(solution, problem_instance)
+
+class KnapsackBranchAndBound(BranchAndBoundStrategy):
+    """
+    Depth-first branch and bound with an explicit stack.
+
+    Items are sorted once by value/weight ratio and prefix sums of weights and
+    values give the Dantzig (fractional) bound of any node in O(log n) by
+    binary search for the break item. The search starts from the greedy
+    incumbent, tries "include" before "exclude", and records decisions in a
+    single array indexed by depth, so a node costs no allocation. It stops
+    after ``max_nodes`` expansions and reports the remaining bound gap.
+    """
+
+    # Expanded nodes between progress reports of the upper bound
+    REPORT_EVERY = 10_000
+
+    def __init__(self, max_nodes: int = 5_000_000):
+        self.max_nodes = max_nodes
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        weights = problem_instance['weights']
+        values = problem_instance['values']
+        capacity = float(problem_instance['capacity'])
+        w_arr = np.asarray(weights, dtype=np.float64)
+        v_arr = np.asarray(values, dtype=np.float64)
+
+        # Free items are always taken, worthless or oversized ones never
+        free = np.flatnonzero((w_arr <= 0) & (v_arr > 0))
+        useful = np.flatnonzero((w_arr > 0) & (v_arr > 0) & (w_arr <= capacity))
+        order = useful[np.argsort(-(v_arr[useful] / w_arr[useful]), kind='stable')]
+        n = len(order)
+        item_w = w_arr[order].tolist()
+        item_v = v_arr[order].tolist()
+        ratio = (v_arr[order] / w_arr[order]).tolist()
+        prefix_w = np.concatenate(([0.0], np.cumsum(w_arr[order]))).tolist()
+        prefix_v = np.concatenate(([0.0], np.cumsum(v_arr[order]))).tolist()
+        integral = bool(np.all(v_arr[useful] == np.floor(v_arr[useful])))
+
+        def upper_bound(i: int, room: float, value: float) -> float:
+            """Dantzig bound: fill items i.. in ratio order, the break item fractionally."""
+            target = prefix_w[i] + room
+            b = bisect_right(prefix_w, target, lo=i) - 1
+            bound = value + prefix_v[b] - prefix_v[i]
+            if b < n:
+                bound += (target - prefix_w[b]) * ratio[b]
+            return float(np.floor(bound + 1e-9)) if integral else bound
+
+        # Greedy incumbent in ratio order
+        taken = [False] * n
+        room = capacity
+        best_value = 0.0
+        for k in range(n):
+            if item_w[k] <= room:
+                taken[k] = True
+                room -= item_w[k]
+                best_value += item_v[k]
+        best_taken = taken[:]
+        tolerance = 1e-9 * max(1.0, best_value)
+
+        def report_incumbent() -> None:
+            if self.progress_callback is not None:
+                selected = sorted(free.tolist() + [int(order[k]) for k in range(n) if best_taken[k]])
+                self.report_progress(incumbent={'selected_items': selected,
+                                                'total_value': float(v_arr[selected].sum())},
+                                     nodes_expanded=nodes_expanded)
+
+        nodes_expanded = pruned = 0
+        report_incumbent()
+
+        # Stack entries: (depth, remaining capacity, value, decision for depth - 1)
+        stack = [(0, capacity, 0.0, False)]
+        decisions = [False] * n
+        while stack and nodes_expanded < self.max_nodes:
+            depth, room, value, take_previous = stack.pop()
+            if depth > 0:
+                decisions[depth - 1] = take_previous
+            if value > best_value + tolerance:
+                best_value = value
+                best_taken = decisions[:depth] + [False] * (n - depth)
+                report_incumbent()
+            if depth == n:
+                continue
+            if upper_bound(depth, room, value) <= best_value + tolerance:
+                pruned += 1
+                continue
+            nodes_expanded += 1
+            if nodes_expanded % self.REPORT_EVERY == 0 and self.progress_callback is not None:
+                # Every open node lies on the stack (the current one included)
+                open_bound = max(upper_bound(d, r, v) for d, r, v, _ in stack + [(depth, room, value, None)])
+                free_value = float(v_arr[free].sum())
+                self.report_progress(bound=max(open_bound, best_value) + free_value,
+                                     nodes_expanded=nodes_expanded)
+            # Pushed last, explored first: include the next item when it fits
+            stack.append((depth + 1, room, value, False))
+            if item_w[depth] <= room:
+                stack.append((depth + 1, room - item_w[depth], value + item_v[depth], True))
+
+        if stack:
+            lower = best_value
+            remaining = max(upper_bound(d, r, v) for d, r, v, _ in stack)
+            gap = max(0.0, (remaining - lower) / remaining) if remaining > 0 else 0.0
+        else:
+            gap = 0.0
+
+        selected_items = sorted(free.tolist() + [int(order[k]) for k in range(n) if best_taken[k]])
+        total_weight = sum(weights[i] for i in selected_items)
+        total_value = sum(values[i] for i in selected_items)
+        self.count(nodes_expanded=nodes_expanded, pruned=pruned)
+
+        return {
+            'selected_items': selected_items,
+            'total_weight': float(total_weight),
+            'total_value': float(total_value),
+            'strategy': 'branch_bound',
+            'nodes_expanded': nodes_expanded,
+            'bound_gap': float(gap)
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return KnapsackGreedy().validate_solution(solution, problem_instance)
+
+class KnapsackFPTAS(DynamicProgrammingStrategy):
+    """
+    Fully polynomial approximation scheme: a total value of at least
+    (1 - epsilon) times the optimum, for any real weights and capacity.
+
+    With LB a lower bound within a factor two of the optimum (the better of
+    the greedy prefix and the best single item), items worth more than
+    epsilon * LB / 2 are 'large'. Their values are scaled down by
+    K = epsilon^2 * LB / 8 and a min-weight-per-scaled-value DP runs over
+    them; its row has at most 16 / epsilon^2 columns whatever the number of
+    items or the capacity, and per scaled value only as many of the lightest
+    items are kept as could appear in one solution. Every DP entry is then
+    completed with small items in ratio order and the best completion is
+    kept (Ibarra and Kim). Scaling loses less than K per large item and the
+    completion less than one small item, at most epsilon * LB in total.
+
+    The instance's 'epsilon', when present, overrides the solver's.
+    """
+
+    DEFAULT_EPSILON = 0.1
+
+    def __init__(self, epsilon: float = DEFAULT_EPSILON):
+        super().__init__()
+        self.epsilon = epsilon
+
+    def _plan(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        """Split the items and size the scaled DP (cheap; shared with table_cells)."""
+        epsilon = float(problem_instance.get('epsilon', self.epsilon))
+        if not 0 < epsilon < 1:
+            raise ValueError('epsilon must be between 0 and 1')
+        weights = np.asarray(problem_instance['weights'], dtype=np.float64)
+        values = np.asarray(problem_instance['values'], dtype=np.float64)
+        capacity = float(problem_instance['capacity'])
+
+        order = _ratio_order(weights, values, capacity)
+        prefix_w = np.concatenate(([0.0], np.cumsum(weights[order])))
+        prefix_v = np.concatenate(([0.0], np.cumsum(values[order])))
+        b = int(np.searchsorted(prefix_w, capacity, side='right')) - 1
+        lower = max(float(prefix_v[b]), float(values[order].max())) if len(order) else 0.0
+        upper = _dantzig_bound(weights, values, capacity)
+
+        plan = {'epsilon': epsilon, 'weights': weights, 'values': values, 'capacity': capacity,
+                'order': order, 'upper': upper, 'large': order[:0], 'small': order, 'columns': 1}
+        if lower <= 0:
+            return plan
+
+        scale = epsilon * epsilon * lower / 8
+        is_large = values[order] > epsilon * lower / 2
+        large, small = order[is_large], order[~is_large]
+        columns = int(upper // scale) + 1
+        scaled = np.floor(values[large] / scale).astype(np.int64)
+
+        # Keep the (columns - 1) // s lightest items of each scaled value s
+        by_value = np.lexsort((weights[large], scaled))
+        large, scaled = large[by_value], scaled[by_value]
+        rank = np.arange(len(large)) - np.searchsorted(scaled, scaled, side='left')
+        kept = rank < (columns - 1) // np.maximum(scaled, 1)
+        plan.update(scale=scale, large=large[kept], scaled=scaled[kept], small=small, columns=columns)
+        return plan
+
+    def table_cells(self, problem_instance: Dict[str, Any]) -> int:
+        plan = self._plan(problem_instance)
+        return len(plan['large']) * plan['columns']
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        plan = self._plan(problem_instance)
+        weights, values, capacity = plan['weights'], plan['values'], plan['capacity']
+        large, small, columns = plan['large'], plan['small'], plan['columns']
+
+        # row[p] = least weight of large items with scaled value p, value[p] their true value
+        row = np.full(columns, np.inf)
+        row[0] = 0.0
+        value = np.zeros(columns)
+        keep = np.zeros((len(large), (columns + 7) // 8), dtype=np.uint8)
+        decision = np.zeros(columns, dtype=bool)
+        self.count(states_stored=len(large) * columns)
+        for k, i in enumerate(large):
+            s = int(plan['scaled'][k])
+            candidate = row[:columns - s] + weights[i]
+            candidate_value = value[:columns - s] + values[i]
+            decision[:s] = False
+            np.less(candidate, row[s:], out=decision[s:])
+            keep[k] = np.packbits(decision)
+            np.copyto(row[s:], candidate, where=decision[s:])
+            np.copyto(value[s:], candidate_value, where=decision[s:])
+
+        # Complete every entry with the longest prefix of small items that fits
+        small_w = np.concatenate(([0.0], np.cumsum(weights[small])))
+        small_v = np.concatenate(([0.0], np.cumsum(values[small])))
+        feasible = np.flatnonzero(row <= capacity)
+        prefix = np.searchsorted(small_w, capacity - row[feasible], side='right') - 1
+        best = int(np.argmax(value[feasible] + small_v[prefix]))
+        p, count = int(feasible[best]), int(prefix[best])
+
+        selected_items = []
+        for k in range(len(large) - 1, -1, -1):
+            if (keep[k, p >> 3] >> (7 - (p & 7))) & 1:
+                selected_items.append(int(large[k]))
+                p -= int(plan['scaled'][k])
+        selected_items.extend(int(i) for i in small[:count])
+        # Small items past the prefix may still fit
+        room = capacity - float(weights[selected_items].sum())
+        for i in small[count:].tolist():
+            if weights[i] <= room:
+                selected_items.append(i)
+                room -= weights[i]
+        selected_items.extend(int(i) for i in np.flatnonzero((weights <= 0) & (values > 0)))
+        selected_items.sort()
+
+        total_value = float(sum(problem_instance['values'][i] for i in selected_items))
+        epsilon = plan['epsilon']
+        return {
+            'selected_items': selected_items,
+            'total_weight': float(sum(problem_instance['weights'][i] for i in selected_items)),
+            'total_value': total_value,
+            'strategy': 'fptas',
+            'epsilon': epsilon,
+            'bound_gap': min(_relative_gap(total_value, plan['upper']), epsilon)
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return KnapsackGreedy().validate_solution(solution, problem_instance)
+
+class KnapsackCore(BranchAndBoundStrategy):
+    """
+    Core algorithm for large instances.
+
+    In ratio order, items well before the break item (the first that no
+    longer fits greedily) are fixed in and items well after it fixed out;
+    only the ``core_size`` items around it are solved, by branch and bound on
+    the remaining capacity. Each fixing is then checked against the Dantzig
+    bound of the instance with that item flipped, which is vectorized over
+    all fixed items. The optimum is at most the larger of the core's own
+    bound and the best unproven flipped bound, so 'bound_gap' is 0 when
+    every fixing is proven and the core was solved to optimality.
+    """
+
+    def __init__(self, core_size: int = 100, max_nodes: int = 1_000_000):
+        self.core_size = core_size
+        self.max_nodes = max_nodes
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        weights = np.asarray(problem_instance['weights'], dtype=np.float64)
+        values = np.asarray(problem_instance['values'], dtype=np.float64)
+        capacity = float(problem_instance['capacity'])
+
+        free = np.flatnonzero((weights <= 0) & (values > 0))
+        order = _ratio_order(weights, values, capacity)
+        n = len(order)
+        item_w, item_v = weights[order], values[order]
+        ratio = item_v / item_w
+        prefix_w = np.concatenate(([0.0], np.cumsum(item_w)))
+        prefix_v = np.concatenate(([0.0], np.cumsum(item_v)))
+        b = int(np.searchsorted(prefix_w, capacity, side='right')) - 1
+
+        hi = min(n, max(b - self.core_size // 2, 0) + self.core_size)
+        lo = max(0, hi - self.core_size)
+        core = order[lo:hi]
+        core_solver = KnapsackBranchAndBound(max_nodes=self.max_nodes)
+        core_solver.set_instrumentation(self.instrumentation)
+        with self.phase('core'):
+            core_solution = core_solver.solve({
+                'weights': weights[core], 'values': values[core], 'capacity': capacity - prefix_w[lo]})
+        self.count(items_fixed=n - len(core))
+        core_value = core_solution['total_value']
+        best_value = float(prefix_v[lo]) + core_value
+        integral = bool(np.all(item_v == np.floor(item_v)))
+
+        def bounds(targets: np.ndarray, base: np.ndarray) -> np.ndarray:
+            """Dantzig bounds: base value plus the ratio-order fill up to each prefix weight target."""
+            breaks = np.searchsorted(prefix_w, targets, side='right') - 1
+            fractional = np.where(breaks < n, (targets - prefix_w[breaks]) * ratio[np.minimum(breaks, n - 1)], 0.0)
+            result = base + prefix_v[breaks] + fractional
+            return np.floor(result + 1e-9) if integral else result
+
+        # Fixed in, now left out: items after j shift down by its weight
+        without = bounds(capacity + item_w[:lo], -item_v[:lo])
+        # Fixed out, now taken: the rest of the capacity goes to items before it
+        forced = bounds(capacity - item_w[hi:], item_v[hi:]) if hi < n else np.zeros(0)
+        tolerance = 1e-9 * max(1.0, best_value)
+        flipped = np.concatenate((without, forced))
+        unproven = flipped[flipped > best_value + tolerance]
+
+        core_gap = core_solution['bound_gap']
+        core_upper = core_value / (1 - core_gap) if core_gap < 1 else _dantzig_bound(
+            weights[core], values[core], capacity - prefix_w[lo])
+        upper = max(float(prefix_v[lo]) + core_upper, float(unproven.max()) if len(unproven) else 0.0)
+
+        selected_items = sorted(free.tolist() + order[:lo].tolist()
+                                + [int(core[i]) for i in core_solution['selected_items']])
+        free_value = float(values[free].sum())
+        return {
+            'selected_items': selected_items,
+            'total_weight': float(sum(problem_instance['weights'][i] for i in selected_items)),
+            'total_value': float(sum(problem_instance['values'][i] for i in selected_items)),
+            'strategy': 'core',
+            'core_size': len(core),
+            'nodes_expanded': core_solution['nodes_expanded'],
+            'bound_gap': _relative_gap(best_value + free_value, upper + free_value)
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return KnapsackGreedy().validate_solution(solution, problem_instance)
@@ -0,0 +1,227 @@
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence
+import time
+import numpy as np
+from optimization.algorithms.oracle import make_oracle
+
+MOVES = ('2opt', 'oropt')
+
+# Longest segment relocated by an Or-opt move
+MAX_SEGMENT = 3
+
+# Improvements smaller than this are treated as rounding noise
+EPSILON = 1e-9
+
+
+class _Tour:
+    """Array-backed cyclic tour with position lookup and shorter-side reversal."""
+
+    def __init__(self, order: Sequence[int]):
+        self.order = np.asarray(order, dtype=np.int64)
+        self.n = len(self.order)
+        self.pos = np.empty(self.n, dtype=np.int64)
+        self.pos[self.order] = np.arange(self.n)
+
+    def succ(self, city: int) -> int:
+        p = self.pos[city] + 1
+        return int(self.order[p if p < self.n else 0])
+
+    def pred(self, city: int) -> int:
+        return int(self.order[self.pos[city] - 1])
+
+    def _reverse_path(self, first: int, last: int) -> None:
+        """Reverse the forward path first..last, or its complement if shorter."""
+        i, j = int(self.pos[first]), int(self.pos[last])
+        inner = (j - i) % self.n + 1
+        if 2 * inner > self.n:
+            # Reversing the complement gives the same cycle in the opposite orientation
+            i, j = (j + 1) % self.n, (i - 1) % self.n
+            inner = self.n - inner
+        if inner <= 1:
+            return
+        if i <= j:
+            segment = self.order[i:j + 1][::-1].copy()
+            self.order[i:j + 1] = segment
+            self.pos[segment] = np.arange(i, j + 1)
+        else:
+            idx = np.concatenate((np.arange(i, self.n), np.arange(0, j + 1)))
+            segment = self.order[idx][::-1].copy()
+            self.order[idx] = segment
+            self.pos[segment] = idx
+
+    def exchange(self, a: int, b: int, c: int, d: int) -> None:
+        """
+        Replace edges (a, b) and (c, d) with (a, c) and (b, d).
+
+        The edges must be traversed in the same direction, i.e. b follows a and
+        d follows c in one of the two orientations of the tour.
+        """
+        if self.succ(a) == b:
+            self._reverse_path(b, c)
+        else:
+            self._reverse_path(a, d)
+
+
+class _LazyRows:
+    """List-like neighbour lists computed on first use (for sparse access to huge instances)."""
+
+    def __init__(self, row: Callable[[int], np.ndarray]):
+        self.row = row
+        self.rows: Dict[int, list] = {}
+
+    def __getitem__(self, i: int) -> list:
+        row = self.rows.get(i)
+        if row is None:
+            row = self.rows[i] = self.row(i).tolist()
+        return row
+
+
+def improve_tour(path: Sequence[int], problem_instance: Dict[str, Any], k: int = 8,
+                 moves: Sequence[str] = MOVES, time_limit: Optional[float] = None,
+                 active: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Improve a closed tour with 2-opt and Or-opt moves until no move applies.
+
+    Candidate moves only connect a city to one of its k nearest neighbours,
+    and a queue of "don't-look" bits restricts the search to cities whose
+    incident edges changed since they were last examined. Or-opt relocates
+    segments of up to MAX_SEGMENT cities in either orientation (the segment
+    insertion subset of 3-opt). Distances must be symmetric.
+
+    Args:
+        path: Closed tour starting and ending at the same city
+        problem_instance: Instance with 'distances', 'coordinates' or an 'oracle'
+        k: Size of the candidate neighbour lists
+        moves: Subset of MOVES to apply
+        time_limit: Optional limit in seconds
+        active: Cities to examine first, e.g. around the edges that changed
+            in an otherwise locally optimal tour; every city by default
+
+    Returns:
+        Dictionary with the improved 'path', its 'distance' and the number of
+        applied 'moves'
+    """
+    for move in moves:
+        if move not in MOVES:
+            raise ValueError(f'Unknown move: {move}')
+
+    order = list(path[:-1]) if len(path) > 1 and path[0] == path[-1] else list(path)
+    n = len(order)
+    oracle = make_oracle(problem_instance)
+    dist = oracle.distance_function()
+    if not oracle.symmetric:
+        raise ValueError('Local search requires a symmetric distance matrix')
+
+    def tour_length(cities: Sequence[int]) -> float:
+        return sum(dist(cities[i - 1], cities[i]) for i in range(len(cities)))
+
+    if n < 5:
+        length = tour_length(order)
+        return {'path': order + order[:1], 'distance': float(length), 'moves': 0}
+
+    if active is None:
+        neighbors = oracle.neighbors(k).tolist()
+    else:
+        # Few cities may ever be examined; only theirs are computed
+        neighbors = _LazyRows(lambda city: oracle.neighbors_of(city, k))
+    tour = _Tour(order)
+    initial_length = length = tour_length(order)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    use_two_opt = '2opt' in moves
+    use_or_opt = 'oropt' in moves
+    if active is None:
+        queue = deque(order)
+        queued = [True] * n
+    else:
+        queue = deque(dict.fromkeys(int(city) for city in active))
+        queued = [False] * n
+        for city in queue:
+            queued[city] = True
+    applied = 0
+
+    def activate(*cities: int) -> None:
+        for city in cities:
+            if not queued[city]:
+                queued[city] = True
+                queue.append(city)
+
+    def try_two_opt(a: int) -> float:
+        for forward in (True, False):
+            b = tour.succ(a) if forward else tour.pred(a)
+            d_ab = dist(a, b)
+            for c in neighbors[a]:
+                d_ac = dist(a, c)
+                if d_ac >= d_ab:
+                    break
+                d = tour.succ(c) if forward else tour.pred(c)
+                if c == b or d == a:
+                    continue
+                delta = d_ac + dist(b, d) - d_ab - dist(c, d)
+                if delta < -EPSILON:
+                    if forward:
+                        tour.exchange(a, b, c, d)
+                    else:
+                        tour.exchange(b, a, d, c)
+                    activate(a, b, c, d)
+                    return delta
+        return 0.0
+
+    def try_or_opt(s1: int) -> float:
+        s_last = s1
+        segment = [s1]
+        for _ in range(min(MAX_SEGMENT, n - 3)):
+            p, nx = tour.pred(s1), tour.succ(s_last)
+            if nx == p:
+                break
+            removal_gain = dist(p, s1) + dist(s_last, nx) - dist(p, nx)
+            if removal_gain > EPSILON:
+                for end in (s1, s_last):
+                    for c in neighbors[end]:
+                        if dist(c, end) >= removal_gain:
+                            break
+                        if c in segment:
+                            continue
+                        for c1, e1 in ((c, tour.succ(c)), (tour.pred(c), c)):
+                            if e1 in segment or c1 in segment or e1 == p:
+                                continue
+                            forward_cost = dist(c1, s1) + dist(s_last, e1)
+                            reverse_cost = dist(c1, s_last) + dist(s1, e1)
+                            add_cost = min(forward_cost, reverse_cost) - dist(c1, e1)
+                            delta = add_cost - removal_gain
+                            if delta < -EPSILON:
+                                # Three sequential 2-opt moves: the last one restores orientation
+                                tour.exchange(p, s1, c1, e1)
+                                tour.exchange(p, c1, nx, s_last)
+                                if forward_cost <= reverse_cost:
+                                    tour.exchange(c1, s_last, s1, e1)
+                                activate(p, nx, c1, e1, s1, s_last)
+                                return delta
+            s_last = tour.succ(s_last)
+            if s_last == p:
+                break
+            segment.append(s_last)
+        return 0.0
+
+    while queue:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        a = queue.popleft()
+        queued[a] = False
+        delta = try_two_opt(a) if use_two_opt else 0.0
+        if delta == 0.0 and use_or_opt:
+            delta = try_or_opt(a)
+        if delta < 0.0:
+            length += delta
+            applied += 1
+            activate(a)
+
+    # Rotate so the tour starts where the input did
+    start = order[0]
+    final = np.roll(tour.order, -int(tour.pos[start])).tolist()
+    # Recompute the length rather than trust the running sum of deltas, which
+    # accumulates rounding error, and never return a worse tour than the input
+    length = tour_length(final)
+    if length > initial_length:
+        return {'path': order + [start], 'distance': float(initial_length), 'moves': 0}
+    return {'path': final + [start], 'distance': float(length), 'moves': applied}
@@ -0,0 +1,240 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+import numpy as np
+from optimization.algorithms.distance import (
+    distance_block, distance_matrix, nearest_in_rows, nearest_neighbors, paired_distances,
+    point_distance_function, tour_length
+)
+
+
+def is_symmetric(distances: np.ndarray, block_size: int = 1024) -> bool:
+    """Check symmetry one row block at a time to avoid an n x n temporary."""
+    distances = np.asarray(distances)
+    for start in range(0, len(distances), block_size):
+        stop = start + block_size
+        if not np.allclose(distances[start:stop], distances[:, start:stop].T):
+            return False
+    return True
+
+
+class DistanceOracle:
+    """
+    Distances between the cities of a TSP instance, however they are stored.
+
+    Solvers ask for what they need: a scalar ``distance_function`` for hot
+    loops, whole rows or blocks as NumPy arrays, candidate neighbour lists,
+    or (only for instances small enough for exact methods) the dense matrix.
+    Subclasses decide whether those come from a stored matrix, are computed
+    from coordinates on demand or are looked up in a sparse graph.
+    """
+
+    n: int = 0
+    symmetric: bool = True
+
+    def distance_function(self) -> Callable[[int, int], float]:
+        """Scalar ``dist(i, j)`` over plain Python floats."""
+        raise NotImplementedError
+
+    def row(self, i: int) -> np.ndarray:
+        """Distances from city i to every city, as a float64 array of length n."""
+        return self.block([i], np.arange(self.n))[0]
+
+    def block(self, rows: Sequence[int], cols: Sequence[int]) -> np.ndarray:
+        """Distances between two sets of cities, shape (len(rows), len(cols))."""
+        raise NotImplementedError
+
+    def neighbors(self, k: int) -> np.ndarray:
+        """The k nearest other cities of every city, closest first; shape (n, min(k, n - 1))."""
+        k = min(k, self.n - 1)
+        result = np.empty((self.n, max(k, 0)), dtype=np.int64)
+        block_size = max(1, (1 << 22) // max(self.n, 1))
+        for start in range(0, self.n, block_size):
+            rows = np.arange(start, min(start + block_size, self.n))
+            block = np.array(self.block(rows, np.arange(self.n)), dtype=np.float64)
+            block[np.arange(len(rows)), rows] = np.inf
+            result[rows] = nearest_in_rows(block, k)
+        return result
+
+    def neighbors_of(self, i: int, k: int) -> np.ndarray:
+        """Row i of neighbors(k), for callers that only need a few cities."""
+        row = np.array(self.row(i), dtype=np.float64)
+        row[i] = np.inf
+        return nearest_in_rows(row[None, :], min(k, self.n - 1))[0]
+
+    def tour_length(self, path: Sequence[int]) -> float:
+        dist = self.distance_function()
+        return float(sum(dist(a, b) for a, b in zip(path, path[1:])))
+
+    def dense(self) -> np.ndarray:
+        """The full n x n matrix; meant for exact solvers on small instances."""
+        return self.block(np.arange(self.n), np.arange(self.n))
+
+
+class DenseOracle(DistanceOracle):
+    """A distance matrix held in memory (or memory-mapped)."""
+
+    def __init__(self, distances):
+        self.distances = np.asanyarray(distances)
+        self.n = len(self.distances)
+        self._symmetric: Optional[bool] = None
+
+    @property
+    def symmetric(self) -> bool:
+        if self._symmetric is None:
+            self._symmetric = is_symmetric(self.distances)
+        return self._symmetric
+
+    def distance_function(self) -> Callable[[int, int], float]:
+        distances = np.ascontiguousarray(self.distances, dtype=np.float64)
+        n = self.n
+        flat = memoryview(distances).cast('B').cast('d')
+        return lambda i, j: flat[i * n + j]
+
+    def row(self, i: int) -> np.ndarray:
+        return np.asarray(self.distances[i], dtype=np.float64)
+
+    def block(self, rows: Sequence[int], cols: Sequence[int]) -> np.ndarray:
+        return np.asarray(self.distances[np.ix_(rows, cols)], dtype=np.float64)
+
+    def tour_length(self, path: Sequence[int]) -> float:
+        path = np.asarray(path, dtype=np.int64)
+        return float(np.asarray(self.distances)[path[:-1], path[1:]].sum())
+
+    def dense(self) -> np.ndarray:
+        return np.asarray(self.distances, dtype=np.float64)
+
+
+class CoordinateOracle(DistanceOracle):
+    """
+    Distances computed from coordinates when asked for.
+
+    Nothing of size n x n is ever allocated: rows are computed on demand and
+    the ``cache_rows`` most recently used ones are kept, and neighbour lists
+    are built one block of rows at a time.
+    """
+
+    def __init__(self, coords, metric: str = 'euclidean', cache_rows: int = 64):
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.metric = metric
+        self.n = len(self.coords)
+        self.cache_rows = cache_rows
+        self._rows: 'OrderedDict[int, np.ndarray]' = OrderedDict()
+
+    def distance_function(self) -> Callable[[int, int], float]:
+        return point_distance_function(self.coords, self.metric)
+
+    def row(self, i: int) -> np.ndarray:
+        row = self._rows.get(i)
+        if row is not None:
+            self._rows.move_to_end(i)
+            return row
+        row = distance_block(self.coords[i:i + 1], self.coords, self.metric)[0]
+        if self.cache_rows > 0:
+            self._rows[i] = row
+            if len(self._rows) > self.cache_rows:
+                self._rows.popitem(last=False)
+        return row
+
+    def block(self, rows: Sequence[int], cols: Sequence[int]) -> np.ndarray:
+        return distance_block(self.coords[np.asarray(rows)], self.coords[np.asarray(cols)], self.metric)
+
+    def neighbors(self, k: int) -> np.ndarray:
+        return nearest_neighbors(self.coords, k, self.metric)
+
+    def tour_length(self, path: Sequence[int]) -> float:
+        return tour_length(self.coords, path, self.metric)
+
+    def dense(self) -> np.ndarray:
+        return distance_matrix(self.coords, metric=self.metric)
+
+
+class NeighborGraphOracle(DistanceOracle):
+    """
+    Sparse candidate graph: each city's nearest neighbours and their distances.
+
+    Stored as (n, k) arrays of neighbour ids and edge lengths, i.e. O(n k)
+    memory. Distances of pairs outside the graph come from ``fallback`` when
+    one is given and are infinite otherwise, which makes the graph usable as
+    an instance in its own right (only its edges may be travelled).
+    """
+
+    def __init__(self, neighbor_ids, lengths, fallback: Optional[DistanceOracle] = None):
+        self.neighbor_ids = np.asarray(neighbor_ids, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.float64)
+        if self.neighbor_ids.shape != self.lengths.shape or self.neighbor_ids.ndim != 2:
+            raise ValueError('Neighbour ids and lengths must be arrays of the same (n, k) shape')
+        self.n = len(self.neighbor_ids)
+        self.fallback = fallback
+        self._edges = [dict(zip(ids, lengths)) for ids, lengths in
+                       zip(self.neighbor_ids.tolist(), self.lengths.tolist())]
+
+    @classmethod
+    def from_oracle(cls, base: DistanceOracle, k: int) -> 'NeighborGraphOracle':
+        """The k-nearest-neighbour graph of ``base``, falling back to it for other pairs."""
+        neighbor_ids = base.neighbors(k)
+        if isinstance(base, CoordinateOracle):
+            sources = np.repeat(np.arange(base.n), neighbor_ids.shape[1])
+            lengths = paired_distances(base.coords[sources], base.coords[neighbor_ids.ravel()],
+                                       base.metric).reshape(neighbor_ids.shape)
+        else:
+            dist = base.distance_function()
+            lengths = [[dist(i, j) for j in ids] for i, ids in enumerate(neighbor_ids.tolist())]
+        return cls(neighbor_ids, lengths, fallback=base)
+
+    @property
+    def symmetric(self) -> bool:
+        return self.fallback.symmetric if self.fallback is not None else True
+
+    def distance_function(self) -> Callable[[int, int], float]:
+        edges = self._edges
+        fallback = self.fallback.distance_function() if self.fallback is not None else None
+        inf = float('inf')
+
+        def dist(i: int, j: int) -> float:
+            if i == j:
+                return 0.0
+            length = edges[i].get(j)
+            if length is None:
+                length = edges[j].get(i)
+            if length is None:
+                return fallback(i, j) if fallback is not None else inf
+            return length
+        return dist
+
+    def block(self, rows: Sequence[int], cols: Sequence[int]) -> np.ndarray:
+        if self.fallback is not None:
+            return self.fallback.block(rows, cols)
+        dist = self.distance_function()
+        return np.array([[dist(i, j) for j in cols] for i in rows], dtype=np.float64)
+
+    def row(self, i: int) -> np.ndarray:
+        if self.fallback is not None:
+            return self.fallback.row(i)
+        row = np.full(self.n, np.inf)
+        row[self.neighbor_ids[i]] = self.lengths[i]
+        row[i] = 0.0
+        return row
+
+    def neighbors(self, k: int) -> np.ndarray:
+        if k <= self.neighbor_ids.shape[1] or self.fallback is None:
+            return self.neighbor_ids[:, :k]
+        return self.fallback.neighbors(k)
+
+    def neighbors_of(self, i: int, k: int) -> np.ndarray:
+        if k <= self.neighbor_ids.shape[1] or self.fallback is None:
+            return self.neighbor_ids[i, :k]
+        return self.fallback.neighbors_of(i, k)
+
+
+def make_oracle(problem_instance: Dict[str, Any], cache_rows: int = 64) -> DistanceOracle:
+    """
+    The oracle for a TSP instance: its 'oracle' if it carries one, a
+    DenseOracle over 'distances', or a CoordinateOracle over 'coordinates'.
+    """
+    oracle = problem_instance.get('oracle')
+    if oracle is not None:
+        return oracle
+    if problem_instance.get('distances') is not None:
+        return DenseOracle(problem_instance['distances'])
+    return CoordinateOracle(problem_instance['coordinates'], problem_instance.get('metric', 'euclidean'),
+                            cache_rows=cache_rows)
@@ -0,0 +1,147 @@
+from math import hypot, sqrt
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over 2-D points supporting deletion.
+
+    Points are bucketed into square cells holding about ``points_per_cell``
+    points each. Nearest-neighbour queries scan rings of cells around the
+    query until no unscanned cell can contain a closer point (the ring bound
+    holds for both Euclidean and Manhattan distances). As points are
+    removed the grid is rebuilt with coarser cells whenever fewer than a
+    quarter of the points it was built for remain, so queries never degrade
+    into scanning mostly empty cells.
+    """
+
+    METRICS = ('euclidean', 'manhattan')
+
+    def __init__(self, coords: np.ndarray, points_per_cell: float = 2.0, metric: str = 'euclidean'):
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] != 2:
+            raise ValueError('GridIndex requires an array of 2-D points')
+        if metric not in self.METRICS:
+            raise ValueError(f'GridIndex does not support metric {metric}')
+        self.coords = coords
+        self.manhattan = metric == 'manhattan'
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.points_per_cell = points_per_cell
+        self.alive = np.ones(len(coords), dtype=bool)
+        self.size = len(coords)
+        self._build(np.arange(len(coords)))
+
+    def _build(self, ids: np.ndarray) -> None:
+        points = self.coords[ids]
+        self.built_size = len(ids)
+        if len(ids) == 0:
+            self.cells: Dict[Tuple[int, int], List[int]] = {}
+            return
+        self.origin_x, self.origin_y = points.min(axis=0)
+        width, height = np.ptp(points, axis=0)
+        extent = max(width, height, 1e-12)
+        # Aim for built_size / points_per_cell cells over the bounding box
+        num_cells = max(1.0, len(ids) / self.points_per_cell)
+        self.cell = max(sqrt(max(width, extent * 1e-6) * max(height, extent * 1e-6) / num_cells), 1e-12)
+        cx = ((points[:, 0] - self.origin_x) // self.cell).astype(np.int64)
+        cy = ((points[:, 1] - self.origin_y) // self.cell).astype(np.int64)
+        self.max_cx, self.max_cy = int(cx.max()), int(cy.max())
+
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        order = np.lexsort((cy, cx))
+        for i, x, y in zip(ids[order].tolist(), cx[order].tolist(), cy[order].tolist()):
+            cells.setdefault((x, y), []).append(i)
+        self.cells = cells
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        cx = int((x - self.origin_x) // self.cell)
+        cy = int((y - self.origin_y) // self.cell)
+        return min(max(cx, 0), self.max_cx), min(max(cy, 0), self.max_cy)
+
+    def remove(self, i: int) -> None:
+        if not self.alive[i]:
+            return
+        self.alive[i] = False
+        self.size -= 1
+        bucket = self.cells[self._cell_of(self.xs[i], self.ys[i])]
+        bucket.remove(i)
+        if self.size and self.size * 4 < self.built_size:
+            self._build(np.flatnonzero(self.alive))
+
+    def nearest(self, x: float, y: float) -> Optional[int]:
+        """Index of the closest remaining point to (x, y), or None if empty."""
+        if self.size == 0:
+            return None
+        xs, ys, cells, manhattan = self.xs, self.ys, self.cells, self.manhattan
+        qx, qy = self._cell_of(x, y)
+        # Distance from the query to the borders of its own cell
+        inside_x = x - (self.origin_x + qx * self.cell)
+        inside_y = y - (self.origin_y + qy * self.cell)
+        margin = min(inside_x, self.cell - inside_x, inside_y, self.cell - inside_y)
+
+        best, best_dist = None, float('inf')
+        max_ring = max(qx, self.max_cx - qx, qy, self.max_cy - qy)
+        for ring in range(max_ring + 1):
+            # Points in this ring and beyond are at least this far away
+            if best is not None and best_dist <= (ring - 1) * self.cell + margin:
+                break
+            for cx, cy in self._ring(qx, qy, ring):
+                for i in cells.get((cx, cy), ()):
+                    if manhattan:
+                        d = abs(xs[i] - x) + abs(ys[i] - y)
+                    else:
+                        d = hypot(xs[i] - x, ys[i] - y)
+                    if d < best_dist:
+                        best, best_dist = i, d
+        return best
+
+    def _ring(self, qx: int, qy: int, ring: int):
+        if ring == 0:
+            yield qx, qy
+            return
+        x0, x1 = max(qx - ring, 0), min(qx + ring, self.max_cx)
+        if qy - ring >= 0:
+            for cx in range(x0, x1 + 1):
+                yield cx, qy - ring
+        if qy + ring <= self.max_cy:
+            for cx in range(x0, x1 + 1):
+                yield cx, qy + ring
+        if qx - ring >= 0:
+            for cy in range(max(qy - ring + 1, 0), min(qy + ring - 1, self.max_cy) + 1):
+                yield qx - ring, cy
+        if qx + ring <= self.max_cx:
+            for cy in range(max(qy - ring + 1, 0), min(qy + ring - 1, self.max_cy) + 1):
+                yield qx + ring, cy
+
+
+def karp_partition(coords: np.ndarray, max_size: int) -> List[np.ndarray]:
+    """
+    Split points into cells of at most ``max_size`` by recursive median cuts.
+
+    Each cell is cut across the longer side of its bounding box at the median
+    point (Karp's partitioning), so cells are compact and hold about the same
+    number of points. Returns the index arrays of the cells; their order
+    follows the recursion, so consecutive cells are usually adjacent.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if max_size < 1:
+        raise ValueError('max_size must be positive')
+    cells: List[np.ndarray] = []
+    # Explicit stack of index arrays; children are pushed in reverse so the
+    # lower half is emitted first
+    stack = [np.arange(len(coords))]
+    while stack:
+        ids = stack.pop()
+        if len(ids) <= max_size:
+            if len(ids):
+                cells.append(ids)
+            continue
+        points = coords[ids]
+        axis = int(np.argmax(np.ptp(points, axis=0)))
+        half = len(ids) // 2
+        split = np.argpartition(points[:, axis], half)
+        stack.append(ids[split[half:]])
+        stack.append(ids[split[:half]])
+    return cells
@@ -1,156 +1,826 @@
-from typing import Dict, Any, List, Tuple
-import numpy as np
-from optimization.algorithms.base import (
-    GreedyStrategy,
-    DynamicProgrammingStrategy,
-    BacktrackingStrategy
-)
-
-class TSPGreedy(GreedyStrategy):
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        distances = problem_instance['distances']
-        n = len(distances)
-        unvisited = set(range(1, n))
-        current = 0
-        path = [current]
-        total_distance = 0
-        
-        while unvisited:
-            next_city = min(unvisited, key=lambda x: distances[current][x])
-            total_distance += distances[current][next_city]
-            current = next_city
-            path.append(current)
-            unvisited.remove(current)
-        
-        # Return to start
-        total_distance += distances[current][0]
-        path.append(0)
-        
-        return {
-            'path': path,
-            'distance': float(total_distance),
-            'strategy': 'greedy'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        # Basic structure checks
-        if not isinstance(solution, dict) or 'path' not in solution:
-            return False
-
-        path = solution.get('path')
-        distances = problem_instance.get('distances') if isinstance(problem_instance, dict) else None
-
-        # Validate path content
-        if not isinstance(path, (list, tuple)) or len(path) < 2:
-            # Must at least start and end at the depot 0
-            return False
-
-        # Validate start/end are at depot 0
-        if path[0] != 0 or path[-1] != 0:
-            return False
-
-        # Validate distances matrix
-        if distances is None:
-            return False
-
-        num_cities = len(distances)
-        # All cities 0..n-1 should be visited exactly once (excluding final return)
-        visited = list(path[:-1])
-        try:
-            visited_set = set(int(c) for c in visited)
-        except Exception:
-            return False
-
-        if len(visited) != num_cities:
-            return False
-
-        if visited_set != set(range(num_cities)):
-            return False
-
-        return True
-
-class TSPDynamic(DynamicProgrammingStrategy):
-    def __init__(self):
-        self.memo = {}
-
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        distances = problem_instance['distances']
-        n = len(distances)
-        all_points = (1 << n) - 1
-        
-        def dp(mask: int, pos: int) -> tuple[float, List[int]]:
-            if mask == all_points and pos == 0:
-                return 0, [0]
-            
-            if (mask, pos) in self.memo:
-                return self.memo[(mask, pos)]
-            
-            ans = float('inf')
-            best_path = []
-            
-            for city in range(n):
-                if (mask & (1 << city)) == 0:
-                    new_mask = mask | (1 << city)
-                    dist, path = dp(new_mask, city)
-                    total_dist = distances[pos][city] + dist
-                    if total_dist < ans:
-                        ans = total_dist
-                        best_path = [pos] + path
-            
-            self.memo[(mask, pos)] = ans, best_path
-            return ans, best_path
-
-        total_distance, path = dp(1, 0)
-        return {
-            'path': path,
-            'distance': float(total_distance),
-            'strategy': 'dynamic'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        return TSPGreedy().validate_solution(solution, problem_instance)
-
-class TSPBacktracking(BacktrackingStrategy):
-    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
-        distances = problem_instance['distances']
-        n = len(distances)
-        visited = [False] * n
-        path = [0]  # Start from city 0
-        visited[0] = True
-        best_path = None
-        best_distance = float('inf')
-        
-        def backtrack(curr_path: List[int], curr_dist: float) -> None:
-            nonlocal best_path, best_distance
-            
-            if len(curr_path) == n:
-                # Return to start
-                total_dist = curr_dist + distances[curr_path[-1]][0]
-                if total_dist < best_distance:
-                    best_distance = total_dist
-                    best_path = curr_path + [0]
-                return
-            
-            curr_city = curr_path[-1]
-            for next_city in range(n):
-                if not visited[next_city]:
-                    new_dist = curr_dist + distances[curr_city][next_city]
-                    if new_dist < best_distance:  # Pruning
-                        visited[next_city] = True
-                        backtrack(curr_path + [next_city], new_dist)
-                        visited[next_city] = False
-        
-        backtrack([0], 0)
-        
-        if best_path is None:
-            best_path = list(range(n)) + [0]
-            best_distance = sum(distances[best_path[i]][best_path[i+1]] for i in range(n))
-        
-        return {
-            'path': best_path,
-            'distance': float(best_distance),
-            'strategy': 'backtrack'
-        }
-
-    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
-        return TSPGreedy().validate_solution(solution, problem_instance)
\ No newline at end of file
+from typing import Dict, Any, List, Optional, Tuple
+import heapq
+import time
+import numpy as np
+from optimization.algorithms.base import (
+    OptimizationStrategy,
+    GreedyStrategy,
+    DynamicProgrammingStrategy,
+    BacktrackingStrategy,
+    BranchAndBoundStrategy,
+    DivideAndConquerStrategy
+)
+from optimization.algorithms.distance import (
+    distance_block, distance_matrix, nearest_in_rows, paired_distances, tour_length
+)
+from optimization.algorithms.local_search import improve_tour
+from optimization.algorithms.oracle import CoordinateOracle, is_symmetric, make_oracle
+from optimization.algorithms.spatial import GridIndex, karp_partition
+
+def num_cities(problem_instance: Dict[str, Any]) -> int:
+    """Number of cities of an instance given by a matrix, coordinates or an oracle."""
+    if problem_instance.get('oracle') is not None:
+        return problem_instance['oracle'].n
+    if problem_instance.get('distances') is not None:
+        return len(problem_instance['distances'])
+    return len(problem_instance['coordinates'])
+
+class TSPGreedy(GreedyStrategy):
+    """
+    Nearest-neighbour tour from city 0.
+
+    Planar coordinate inputs use a GridIndex that deletes visited points, so
+    each step only inspects nearby cells. Other inputs take a masked argmin
+    over one row of the instance's distance oracle per step, which computes
+    rows from coordinates on the fly when there is no matrix. The full
+    distance matrix is never built here.
+    """
+
+    version = 2
+
+    # Metrics whose nearest neighbour the grid can answer (the rounded and
+    # squared variants rank points exactly like the Euclidean distance)
+    GRID_METRICS = {
+        'euclidean': 'euclidean',
+        'sqeuclidean': 'euclidean',
+        'euc_2d': 'euclidean',
+        'ceil_2d': 'euclidean',
+        'manhattan': 'manhattan',
+    }
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        coords = problem_instance.get('coordinates')
+        metric = problem_instance.get('metric', 'euclidean')
+
+        if coords is not None and metric in self.GRID_METRICS and np.shape(coords)[1:] == (2,):
+            path = self._grid_tour(coords, self.GRID_METRICS[metric])
+            total_distance = tour_length(coords, path, metric)
+        else:
+            oracle = make_oracle(problem_instance)
+            path, total_distance = self._row_tour(oracle.row, oracle.n)
+
+        return {
+            'path': path,
+            'distance': float(total_distance),
+            'strategy': 'greedy'
+        }
+
+    @staticmethod
+    def _row_tour(row, n: int) -> Tuple[List[int], float]:
+        penalty = np.zeros(n)
+        current = 0
+        path = [current]
+        total_distance = 0.0
+        for _ in range(n - 1):
+            penalty[current] = np.inf
+            distances = row(current)
+            next_city = int(np.argmin(distances + penalty))
+            total_distance += distances[next_city]
+            current = next_city
+            path.append(current)
+
+        # Return to start
+        total_distance += row(current)[0]
+        path.append(0)
+        return path, total_distance
+
+    @staticmethod
+    def _grid_tour(coords, metric: str) -> List[int]:
+        index = GridIndex(coords, metric=metric)
+        xs, ys = index.xs, index.ys
+        current = 0
+        index.remove(current)
+        path = [current]
+        while index.size:
+            current = index.nearest(xs[current], ys[current])
+            index.remove(current)
+            path.append(current)
+        path.append(0)
+        return path
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        # Basic structure checks
+        if not isinstance(solution, dict) or 'path' not in solution:
+            return False
+
+        path = solution.get('path')
+        if not isinstance(problem_instance, dict):
+            return False
+
+        # Validate path content
+        if not isinstance(path, (list, tuple)) or len(path) < 2:
+            # Must at least start and end at the depot 0
+            return False
+
+        # Validate start/end are at depot 0
+        if path[0] != 0 or path[-1] != 0:
+            return False
+
+        # Validate the instance carries a matrix, coordinates or an oracle
+        if all(problem_instance.get(key) is None for key in ('distances', 'coordinates', 'oracle')):
+            return False
+
+        n = num_cities(problem_instance)
+        # All cities 0..n-1 should be visited exactly once (excluding final return)
+        visited = list(path[:-1])
+        try:
+            visited_set = set(int(c) for c in visited)
+        except Exception:
+            return False
+
+        if len(visited) != n:
+            return False
+
+        if visited_set != set(range(n)):
+            return False
+
+        return True
+
+class TSPTwoOpt(OptimizationStrategy):
+    """Nearest-neighbour tour improved by 2-opt and Or-opt local search."""
+
+    version = 2
+
+    def __init__(self, k: int = 8, time_limit: float = None):
+        self.k = k
+        self.time_limit = time_limit
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        with self.phase('greedy'):
+            initial = TSPGreedy().solve(problem_instance)
+        with self.phase('local_search'):
+            improved = improve_tour(initial['path'], problem_instance, k=self.k, time_limit=self.time_limit)
+        self.count(moves=improved['moves'])
+        return {
+            'path': improved['path'],
+            'distance': improved['distance'],
+            'strategy': 'two_opt',
+            'moves': improved['moves']
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
+
+class TSPDynamic(DynamicProgrammingStrategy):
+    """
+    Iterative Held-Karp dynamic program over subset masks.
+
+    City 0 is the fixed start, so subsets range over the remaining m = n - 1
+    cities. ``cost[mask, j]`` is the length of the shortest path that leaves
+    city 0, visits exactly the cities in ``mask`` and ends at city j; the
+    table is a contiguous (2**m, m) array and ``parent`` stores the previous
+    city of each state for path reconstruction. Subsets are processed one
+    popcount layer at a time and the relaxation is vectorized over all masks
+    of the layer and all predecessor cities.
+    """
+
+    version = 2
+
+    # Memory allowed for the cost and parent tables
+    DEFAULT_MEMORY_BUDGET = 400 * 1024 * 1024
+
+    # Upper bound on the temporary (states x predecessors) block per relaxation step
+    BLOCK_ELEMENTS = 1 << 22
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        super().__init__()
+        self.memory_budget = memory_budget
+
+    @staticmethod
+    def _parent_dtype(n: int) -> np.dtype:
+        return np.dtype(np.int8 if n <= 128 else np.int16)
+
+    @classmethod
+    def estimate_memory(cls, n: int, cost_dtype=np.float64) -> int:
+        """Bytes needed by the cost and parent tables for n cities."""
+        m = max(n - 1, 0)
+        return (1 << m) * m * (np.dtype(cost_dtype).itemsize + cls._parent_dtype(n).itemsize)
+
+    def _choose_cost_dtype(self, n: int) -> np.dtype:
+        """Prefer float64 and fall back to float32 when the budget is tight."""
+        for dtype in (np.float64, np.float32):
+            if self.estimate_memory(n, dtype) <= self.memory_budget:
+                return np.dtype(dtype)
+        raise MemoryError(
+            f'Held-Karp table for {n} cities needs '
+            f'{self.estimate_memory(n, np.float32) / 2**20:.0f} MB, '
+            f'budget is {self.memory_budget / 2**20:.0f} MB'
+        )
+
+    def fits_in_budget(self, n: int) -> bool:
+        return self.estimate_memory(n, np.float32) <= self.memory_budget
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        # Held-Karp is limited to a few dozen cities, so the matrix is small
+        with self.phase('matrix'):
+            distances = make_oracle(problem_instance).dense()
+        n = len(distances)
+        if n <= 2:
+            path = list(range(n)) + [0]
+            total = sum(distances[path[i]][path[i + 1]] for i in range(len(path) - 1))
+            return {'path': path, 'distance': float(total), 'strategy': 'dynamic'}
+
+        m = n - 1
+        cost_dtype = self._choose_cost_dtype(n)
+        parent_dtype = self._parent_dtype(n)
+
+        # Distances between the non-start cities (relabelled 0..m-1)
+        inner = distances[1:, 1:].astype(cost_dtype)
+        cost = np.full((1 << m, m), np.inf, dtype=cost_dtype)
+        parent = np.full((1 << m, m), -1, dtype=parent_dtype)
+        self.count(states_stored=m << m)
+
+        singletons = 1 << np.arange(m)
+        cost[singletons, np.arange(m)] = distances[0, 1:]
+
+        # Group masks by popcount so every predecessor layer is complete
+        masks = np.arange(1 << m, dtype=np.int64)
+        popcount = np.zeros(1 << m, dtype=np.int8)
+        for j in range(m):
+            popcount += ((masks >> j) & 1).astype(np.int8)
+        del masks
+        order = np.argsort(popcount, kind='stable')
+        layer_bounds = np.searchsorted(popcount[order], np.arange(m + 2))
+
+        block = max(1, self.BLOCK_ELEMENTS // m)
+        for size in range(2, m + 1):
+            layer = order[layer_bounds[size]:layer_bounds[size + 1]]
+            for j in range(m):
+                bit = 1 << j
+                states = layer[(layer & bit) != 0]
+                for start in range(0, len(states), block):
+                    chunk = states[start:start + block]
+                    # candidates[s, k] = cost of reaching k without j, then k -> j
+                    candidates = cost[chunk ^ bit] + inner[:, j]
+                    best = np.argmin(candidates, axis=1)
+                    cost[chunk, j] = candidates[np.arange(len(chunk)), best]
+                    parent[chunk, j] = best
+
+        full = (1 << m) - 1
+        closing = cost[full] + distances[1:, 0]
+        last = int(np.argmin(closing))
+
+        # Walk the parent table back from the full set
+        reversed_path = []
+        mask, city = full, last
+        while city >= 0:
+            reversed_path.append(city + 1)
+            previous = int(parent[mask, city])
+            mask ^= 1 << city
+            city = previous
+        path = [0] + reversed_path[::-1] + [0]
+        # Re-add in float64 so a float32 table does not leak rounding error
+        total_distance = sum(distances[path[i]][path[i + 1]] for i in range(n))
+
+        return {
+            'path': path,
+            'distance': float(total_distance),
+            'strategy': 'dynamic'
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
+
+class TSPBacktracking(BacktrackingStrategy):
+    version = 2
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        oracle = make_oracle(problem_instance)
+        dist = oracle.distance_function()
+        n = oracle.n
+        visited = [False] * n
+        path = [0]  # Start from city 0
+        visited[0] = True
+        best_path = None
+        best_distance = float('inf')
+        nodes_expanded = pruned = 0
+        
+        def backtrack(curr_path: List[int], curr_dist: float) -> None:
+            nonlocal best_path, best_distance, nodes_expanded, pruned
+            nodes_expanded += 1
+            
+            if len(curr_path) == n:
+                # Return to start
+                total_dist = curr_dist + dist(curr_path[-1], 0)
+                if total_dist < best_distance:
+                    best_distance = total_dist
+                    best_path = curr_path + [0]
+                    self.report_progress(incumbent={'path': best_path, 'distance': float(best_distance)})
+                return
+            
+            curr_city = curr_path[-1]
+            for next_city in range(n):
+                if not visited[next_city]:
+                    new_dist = curr_dist + dist(curr_city, next_city)
+                    if new_dist < best_distance:  # Pruning
+                        visited[next_city] = True
+                        backtrack(curr_path + [next_city], new_dist)
+                        visited[next_city] = False
+                    else:
+                        pruned += 1
+        
+        backtrack([0], 0)
+        self.count(nodes_expanded=nodes_expanded, pruned=pruned)
+        
+        if best_path is None:
+            best_path = list(range(n)) + [0]
+            best_distance = sum(dist(best_path[i], best_path[i+1]) for i in range(n))
+        
+        return {
+            'path': best_path,
+            'distance': float(best_distance),
+            'strategy': 'backtrack'
+        }
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
+
+def _minimum_spanning_tree(weights: np.ndarray) -> Tuple[float, np.ndarray]:
+    """Prim's algorithm on a dense symmetric matrix; returns (weight, parent array)."""
+    k = len(weights)
+    parent = np.zeros(k, dtype=np.int64)
+    if k <= 1:
+        return 0.0, parent
+    in_tree = np.zeros(k, dtype=bool)
+    in_tree[0] = True
+    best = weights[0].astype(np.float64)
+    best[0] = np.inf
+    total = 0.0
+    for _ in range(k - 1):
+        j = int(np.argmin(best))
+        total += best[j]
+        in_tree[j] = True
+        best[j] = np.inf
+        closer = (weights[j] < best) & ~in_tree
+        parent[closer] = j
+        best[closer] = weights[j][closer]
+    return total, parent
+
+class TSPBranchAndBound(BranchAndBoundStrategy):
+    """
+    Best-first branch and bound over partial tours starting at city 0.
+
+    Bounds come from Held-Karp 1-trees: a subgradient ascent at the root finds
+    node penalties ``pi`` and every node is then bounded on the penalized costs
+    ``c[i][j] + pi[i] + pi[j]`` by the partial path plus a 1-tree style bound on
+    the remaining Hamiltonian path (MST of the unvisited cities plus the
+    cheapest edges that join it to the current city and to city 0). Asymmetric
+    inputs are bounded on ``min(c[i][j], c[j][i])``.
+
+    Nodes live in flat parallel lists and only store their parent index, so
+    paths are rebuilt once for each new incumbent instead of being copied at
+    every node. The search starts from the greedy tour improved by local
+    search and stops after
+    ``max_nodes`` expansions, reporting the remaining bound gap.
+    """
+
+    version = 2
+
+    # Expanded nodes between progress reports of the lower bound
+    REPORT_EVERY = 1000
+
+    def __init__(self, max_nodes: int = 100_000, ascent_iterations: int = 100):
+        self.max_nodes = max_nodes
+        self.ascent_iterations = ascent_iterations
+
+    def _held_karp_ascent(self, weights: np.ndarray, upper_bound: float) -> Tuple[np.ndarray, float]:
+        """Subgradient optimization of the 1-tree bound (city 0 is the special node)."""
+        n = len(weights)
+        pi = np.zeros(n)
+        best_pi, best_bound = pi.copy(), -np.inf
+        step_scale = 2.0
+        stalled = 0
+        for _ in range(self.ascent_iterations):
+            penalized = weights + pi[:, None] + pi[None, :]
+            tree_weight, parent = _minimum_spanning_tree(penalized[1:, 1:])
+            degree = np.zeros(n)
+            np.add.at(degree, parent[1:] + 1, 1)
+            degree[2:] += 1
+            nearest = np.argpartition(penalized[0, 1:], 1)[:2] + 1
+            degree[nearest] += 1
+            degree[0] = 2
+            bound = tree_weight + penalized[0, nearest].sum() - 2 * pi.sum()
+
+            if bound > best_bound + 1e-9:
+                best_pi, best_bound = pi.copy(), bound
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= 5:
+                    step_scale /= 2
+                    stalled = 0
+
+            subgradient = degree - 2
+            norm = float(subgradient @ subgradient)
+            if norm == 0 or upper_bound - bound <= 1e-9:
+                break  # The 1-tree is a tour: the bound is tight
+            pi = pi + step_scale * (upper_bound - bound) / norm * subgradient
+        return best_pi, best_bound
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        # The bounds work on dense penalized matrices; n is at most a few dozen
+        with self.phase('matrix'):
+            distances = make_oracle(problem_instance).dense()
+        n = len(distances)
+
+        incumbent = TSPGreedy().solve({'distances': distances})
+        if n >= 5 and is_symmetric(distances):
+            incumbent = improve_tour(incumbent['path'], {'distances': distances})
+        best_path, best_distance = incumbent['path'], incumbent['distance']
+        if n <= 3:
+            if n == 3:
+                for candidate in ([0, 1, 2, 0], [0, 2, 1, 0]):
+                    candidate_distance = sum(distances[a][b] for a, b in zip(candidate, candidate[1:]))
+                    if candidate_distance < best_distance:
+                        best_path, best_distance = candidate, candidate_distance
+            return {
+                'path': best_path,
+                'distance': float(best_distance),
+                'strategy': 'branch_bound',
+                'nodes_expanded': 0,
+                'bound_gap': 0.0
+            }
+
+        self.report_progress(incumbent={'path': [int(c) for c in best_path], 'distance': float(best_distance)})
+        symmetric = np.minimum(distances, distances.T)
+        pi, root_bound = self._held_karp_ascent(symmetric, best_distance)
+        self.report_progress(bound=float(root_bound), nodes_expanded=0)
+        penalized = symmetric + pi[:, None] + pi[None, :]
+        np.fill_diagonal(penalized, np.inf)
+        offset = 2 * pi.sum()
+        dist = distances.tolist()
+        pen = penalized.tolist()
+        full = (1 << n) - 1
+        tolerance = 1e-9 * max(1.0, abs(best_distance))
+
+        mst_cache: Dict[int, float] = {}
+        memo_hits = 0
+
+        def remaining_tree(mask: int) -> float:
+            """MST weight over the cities not in ``mask`` (penalized costs)."""
+            nonlocal memo_hits
+            weight = mst_cache.get(mask)
+            if weight is not None:
+                memo_hits += 1
+            else:
+                cities = [c for c in range(n) if not (mask >> c) & 1]
+                weight, _ = _minimum_spanning_tree(penalized[np.ix_(cities, cities)])
+                if len(mst_cache) < 1_000_000:
+                    mst_cache[mask] = weight
+            return weight
+
+        def completion_bound(mask: int, city: int) -> float:
+            if mask == full:
+                return pen[city][0]
+            unvisited = [c for c in range(n) if not (mask >> c) & 1]
+            return (remaining_tree(mask)
+                    + min(pen[city][u] for u in unvisited)
+                    + min(pen[0][u] for u in unvisited))
+
+        # Flat node storage: parent index and city per node
+        node_parent: List[int] = [-1]
+        node_city: List[int] = [0]
+        heap = [(completion_bound(1, 0) - offset, 0, 0, 1, 0.0, 0.0)]
+        nodes_expanded = pruned = 0
+        lower_bound = max(root_bound, heap[0][0])
+
+        while heap and nodes_expanded < self.max_nodes:
+            bound, depth, node, mask, cost, penalized_cost = heapq.heappop(heap)
+            if bound >= best_distance - tolerance:
+                heap.clear()  # Best-first: every remaining node is dominated
+                break
+            nodes_expanded += 1
+            if nodes_expanded % self.REPORT_EVERY == 0:
+                # Best-first: the popped bound is a lower bound on every open node
+                self.report_progress(bound=float(max(root_bound, bound)), nodes_expanded=nodes_expanded)
+            city = node_city[node]
+
+            for nxt in range(1, n):
+                if (mask >> nxt) & 1:
+                    continue
+                child_mask = mask | (1 << nxt)
+                child_cost = cost + dist[city][nxt]
+                child_penalized = penalized_cost + pen[city][nxt]
+
+                if child_mask == full:
+                    total = child_cost + dist[nxt][0]
+                    if total < best_distance - tolerance:
+                        best_distance = total
+                        best_path = self._rebuild_path(node, node_parent, node_city) + [nxt, 0]
+                        self.report_progress(incumbent={'path': best_path, 'distance': float(best_distance)},
+                                             nodes_expanded=nodes_expanded)
+                    continue
+
+                child_bound = child_penalized + completion_bound(child_mask, nxt) - offset
+                if child_bound >= best_distance - tolerance:
+                    pruned += 1
+                    continue
+                node_parent.append(node)
+                node_city.append(nxt)
+                heapq.heappush(heap, (child_bound, depth - 1, len(node_city) - 1,
+                                      child_mask, child_cost, child_penalized))
+
+        if heap:
+            lower_bound = max(lower_bound, min(entry[0] for entry in heap))
+        else:
+            lower_bound = best_distance
+        gap = max(0.0, (best_distance - lower_bound) / best_distance) if best_distance > 0 else 0.0
+        self.count(nodes_expanded=nodes_expanded, pruned=pruned, states_stored=len(node_city),
+                   memo_hits=memo_hits)
+
+        return {
+            'path': [int(c) for c in best_path],
+            'distance': float(best_distance),
+            'strategy': 'branch_bound',
+            'nodes_expanded': nodes_expanded,
+            'bound_gap': float(gap)
+        }
+
+    @staticmethod
+    def _rebuild_path(node: int, node_parent: List[int], node_city: List[int]) -> List[int]:
+        path = []
+        while node >= 0:
+            path.append(node_city[node])
+            node = node_parent[node]
+        return path[::-1]
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
+
+class TSPAnytime(OptimizationStrategy):
+    """
+    Anytime solver: a feasible tour first, better tours and bounds later.
+
+    Phases run in order of cost and each reports its incumbent through the
+    progress callback as soon as it is known: the nearest-neighbour tour
+    (milliseconds even for large coordinate inputs), then 2-opt/Or-opt local
+    search, then, for instances of at most ``exact_limit`` cities, branch
+    and bound, which publishes tighter lower bounds and any better tour
+    until it proves optimality or hits its node limit.
+    """
+
+    version = 2
+
+    def __init__(self, exact_limit: int = 50, k: int = 8, max_nodes: int = 100_000):
+        self.exact_limit = exact_limit
+        self.k = k
+        self.max_nodes = max_nodes
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        oracle = make_oracle(problem_instance)
+        n = oracle.n
+        with self.phase('greedy'):
+            best = TSPGreedy().solve(problem_instance)
+        self.report_progress(phase='greedy', incumbent={'path': best['path'], 'distance': best['distance']})
+        solution = {'path': best['path'], 'distance': best['distance'], 'strategy': 'anytime'}
+
+        if n >= 5 and oracle.symmetric:
+            with self.phase('local_search'):
+                improved = improve_tour(best['path'], {'oracle': oracle}, k=self.k)
+            self.count(moves=improved['moves'])
+            if improved['distance'] < solution['distance']:
+                solution.update(path=improved['path'], distance=improved['distance'])
+                self.report_progress(phase='local_search',
+                                     incumbent={'path': improved['path'], 'distance': improved['distance']})
+
+        if n <= self.exact_limit:
+            distances = oracle.dense()
+            exact = TSPBranchAndBound(max_nodes=self.max_nodes)
+
+            def forward(progress: Dict[str, Any]) -> None:
+                incumbent = progress.get('incumbent')
+                if incumbent is not None and incumbent['distance'] >= solution['distance']:
+                    progress = {key: value for key, value in progress.items() if key != 'incumbent'}
+                if progress:
+                    self.report_progress(phase='branch_bound', **progress)
+
+            exact.set_progress_callback(forward)
+            exact.set_instrumentation(self.instrumentation)
+            with self.phase('branch_bound'):
+                result = exact.solve({'distances': distances})
+            if result['distance'] < solution['distance']:
+                solution.update(path=result['path'], distance=result['distance'])
+            solution['nodes_expanded'] = result['nodes_expanded']
+            solution['bound_gap'] = result['bound_gap']
+
+        return solution
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
+
+def _solve_clusters(clusters: List[np.ndarray], metric: str, exact_limit: int, k: int,
+                    time_limit: Optional[float]) -> List[List[int]]:
+    """
+    Closed tours (without the return to the start) of independent clusters.
+
+    Runs in solver pool workers. Clusters of at most ``exact_limit`` cities
+    are solved exactly, larger ones by nearest neighbour plus local search
+    on their (small) distance matrix. ``time_limit`` covers all clusters:
+    each gets an equal share of what is left when it starts, and 0 skips
+    local search altogether.
+    """
+    started = time.perf_counter()
+    tours = []
+    for done, coords in enumerate(clusters):
+        m = len(coords)
+        if m <= 3:
+            tours.append(list(range(m)))
+            continue
+        # A small matrix makes every distance lookup cheap
+        problem_instance = {'distances': distance_matrix(coords, metric)} if m <= 1000 \
+            else {'coordinates': coords, 'metric': metric}
+        if m <= exact_limit:
+            tours.append(TSPDynamic().solve(problem_instance)['path'][:-1])
+            continue
+        path = TSPGreedy().solve(problem_instance)['path']
+        share = None
+        if time_limit is not None:
+            share = max(0.0, time_limit - (time.perf_counter() - started)) / (len(clusters) - done)
+        if share is None or share > 0:
+            path = improve_tour(path, problem_instance, k=k, time_limit=share)['path']
+        tours.append(path[:-1])
+    return tours
+
+class _CellNeighborOracle(CoordinateOracle):
+    """
+    Coordinate distances with candidate neighbours drawn from each city's
+    cell and the cells before and after it in tour order, which is where
+    stitching changed edges; cheap for millions of cities.
+    """
+
+    def __init__(self, coords, metric: str, cells: List[np.ndarray]):
+        super().__init__(coords, metric, cache_rows=0)
+        self.cells = cells
+        self.cell_of = np.empty(self.n, dtype=np.int64)
+        for i, cell in enumerate(cells):
+            self.cell_of[cell] = i
+
+    def _candidates(self, c: int) -> np.ndarray:
+        return np.concatenate(self.cells[max(c - 1, 0):c + 2])
+
+    def neighbors_of(self, i: int, k: int) -> np.ndarray:
+        candidates = self._candidates(int(self.cell_of[i]))
+        row = distance_block(self.coords[i:i + 1], self.coords[candidates], self.metric)
+        row[0, candidates == i] = np.inf
+        return candidates[nearest_in_rows(row, min(k, len(candidates) - 1))[0]]
+
+    def neighbors(self, k: int) -> np.ndarray:
+        width = min(k, self.n - 1)
+        result = np.empty((self.n, width), dtype=np.int64)
+        for c, cell in enumerate(self.cells):
+            candidates = self._candidates(c)
+            block = distance_block(self.coords[cell], self.coords[candidates], self.metric)
+            block[candidates[None, :] == cell[:, None]] = np.inf
+            nearest = candidates[nearest_in_rows(block, min(width, len(candidates) - 1))]
+            # Small neighbourhoods repeat their last candidate
+            result[cell] = np.pad(nearest, ((0, 0), (0, width - nearest.shape[1])), mode='edge')
+        return result
+
+class TSPDivideAndConquer(DivideAndConquerStrategy):
+    """
+    Tours of 100k-1M cities from coordinates within a wall-clock budget.
+
+    The cities are split into cells of at most ``cluster_size`` by Karp's
+    recursive median partitioning, and the cells are ordered by a tour over
+    their centroids. Each cell is solved on its own, exactly when it has at
+    most ``exact_limit`` cities and by nearest neighbour plus 2-opt/Or-opt
+    otherwise, across ``workers`` processes of a solver pool. Consecutive
+    cells are then stitched by exchanging the pair of edges, one per cell,
+    that adds the least length, and local search runs once more starting
+    from the stitched edges only.
+
+    With a ``time_limit``, solving the cells takes CELL_SHARE of the time
+    left after partitioning and the boundary repair stops at the limit.
+    """
+
+    CELL_SHARE = 0.6
+
+    def __init__(self, cluster_size: int = 200, exact_limit: int = 12, k: int = 8,
+                 workers: int = 1, time_limit: Optional[float] = None):
+        self.cluster_size = cluster_size
+        self.exact_limit = exact_limit
+        self.k = k
+        self.workers = workers
+        self.time_limit = time_limit
+
+    def solve(self, problem_instance: Dict[str, Any]) -> Dict[str, Any]:
+        if problem_instance.get('coordinates') is None:
+            raise ValueError('Divide and conquer strategy requires coordinates')
+        started = time.perf_counter()
+        coords = np.asarray(problem_instance['coordinates'], dtype=np.float64)
+        metric = problem_instance.get('metric', 'euclidean')
+
+        def remaining() -> Optional[float]:
+            if self.time_limit is None:
+                return None
+            return max(0.0, self.time_limit - (time.perf_counter() - started))
+
+        with self.phase('partition'):
+            cells = karp_partition(coords, self.cluster_size)
+            if len(cells) > 2:
+                centroids = np.array([coords[cell].mean(axis=0) for cell in cells])
+                order = TSPTwoOpt(k=self.k, time_limit=remaining()).solve(
+                    {'coordinates': centroids, 'metric': metric})
+                cells = [cells[i] for i in order['path'][:-1]]
+        self.count(clusters=len(cells))
+
+        with self.phase('cells'):
+            tours = self._solve_cells([coords[cell] for cell in cells], metric, remaining())
+        with self.phase('stitch'):
+            succ, boundary = self._stitch(coords, metric, cells, tours)
+
+        successors = succ.tolist()
+        path = [0]
+        city = successors[0]
+        while city != 0:
+            path.append(city)
+            city = successors[city]
+        path.append(0)
+
+        if len(cells) > 1 and len(path) > 5:
+            oracle = _CellNeighborOracle(coords, metric, cells)
+            with self.phase('repair'):
+                result = improve_tour(path, {'oracle': oracle}, k=self.k, time_limit=remaining(), active=boundary)
+            path, distance = result['path'], result['distance']
+            self.count(moves=result['moves'])
+        else:
+            distance = tour_length(coords, path, metric)
+
+        return {
+            'path': path,
+            'distance': float(distance),
+            'strategy': 'divide_conquer',
+            'clusters': len(cells)
+        }
+
+    def _solve_cells(self, clusters: List[np.ndarray], metric: str, budget: Optional[float]) -> List[List[int]]:
+        # Stitching and the boundary repair get the rest of the budget
+        share = None if budget is None else self.CELL_SHARE * budget
+        if self.workers <= 1 or len(clusters) < 2:
+            return _solve_clusters(clusters, metric, self.exact_limit, self.k, share)
+
+        # Imported here so the algorithms stay usable without the service
+        from optimization.executor import SolverPool, SolverTimeout
+        bounds = np.linspace(0, len(clusters), min(len(clusters), 4 * self.workers) + 1).astype(int)
+        chunks = [clusters[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+        limit = float('inf') if budget is None else budget
+        pool = SolverPool(max_workers=self.workers, max_queue=len(chunks),
+                          default_timeout=limit, max_timeout=limit)
+        try:
+            # Chunks run self.workers at a time
+            chunk_share = None if share is None else share * self.workers / len(chunks)
+            jobs = [pool.submit(_solve_clusters, chunk, metric, self.exact_limit, self.k, chunk_share)
+                    for chunk in chunks]
+            tours = []
+            for chunk, job in zip(chunks, jobs):
+                try:
+                    tours.extend(job.result())
+                except SolverTimeout:
+                    # Out of time: nearest neighbour tours only
+                    tours.extend(_solve_clusters(chunk, metric, self.exact_limit, self.k, 0))
+            return tours
+        finally:
+            pool.shutdown()
+
+    @staticmethod
+    def _stitch(coords: np.ndarray, metric: str, cells: List[np.ndarray],
+                tours: List[List[int]]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Join the cell tours into one cycle, given as a successor array.
+
+        Each cell is merged into the cycle through an edge (a, b) leaving a
+        city of the previous cell and an edge (c, d) of its own tour; all
+        pairs are priced at once and the cheaper reconnection, a-d...c-b or
+        a-c...d-b (the cell reversed), is applied. Returns the successors
+        and the cities whose edges changed.
+        """
+        succ = np.empty(len(coords), dtype=np.int64)
+        first = cells[0][tours[0]]
+        succ[first] = np.roll(first, -1)
+        boundary: List[int] = []
+        previous = cells[0]
+        for cell, tour in zip(cells[1:], tours[1:]):
+            c = cell[tour]
+            d = np.roll(c, -1)
+            a = previous
+            b = succ[a]
+            removed = paired_distances(coords[a], coords[b], metric)[:, None] \
+                + paired_distances(coords[c], coords[d], metric)[None, :]
+            a_c = distance_block(coords[a], coords[c], metric)
+            b_c = distance_block(coords[b], coords[c], metric)
+            keep = np.roll(a_c, -1, axis=1) + b_c - removed
+            reverse = a_c + np.roll(b_c, -1, axis=1) - removed
+            p, q = np.unravel_index(np.argmin(np.minimum(keep, reverse)), keep.shape)
+            a_p, b_p, c_q, d_q = int(a[p]), int(b[p]), int(c[q]), int(d[q])
+            if keep[p, q] <= reverse[p, q]:
+                succ[c] = d
+                succ[a_p], succ[c_q] = d_q, b_p
+            else:
+                succ[d] = c
+                succ[a_p], succ[d_q] = c_q, b_p
+            boundary.extend((a_p, b_p, c_q, d_q))
+            previous = cell
+        return succ, boundary
+
+    def validate_solution(self, solution: Dict[str, Any], problem_instance: Dict[str, Any]) -> bool:
+        return TSPGreedy().validate_solution(solution, problem_instance)
@@ -0,0 +1,183 @@
+"""
+Content-addressed cache of solver responses.
+
+Entries are keyed by a hash of the numeric problem data (or, for instances
+of the instance store, of the stored files' names), the strategy, the
+solver configuration and version, and any options that change the answer,
+so identical instances resubmitted by clients are answered without solving
+them again. The first tier is an in-process LRU bounded by the total size
+of its entries; an optional second tier stores entries in one of Django's
+configured caches (e.g. a FileBasedCache or DatabaseCache) so they survive
+restarts and are shared between server processes.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+
+# Bump to invalidate every stored entry, e.g. when the response format changes
+CACHE_FORMAT = 1
+
+
+def _update_with_value(digest, value: Any) -> None:
+    stored_path = getattr(value, 'stored_path', None)
+    if stored_path is not None:
+        # Arrays of the instance store: their file names the immutable stored
+        # instance, so the mapped data need not be read to hash it
+        digest.update(f'stored{stored_path}'.encode())
+    elif isinstance(value, np.ndarray):
+        # Hashed in place, without a copy unless the array is not contiguous
+        array = np.ascontiguousarray(value)
+        digest.update(f'array{array.dtype.str}{array.shape}'.encode())
+        digest.update(memoryview(array))
+    else:
+        digest.update(repr(value).encode())
+
+
+def _solver_config(solver) -> Dict[str, Any]:
+    """Scalar constructor settings of a solver (node limits, budgets, ...)."""
+    return {
+        key: value for key, value in sorted(vars(solver).items())
+        if isinstance(value, (bool, int, float, str, type(None), tuple))
+    }
+
+
+def cache_key(problem: str, strategy: str, solver, problem_instance: Dict[str, Any],
+              options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Canonical key for solving ``problem_instance`` with ``solver``.
+
+    Args:
+        problem: Problem type ('tsp' or 'knapsack')
+        strategy: Strategy name as requested by the client
+        solver: The configured solver instance
+        problem_instance: Parsed instance, before any derived data is added
+        options: Request options that change the result (e.g. 'improve')
+
+    Returns:
+        Hex digest identifying the request
+    """
+    digest = hashlib.sha256()
+    header = {
+        'format': CACHE_FORMAT,
+        'problem': problem,
+        'strategy': strategy,
+        'solver': f'{type(solver).__module__}.{type(solver).__qualname__}',
+        'version': getattr(solver, 'version', 1),
+        'config': _solver_config(solver),
+        'options': options or {},
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=repr).encode())
+    for key in sorted(problem_instance):
+        digest.update(key.encode() + b'\0')
+        _update_with_value(digest, problem_instance[key])
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    Two-tier cache of JSON-serializable solver responses.
+
+    Args:
+        max_bytes: Total size of the serialized entries kept in process
+        backend: Optional Django cache used as the persistent tier
+        timeout: Expiry in seconds for the persistent tier (None keeps
+            entries until the backend evicts them)
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, backend=None, timeout: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.timeout = timeout
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+
+        if self.backend is not None:
+            payload = self.backend.get(f'solution:{key}')
+            if payload is not None:
+                self._store(key, payload)
+                with self._lock:
+                    self.persistent_hits += 1
+                return json.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value)
+        self._store(key, payload)
+        if self.backend is not None:
+            self.backend.set(f'solution:{key}', payload, self.timeout)
+
+    def _store(self, key: str, payload: str) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = payload
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'persistent': self.backend is not None,
+            }
+
+
+_cache: Optional[SolutionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SolutionCache:
+    """The process-wide cache, configured from the SOLUTION_CACHE setting."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from django.conf import settings
+            from django.core.cache import caches
+            config = getattr(settings, 'SOLUTION_CACHE', {})
+            alias = config.get('PERSISTENT_ALIAS')
+            _cache = SolutionCache(
+                max_bytes=config.get('MAX_BYTES', 64 * 1024 * 1024),
+                backend=caches[alias] if alias else None,
+                timeout=config.get('PERSISTENT_TIMEOUT'),
+            )
+        return _cache
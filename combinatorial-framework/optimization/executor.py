@@ -0,0 +1,347 @@
+"""
+Bounded process pool that runs CPU-bound solves outside the request thread.
+
+Each solve runs in a long-lived worker process. The pool enforces a
+wall-clock limit per job (the worker is killed and replaced when it is
+exceeded), an optional address-space limit inside the worker, and admission
+control: once ``max_workers`` jobs are running and ``max_queue`` more are
+waiting, new submissions fail fast with PoolSaturated instead of piling up.
+"""
+import asyncio
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from multiprocessing.reduction import ForkingPickler as _ForkingPickler
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool has no free worker and its queue is full."""
+
+
+class SolverTimeout(Exception):
+    """Raised when a job exceeds its wall-clock limit."""
+
+
+class WorkerCrashed(Exception):
+    """Raised when a worker process dies while running a job."""
+
+
+class RemoteTraceback(Exception):
+    """Carries the formatted traceback of an exception raised in a worker."""
+
+    def __init__(self, tb: str):
+        super().__init__(tb)
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
+def _apply_memory_limit(limit: Optional[int]) -> None:
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = resource.RLIM_INFINITY if limit is None else limit
+    if hard != resource.RLIM_INFINITY and (soft == resource.RLIM_INFINITY or soft > hard):
+        soft = hard
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+# Where publish_progress sends updates for the job running on this thread
+_progress = threading.local()
+
+
+def publish_progress(payload: Dict[str, Any]) -> None:
+    """
+    Send a progress update for the job being executed to its submitter.
+
+    Meant to be passed as a strategy's progress callback inside pool jobs;
+    it does nothing when no ``on_progress`` listener can receive it.
+    """
+    sink = getattr(_progress, 'sink', None)
+    if sink is not None:
+        sink(payload)
+
+
+def _worker_main(conn) -> None:
+    """Worker loop: receive (fn, args, kwargs, memory_limit), send back the outcome."""
+    if os.environ.get('DJANGO_SETTINGS_MODULE'):
+        # Spawned workers start without Django set up, but jobs may import
+        # modules that need the app registry (e.g. models)
+        import django
+        django.setup()
+    # Workers are started as daemons so they die with the server, but
+    # strategies may fan out to a pool of their own; its workers are daemons
+    # of this process and exit once the pipe to it closes
+    multiprocessing.current_process().daemon = False
+    _progress.sink = lambda payload: conn.send(('progress', payload))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        fn, args, kwargs, memory_limit = job
+        # Unpickling may have imported modules into a fresh worker; the time
+        # limit only starts now
+        conn.send(('started', None))
+        try:
+            _apply_memory_limit(memory_limit)
+            outcome = ('ok', fn(*args, **kwargs))
+        except BaseException as exc:
+            outcome = ('error', exc, traceback.format_exc())
+        finally:
+            _apply_memory_limit(None)
+        try:
+            conn.send(outcome)
+        except Exception as exc:
+            conn.send(('error', RuntimeError(f'Could not return solver result: {exc}'), ''))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+
+class SolverJob:
+    """Handle on a submitted job; ``cancel()`` also kills a job that is running."""
+
+    def __init__(self):
+        self._future = None
+        self._cancel_event = threading.Event()
+        # Monotonic time at which a worker picked the job up
+        self.started_at: Optional[float] = None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self._future.result(timeout)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def running(self) -> bool:
+        return self.started_at is not None and not self._future.done()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        self._future.cancel()
+
+    def add_done_callback(self, fn: Callable) -> None:
+        self._future.add_done_callback(lambda _: fn(self))
+
+    def asyncio_future(self) -> 'asyncio.Future':
+        """An asyncio future resolved with this job, for awaiting it on an event loop."""
+        return asyncio.wrap_future(self._future)
+
+
+class SolverPool:
+    """
+    Process pool with per-job timeouts, memory limits, cancellation and
+    back-pressure.
+
+    Args:
+        max_workers: Number of worker processes (0 runs jobs inline, which is
+            only meant for development and tests: no limits are enforced)
+        max_queue: Jobs allowed to wait for a worker before submissions fail
+        default_timeout: Wall-clock limit in seconds when none is requested
+        max_timeout: Upper bound for requested timeouts
+        memory_limit: Default (and maximum) worker address-space limit in bytes
+        start_method: multiprocessing start method ('spawn' by default, which is
+            safe to use from a threaded server)
+    """
+
+    # How often a dispatcher checks for timeouts and cancellation
+    POLL_INTERVAL = 0.05
+
+    # Extra time a freshly spawned worker gets to import the job's modules
+    # before its time limit starts
+    STARTUP_TIMEOUT = 30.0
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, default_timeout: float = 30.0,
+                 max_timeout: float = 300.0, memory_limit: Optional[int] = None,
+                 start_method: str = 'spawn'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.memory_limit = memory_limit
+        self._context = multiprocessing.get_context(start_method)
+        self._admission = threading.BoundedSemaphore(max(max_workers, 1) + max_queue)
+        self._idle: 'queue.SimpleQueue[_Worker]' = queue.SimpleQueue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._dispatch = ThreadPoolExecutor(max_workers=max(max_workers, 1),
+                                            thread_name_prefix='solver-dispatch')
+        self._closed = False
+
+    def effective_timeout(self, timeout: Optional[float]) -> float:
+        if timeout is None:
+            return self.default_timeout
+        return max(0.0, min(float(timeout), self.max_timeout))
+
+    def effective_memory_limit(self, memory_limit: Optional[int]) -> Optional[int]:
+        if memory_limit is None:
+            return self.memory_limit
+        if self.memory_limit is None:
+            return int(memory_limit)
+        return min(int(memory_limit), self.memory_limit)
+
+    def submit(self, fn: Callable, *args, timeout: Optional[float] = None,
+               memory_limit: Optional[int] = None,
+               on_progress: Optional[Callable[[Dict[str, Any]], None]] = None, **kwargs) -> SolverJob:
+        """
+        Queue ``fn(*args, **kwargs)``; raises PoolSaturated when the queue is full.
+
+        ``on_progress`` is called on a pool thread with every payload the job
+        passes to publish_progress.
+        """
+        if self._closed:
+            raise RuntimeError('Solver pool has been shut down')
+        if not self._admission.acquire(blocking=False):
+            raise PoolSaturated('All solver workers are busy and the queue is full')
+
+        job = SolverJob()
+        limits = (self.effective_timeout(timeout), self.effective_memory_limit(memory_limit))
+        try:
+            job._future = self._dispatch.submit(self._execute, job, fn, args, kwargs, limits, on_progress)
+        except BaseException:
+            self._admission.release()
+            raise
+        job._future.add_done_callback(lambda _: self._admission.release())
+        return job
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None,
+            memory_limit: Optional[int] = None, **kwargs) -> Any:
+        """Submit a job and wait for its result."""
+        return self.submit(fn, *args, timeout=timeout, memory_limit=memory_limit, **kwargs).result()
+
+    def _acquire_worker(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            worker = _Worker(self._context)
+            with self._lock:
+                self._workers.add(worker)
+            return worker
+
+    def _discard_worker(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+
+    def _execute(self, job: SolverJob, fn: Callable, args: tuple, kwargs: Dict[str, Any], limits: tuple,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]]) -> Any:
+        timeout, memory_limit = limits
+        job.started_at = time.monotonic()
+        if self.max_workers == 0:
+            _progress.sink = on_progress
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _progress.sink = None
+
+        worker = self._acquire_worker()
+        try:
+            payload = _ForkingPickler.dumps((fn, args, kwargs, memory_limit))
+        except BaseException:
+            self._idle.put(worker)
+            raise
+        try:
+            worker.conn.send_bytes(payload)
+            deadline = job.started_at + timeout + self.STARTUP_TIMEOUT
+            while True:
+                if job._cancel_event.is_set():
+                    self._discard_worker(worker)
+                    raise CancelledError()
+                if time.monotonic() > deadline:
+                    self._discard_worker(worker)
+                    raise SolverTimeout(f'Solver exceeded the {timeout:g} s time limit')
+                if worker.conn.poll(self.POLL_INTERVAL):
+                    message = worker.conn.recv()
+                    if message[0] == 'started':
+                        deadline = time.monotonic() + timeout
+                        continue
+                    if message[0] != 'progress':
+                        outcome = message
+                        break
+                    if on_progress is not None:
+                        try:
+                            on_progress(message[1])
+                        except Exception:
+                            # A failing listener must not take the solve down with it
+                            traceback.print_exc()
+                elif not worker.process.is_alive():
+                    # Raises EOFError unless the outcome arrived in the meantime
+                    outcome = worker.conn.recv()
+                    break
+        except (EOFError, OSError, BrokenPipeError) as exc:
+            self._discard_worker(worker)
+            raise WorkerCrashed(f'Solver worker exited unexpectedly (exit code '
+                                f'{worker.process.exitcode})') from exc
+
+        self._idle.put(worker)
+        if outcome[0] == 'ok':
+            return outcome[1]
+        _, exc, tb = outcome
+        raise exc from RemoteTraceback(tb)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        self._dispatch.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[SolverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SolverPool:
+    """The process-wide pool, configured from the SOLVER_POOL setting."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from django.conf import settings
+            config = getattr(settings, 'SOLVER_POOL', {})
+            memory_mb = config.get('MEMORY_LIMIT_MB')
+            _pool = SolverPool(
+                max_workers=config.get('MAX_WORKERS', 2),
+                max_queue=config.get('MAX_QUEUE', 8),
+                default_timeout=config.get('DEFAULT_TIMEOUT', 30.0),
+                max_timeout=config.get('MAX_TIMEOUT', 300.0),
+                memory_limit=memory_mb * 1024 * 1024 if memory_mb else None,
+                start_method=config.get('START_METHOD', 'spawn'),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,191 @@
+"""
+Server-side store of uploaded problem instances.
+
+Each instance is saved once as one .npy file per array under a directory
+named after its id, with its metadata in the ProblemInstance model. Loading
+maps the files read-only, and the mapped arrays pickle as a reference to
+their file: a solver pool worker maps the same file again rather than
+receiving a copy of the data, so every process shares the page cache.
+
+The total size of the stored files is kept within a disk budget by
+evicting the least recently used instances.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import ProblemInstance
+
+
+class UnknownInstance(LookupError):
+    """Raised for an instance id that is not (or no longer) stored."""
+
+
+def open_stored(path: str) -> 'StoredArray':
+    array = np.load(path, mmap_mode='r', allow_pickle=False).view(StoredArray)
+    array.stored_path = path
+    return array
+
+
+class StoredArray(np.memmap):
+    """Read-only mapped array of the store that pickles as its file path."""
+
+    stored_path: Optional[str] = None
+
+    def __array_finalize__(self, obj):
+        super().__array_finalize__(obj)
+        # Slices and other derived arrays are pickled by value
+        self.stored_path = None
+
+    def __reduce__(self):
+        if self.stored_path is None:
+            return np.array(self).__reduce__()
+        return open_stored, (self.stored_path,)
+
+    def __reduce_ex__(self, protocol):
+        return self.__reduce__()
+
+
+def instance_digest(problem: str, arrays: Dict[str, np.ndarray], options: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps([problem, options], sort_keys=True).encode())
+    for field in sorted(arrays):
+        array = np.ascontiguousarray(arrays[field])
+        digest.update(f'{field}{array.dtype.str}{array.shape}'.encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+class InstanceStore:
+    """
+    Instances on local disk, indexed by the ProblemInstance model.
+
+    Args:
+        root: Directory holding one subdirectory per instance
+        max_bytes: Disk budget for all stored arrays
+    """
+
+    def __init__(self, root, max_bytes: int = 10 * 1024 ** 3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, instance_id, field: str) -> Path:
+        return self.root / str(instance_id) / f'{field}.npy'
+
+    def save(self, problem: str, problem_instance: Dict[str, Any]) -> ProblemInstance:
+        """
+        Store a parsed instance and return its record.
+
+        Arrays are written as .npy files; every other value must be JSON
+        serializable and is kept in the record. An identical instance that
+        is already stored is reused. Raises ValueError when the instance is
+        larger than the whole budget.
+        """
+        arrays = {key: np.asarray(value) for key, value in problem_instance.items()
+                  if isinstance(value, np.ndarray)}
+        options = {key: value for key, value in problem_instance.items() if key not in arrays}
+        size = sum(array.nbytes for array in arrays.values())
+        if size > self.max_bytes:
+            raise ValueError(f'Instance of {size} bytes exceeds the store budget of {self.max_bytes} bytes')
+
+        digest = instance_digest(problem, arrays, options)
+        with self._lock:
+            for record in ProblemInstance.objects.filter(problem=problem, digest=digest):
+                if all(self._path(record.id, field).exists() for field in record.arrays):
+                    self.touch(record)
+                    return record
+
+            record = ProblemInstance(
+                problem=problem, digest=digest, options=options, size_bytes=size,
+                arrays={field: {'dtype': array.dtype.str, 'shape': list(array.shape)}
+                        for field, array in arrays.items()},
+            )
+            directory = self.root / str(record.id)
+            directory.mkdir(parents=True, exist_ok=True)
+            try:
+                for field, array in arrays.items():
+                    # Written under a temporary name so readers never see a partial file
+                    partial = directory / f'{field}.npy.partial'
+                    with open(partial, 'wb') as f:
+                        np.save(f, array, allow_pickle=False)
+                    os.replace(partial, self._path(record.id, field))
+                record.save()
+            except BaseException:
+                shutil.rmtree(directory, ignore_errors=True)
+                raise
+            self._evict(keep=record.id)
+        return record
+
+    def get(self, instance_id) -> ProblemInstance:
+        try:
+            return ProblemInstance.objects.get(pk=instance_id)
+        except (ProblemInstance.DoesNotExist, ValidationError):
+            # ValidationError for ids that are not UUIDs at all
+            raise UnknownInstance(f'Unknown instance: {instance_id}')
+
+    def open(self, instance_id) -> Tuple[str, Dict[str, Any]]:
+        """The problem type and the instance, with its arrays memory-mapped."""
+        record = self.get(instance_id)
+        try:
+            problem_instance = {field: open_stored(str(self._path(record.id, field)))
+                                for field in record.arrays}
+        except FileNotFoundError:
+            raise UnknownInstance(f'Unknown instance: {instance_id}')
+        problem_instance.update(record.options)
+        self.touch(record)
+        return record.problem, problem_instance
+
+    def touch(self, record: ProblemInstance) -> None:
+        record.last_used_at = timezone.now()
+        ProblemInstance.objects.filter(pk=record.pk).update(last_used_at=record.last_used_at)
+
+    def delete(self, instance_id) -> None:
+        record = self.get(instance_id)
+        with self._lock:
+            self._remove(record)
+
+    def _remove(self, record: ProblemInstance) -> None:
+        # Processes that still map the files keep reading them after unlinking
+        shutil.rmtree(self.root / str(record.id), ignore_errors=True)
+        record.delete()
+
+    def total_bytes(self) -> int:
+        return ProblemInstance.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+
+    def _evict(self, keep=None) -> None:
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        with transaction.atomic():
+            for record in ProblemInstance.objects.exclude(pk=keep).order_by('last_used_at'):
+                if total <= self.max_bytes:
+                    break
+                self._remove(record)
+                total -= record.size_bytes
+
+
+_store: Optional[InstanceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> InstanceStore:
+    """The process-wide instance store, configured from the INSTANCE_STORE setting."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from django.conf import settings
+            config = getattr(settings, 'INSTANCE_STORE', {})
+            _store = InstanceStore(
+                config.get('ROOT', Path(settings.BASE_DIR) / 'instance_store'),
+                max_bytes=config.get('MAX_BYTES', 10 * 1024 ** 3),
+            )
+        return _store
@@ -0,0 +1,184 @@
+"""
+Registry of asynchronous solver jobs.
+
+A job wraps a SolverJob of the process pool and records what the client
+can poll for while it runs: its status, the best incumbent and bound the
+strategy has published so far, and the final result or error. Finished jobs
+are kept for a retention period so their results can still be fetched.
+Everything lives in this process; no external broker is involved.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Dict, Optional
+
+from .executor import SolverJob
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Job:
+    """State of one asynchronous solve, updated from pool threads."""
+
+    def __init__(self, problem: str, strategy: str):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.strategy = strategy
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.incumbent: Optional[Dict[str, Any]] = None
+        self.bound: Optional[float] = None
+        self.nodes_expanded: Optional[int] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.handle: Optional[SolverJob] = None
+        self._lock = threading.Lock()
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return CANCELLED
+        if self.error is not None:
+            return FAILED
+        if self.result is not None:
+            return COMPLETED
+        if self.handle is not None and self.handle.running():
+            return RUNNING
+        return QUEUED
+
+    def update(self, progress: Dict[str, Any]) -> None:
+        with self._lock:
+            if 'incumbent' in progress:
+                self.incumbent = progress['incumbent']
+            if 'bound' in progress:
+                self.bound = progress['bound']
+            if 'nodes_expanded' in progress:
+                self.nodes_expanded = progress['nodes_expanded']
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at if self.finished_at is not None else time.monotonic()
+            return {
+                'job_id': self.id,
+                'problem': self.problem,
+                'strategy': self.strategy,
+                'status': self.status,
+                'elapsed': end - self.created_at,
+                'incumbent': self.incumbent,
+                'bound': self.bound,
+                'nodes_expanded': self.nodes_expanded,
+                'result': self.result,
+            }
+
+
+class JobRegistry:
+    """
+    Creates jobs on a SolverPool and keeps them for polling.
+
+    Args:
+        pool: Pool the jobs run on
+        max_finished: Finished jobs kept before the oldest are dropped
+        retention: Seconds a finished job is kept
+    """
+
+    def __init__(self, pool, max_finished: int = 1000, retention: float = 3600.0):
+        self.pool = pool
+        self.max_finished = max_finished
+        self.retention = retention
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, problem: str, strategy: str, fn: Callable, *args,
+               finalize: Callable[[Any], Dict[str, Any]] = lambda result: result,
+               timeout: Optional[float] = None, memory_limit: Optional[int] = None) -> Job:
+        """
+        Start ``fn(*args)`` on the pool as a new job.
+
+        ``fn`` should publish progress through executor.publish_progress;
+        ``finalize`` turns its return value into the job's result and may
+        raise to fail the job. Raises PoolSaturated when the pool is full.
+        """
+        job = Job(problem, strategy)
+        job.handle = self.pool.submit(fn, *args, timeout=timeout, memory_limit=memory_limit,
+                                      on_progress=job.update)
+
+        def done(handle: SolverJob) -> None:
+            result = error = None
+            try:
+                result = finalize(handle.result())
+            except CancelledError:
+                pass
+            except Exception as exc:
+                error = exc
+            with job._lock:
+                job.result, job.error = result, error
+                job.cancelled = result is None and error is None
+                job.finished_at = time.monotonic()
+
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.handle.add_done_callback(done)
+        return job
+
+    def completed(self, problem: str, strategy: str, result: Dict[str, Any]) -> Job:
+        """Register a job whose result is already known (e.g. from a cache)."""
+        job = Job(problem, strategy)
+        job.result = result
+        job.finished_at = job.created_at
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.handle is None:
+            return job
+        with job._lock:
+            if job.finished_at is not None:
+                return job
+            # Reported right away; the worker is killed within a poll interval
+            job.cancelled = True
+        job.handle.cancel()
+        return job
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if excess > 0 or now - job.finished_at > self.retention:
+                del self._jobs[job.id]
+                excess -= 1
+
+
+_registry: Optional[JobRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> JobRegistry:
+    """The process-wide job registry, configured from the SOLVER_JOBS setting."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from django.conf import settings
+            from .executor import get_pool
+            config = getattr(settings, 'SOLVER_JOBS', {})
+            _registry = JobRegistry(
+                get_pool(),
+                max_finished=config.get('MAX_FINISHED', 1000),
+                retention=config.get('RETENTION', 3600.0),
+            )
+        return _registry
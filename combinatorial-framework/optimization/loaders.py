@@ -0,0 +1,305 @@
+"""
+Loaders for standard benchmark instance files.
+
+- TSPLIB ``.tsp`` files with EUC_2D or CEIL_2D coordinates (loaded as
+  coordinates with the matching metric) or EXPLICIT edge weights in any
+  of the TSPLIB matrix layouts (loaded as a distance matrix), and TSPLIB
+  ``.tour`` files such as the published ``.opt.tour`` optima.
+- Pisinger's knapsack instances: the files of his benchmark sets
+  (``knapPI_*``, several instances per file, each with its optimum and an
+  optimal solution) and the output of his generators (``n``, one
+  ``i p w`` line per item, then the capacity).
+
+Header lines are read one at a time, but numeric sections are read in
+large chunks and each chunk is parsed by NumPy at once, so loading does
+not create a Python object per number. Sources can be paths, bytes (e.g. a
+request body) or binary file objects.
+"""
+import io
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Bytes read at a time from numeric sections
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# TSPLIB edge weight types supported as coordinate metrics
+TSPLIB_METRICS = {'EUC_2D': 'euc_2d', 'CEIL_2D': 'ceil_2d'}
+
+# Numeric sections end at the next keyword line (TSPLIB) or at the dashed
+# line separating instances (Pisinger)
+_KEYWORD = re.compile(rb'^[ \t]*[A-Za-z]', re.M)
+_SEPARATOR = re.compile(rb'^[ \t]*(?:[A-Za-z]|--)', re.M)
+_NUMERIC = b'0123456789eE.+- \t\r\n'
+
+
+@contextmanager
+def _open(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif hasattr(source, 'read'):
+        yield source
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+def _parse_numbers(block: bytes, separator: bytes = b'') -> np.ndarray:
+    if separator:
+        block = block.replace(separator, b' ')
+    # Deleting the expected bytes is much faster than a regex search
+    invalid = block.translate(None, _NUMERIC)
+    if invalid:
+        raise ValueError(f'Unexpected character {invalid[:1].decode("latin-1")!r} in a numeric section')
+    return np.fromstring(block, dtype=np.float64, sep=' ')
+
+
+class _Reader:
+    """Reads header lines one by one and numeric sections chunk by chunk."""
+
+    def __init__(self, stream, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = b''
+        self.exhausted = False
+
+    def _fill(self) -> bool:
+        if self.exhausted:
+            return False
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self.exhausted = True
+            return False
+        self.buffer += data
+        return True
+
+    def readline(self) -> Optional[str]:
+        """The next non-blank line, stripped, or None at the end of the input."""
+        while True:
+            end = self.buffer.find(b'\n')
+            if end < 0 and self._fill():
+                continue
+            if end < 0:
+                line, self.buffer = self.buffer, b''
+            else:
+                line, self.buffer = self.buffer[:end], self.buffer[end + 1:]
+            text = line.decode('latin-1').strip()
+            if text or end < 0:
+                return text or None
+
+    def unread(self, line: str) -> None:
+        self.buffer = line.encode('latin-1') + b'\n' + self.buffer
+
+    def numbers(self, stop: 're.Pattern', separator: bytes = b'') -> np.ndarray:
+        """All numbers up to the next line matching ``stop`` or the end of the input."""
+        parts = []
+        while True:
+            # Only complete lines are parsed, so no number is split between chunks
+            cut = len(self.buffer) if self.exhausted else self.buffer.rfind(b'\n') + 1
+            block = self.buffer[:cut]
+            match = stop.search(block)
+            if match:
+                parts.append(_parse_numbers(block[:match.start()], separator))
+                self.buffer = self.buffer[match.start():]
+                break
+            parts.append(_parse_numbers(block, separator))
+            self.buffer = self.buffer[cut:]
+            if not self._fill() and not self.buffer:
+                break
+        return np.concatenate(parts)
+
+
+def _read_tsplib(source, chunk_size: int) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+    """The specification entries and the numeric sections of a TSPLIB file."""
+    specification, sections = {}, {}
+    with _open(source) as stream:
+        reader = _Reader(stream, chunk_size)
+        while True:
+            line = reader.readline()
+            if line is None or line.upper() == 'EOF':
+                break
+            keyword, colon, value = line.partition(':')
+            keyword = keyword.strip().upper()
+            if keyword.endswith('_SECTION'):
+                sections[keyword] = reader.numbers(_KEYWORD)
+            elif colon:
+                specification[keyword] = value.strip()
+            else:
+                parts = line.split(None, 1)
+                if len(parts) != 2:
+                    raise ValueError(f'Unexpected line in TSPLIB file: {line}')
+                specification[parts[0].upper()] = parts[1]
+    return specification, sections
+
+
+def _dimension(specification: Dict[str, str]) -> int:
+    try:
+        n = int(specification['DIMENSION'])
+    except (KeyError, ValueError):
+        raise ValueError('TSPLIB file needs a valid DIMENSION')
+    if n <= 0:
+        raise ValueError('TSPLIB file needs a valid DIMENSION')
+    return n
+
+
+def _explicit_matrix(weights: Optional[np.ndarray], n: int, layout: str) -> np.ndarray:
+    if weights is None:
+        raise ValueError('EXPLICIT TSPLIB file has no EDGE_WEIGHT_SECTION')
+    # Column-wise layouts list a symmetric matrix in the order of the
+    # opposite row-wise triangle
+    layout = {'UPPER_COL': 'LOWER_ROW', 'LOWER_COL': 'UPPER_ROW',
+              'UPPER_DIAG_COL': 'LOWER_DIAG_ROW', 'LOWER_DIAG_COL': 'UPPER_DIAG_ROW'}.get(layout, layout)
+    if layout == 'FULL_MATRIX':
+        if len(weights) != n * n:
+            raise ValueError(f'FULL_MATRIX needs {n * n} edge weights, got {len(weights)}')
+        matrix = weights.reshape(n, n).copy()
+    else:
+        triangles = {
+            'UPPER_ROW': lambda: np.triu_indices(n, 1),
+            'LOWER_ROW': lambda: np.tril_indices(n, -1),
+            'UPPER_DIAG_ROW': lambda: np.triu_indices(n),
+            'LOWER_DIAG_ROW': lambda: np.tril_indices(n),
+        }
+        if layout not in triangles:
+            raise ValueError(f'Unsupported EDGE_WEIGHT_FORMAT: {layout}')
+        rows, cols = triangles[layout]()
+        if len(weights) != len(rows):
+            raise ValueError(f'{layout} needs {len(rows)} edge weights, got {len(weights)}')
+        matrix = np.empty((n, n), dtype=np.float64)
+        matrix[rows, cols] = weights
+        matrix[cols, rows] = weights
+    # ATSP files put large values on the diagonal to forbid loops
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def load_tsplib(source, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Load a TSPLIB TSP or ATSP file as a problem instance.
+
+    Returns {'coordinates': (n, 2) array, 'metric': ...} for EUC_2D and
+    CEIL_2D files (nodes are ordered by their id) and {'distances': (n, n)
+    array} for EXPLICIT ones. Raises ValueError for malformed files and
+    for edge weight types without a matching metric (e.g. GEO, ATT).
+    """
+    specification, sections = _read_tsplib(source, chunk_size)
+    kind = (specification.get('TYPE') or 'TSP').split()[0].upper()
+    if kind not in ('TSP', 'ATSP'):
+        raise ValueError(f'Unsupported TSPLIB TYPE: {kind}')
+    n = _dimension(specification)
+    weight_type = specification.get('EDGE_WEIGHT_TYPE', '').upper()
+    if weight_type == 'EXPLICIT':
+        layout = specification.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper()
+        return {'distances': _explicit_matrix(sections.get('EDGE_WEIGHT_SECTION'), n, layout)}
+    if weight_type not in TSPLIB_METRICS:
+        raise ValueError(f'Unsupported EDGE_WEIGHT_TYPE: {weight_type or "(none)"}')
+
+    nodes = sections.get('NODE_COORD_SECTION')
+    if nodes is None or len(nodes) != 3 * n:
+        raise ValueError(f'NODE_COORD_SECTION needs {n} lines of id, x and y')
+    nodes = nodes.reshape(n, 3)
+    index = nodes[:, 0].astype(np.int64) - 1
+    if index.min() < 0 or index.max() >= n or np.bincount(index, minlength=n).max() > 1:
+        raise ValueError(f'Node ids must be 1 to {n}, each once')
+    coordinates = np.empty((n, 2), dtype=np.float64)
+    coordinates[index] = nodes[:, 1:]
+    return {'coordinates': coordinates, 'metric': TSPLIB_METRICS[weight_type]}
+
+
+def load_tsplib_tour(source, chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """
+    Load the first tour of a TSPLIB tour file (e.g. an ``.opt.tour``).
+
+    Returns the closed path as 0-based city indices, the way the solvers
+    report it (the first city repeated at the end).
+    """
+    specification, sections = _read_tsplib(source, chunk_size)
+    if 'TOUR_SECTION' not in sections:
+        raise ValueError('TSPLIB tour file has no TOUR_SECTION')
+    ids = sections['TOUR_SECTION']
+    # Each tour is terminated by -1
+    end = np.flatnonzero(ids == -1)
+    tour = ids[:end[0]] if len(end) else ids
+    tour = tour.astype(np.int64) - 1
+    n = _dimension(specification) if 'DIMENSION' in specification else len(tour)
+    if len(tour) != n or len(tour) == 0 or tour.min() < 0 or tour.max() >= n \
+            or np.bincount(tour, minlength=n).max() > 1:
+        raise ValueError(f'Tour must visit each of the {n} cities once')
+    return np.append(tour, tour[0])
+
+
+def _knapsack_entry(name: Optional[str], values: np.ndarray, weights: np.ndarray, capacity: float,
+                    optimum: Optional[float] = None, selected: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    return {
+        'name': name,
+        'problem_instance': {'weights': weights, 'values': values, 'capacity': float(capacity)},
+        'optimum': optimum,
+        'selected_items': selected,
+    }
+
+
+def load_pisinger(source, chunk_size: int = CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """
+    Load every instance of a file in one of Pisinger's knapsack formats.
+
+    Each entry has the instance's 'name' (None for generator output), the
+    'problem_instance' (weights, values and capacity) and, when the file
+    records them, the 'optimum' value and the 'selected_items' of an
+    optimal solution (else None).
+    """
+    with _open(source) as stream:
+        reader = _Reader(stream, chunk_size)
+        line = reader.readline()
+        if line is None:
+            raise ValueError('Knapsack file is empty')
+
+        if re.fullmatch(r'\d+', line):
+            # Generator output: n, then "i p w" per item, then the capacity
+            n = int(line)
+            numbers = reader.numbers(_SEPARATOR)
+            if len(numbers) != 3 * n + 1:
+                raise ValueError(f'Expected {n} items and a capacity')
+            items = numbers[:-1].reshape(n, 3)
+            return [_knapsack_entry(None, items[:, 1], items[:, 2], numbers[-1])]
+
+        instances = []
+        while line is not None:
+            name, header = line, {}
+            while True:
+                line = reader.readline()
+                key, _, value = (line or '').partition(' ')
+                if key not in ('n', 'c', 'z', 'time'):
+                    break
+                header[key] = value.strip()
+            if line is not None:
+                reader.unread(line)
+            if 'n' not in header or 'c' not in header:
+                raise ValueError(f'Instance {name} needs "n" and "c" lines')
+
+            n = int(header['n'])
+            # Items are "i,p,w,x" lines, x marking an optimal solution
+            items = reader.numbers(_SEPARATOR, separator=b',')
+            if len(items) != 4 * n:
+                raise ValueError(f'Instance {name} needs {n} lines of i, p, w and x')
+            items = items.reshape(n, 4)
+            optimum = float(header['z']) if 'z' in header else None
+            selected = np.flatnonzero(items[:, 3]) if optimum is not None else None
+            instances.append(_knapsack_entry(name, items[:, 1].copy(), items[:, 2].copy(),
+                                             float(header['c']), optimum, selected))
+
+            line = reader.readline()
+            if line is not None and line.startswith('--'):
+                line = reader.readline()
+        return instances
+
+
+def select_pisinger(instances: List[Dict[str, Any]], name: Optional[str] = None) -> Dict[str, Any]:
+    """The problem instance with the given name, or the first one."""
+    if name is None:
+        return instances[0]['problem_instance']
+    for entry in instances:
+        if entry['name'] == name:
+            return entry['problem_instance']
+    raise ValueError(f'No instance named {name}')
+
@@ -0,0 +1,169 @@
+"""
+Solver metrics in the Prometheus text exposition format.
+
+The views record every solve here: its outcome, the duration of each phase
+(parsing, matrix building, solving, validation, serialization and the
+strategies' own sub-phases), the strategies' search counters and the peak
+memory of the worker that ran it. GET /metrics renders the registry. Each
+server process keeps its own registry, so deployments running several
+processes scrape each of them (or aggregate by instance label).
+"""
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Upper bounds of the phase duration histogram buckets, in seconds
+DEFAULT_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                        1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Upper bounds of the peak memory histogram buckets, in bytes (1 MiB to 16 GiB)
+DEFAULT_MEMORY_BUCKETS = tuple(float(2 ** exponent) for exponent in range(20, 35, 2))
+
+PREFIX = 'combi_opt'
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, label_names: Tuple[str, ...], label_values: Tuple[Any, ...]):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts + [self.count - sum(self.counts)]):
+            cumulative += count
+            labels = _labels(label_names, label_values, 'le="%s"' % _number(bound))
+            yield f'{name}_bucket{labels} {cumulative}'
+        labels = _labels(label_names, label_values)
+        yield f'{name}_sum{labels} {_number(self.sum)}'
+        yield f'{name}_count{labels} {self.count}'
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms of solves, keyed by problem and strategy."""
+
+    def __init__(self, time_buckets: Iterable[float] = DEFAULT_TIME_BUCKETS,
+                 memory_buckets: Iterable[float] = DEFAULT_MEMORY_BUCKETS):
+        self.time_buckets = tuple(time_buckets)
+        self.memory_buckets = tuple(memory_buckets)
+        self._lock = threading.Lock()
+        self._solves: Dict[Tuple[str, str, str], int] = {}
+        self._phases: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], int] = {}
+        self._memory: Dict[Tuple[str, str, str], _Histogram] = {}
+
+    def observe_solve(self, problem: str, strategy: str, outcome: str,
+                      instrumentation: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record one solve.
+
+        Args:
+            outcome: 'ok', 'cached' or 'error'
+            instrumentation: Instrumentation.to_dict() of the solve, if any
+        """
+        with self._lock:
+            key = (problem, strategy, outcome)
+            self._solves[key] = self._solves.get(key, 0) + 1
+            if not instrumentation:
+                return
+            for phase, seconds in instrumentation.get('phases', {}).items():
+                self._observe(self._phases, (problem, strategy, phase), seconds, self.time_buckets)
+            for counter, value in instrumentation.get('counters', {}).items():
+                key = (problem, strategy, counter)
+                self._counters[key] = self._counters.get(key, 0) + value
+            for kind, value in instrumentation.get('memory', {}).items():
+                self._observe(self._memory, (problem, strategy, kind), value, self.memory_buckets)
+
+    def observe_phase(self, problem: str, strategy: str, phase: str, seconds: float) -> None:
+        """Record a phase timed after the solve was recorded (e.g. serialization)."""
+        with self._lock:
+            self._observe(self._phases, (problem, strategy, phase), seconds, self.time_buckets)
+
+    @staticmethod
+    def _observe(histograms: Dict, key: Tuple, value: float, buckets: Tuple[float, ...]) -> None:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """
+        The registry in the Prometheus text format (version 0.0.4).
+
+        ``gauges`` adds point-in-time values such as cache occupancy, as
+        {metric name: (help text, value)}; names get the 'combi_opt_' prefix.
+        """
+        lines = []
+        with self._lock:
+            name = f'{PREFIX}_solves_total'
+            lines += [f'# HELP {name} Solve requests by outcome (ok, cached or error).',
+                      f'# TYPE {name} counter']
+            for key, value in sorted(self._solves.items()):
+                lines.append(f'{name}{_labels(("problem", "strategy", "outcome"), key)} {value}')
+
+            name = f'{PREFIX}_phase_seconds'
+            lines += [f'# HELP {name} Duration of request phases; nested strategy phases are '
+                      f'named outer/inner.', f'# TYPE {name} histogram']
+            for key, histogram in sorted(self._phases.items()):
+                lines.extend(histogram.lines(name, ('problem', 'strategy', 'phase'), key))
+
+            name = f'{PREFIX}_solver_events_total'
+            lines += [f'# HELP {name} Search counters reported by the strategies (nodes expanded, '
+                      f'states stored, memo hits, pruned branches, ...).', f'# TYPE {name} counter']
+            for key, value in sorted(self._counters.items()):
+                lines.append(f'{name}{_labels(("problem", "strategy", "counter"), key)} {value}')
+
+            name = f'{PREFIX}_solve_memory_bytes'
+            lines += [f'# HELP {name} Peak memory of solves: worker peak RSS, and traced Python '
+                      f'allocations for profiled requests.', f'# TYPE {name} histogram']
+            for key, histogram in sorted(self._memory.items()):
+                lines.extend(histogram.lines(name, ('problem', 'strategy', 'kind'), key))
+
+        for gauge, (help_text, value) in sorted((gauges or {}).items()):
+            name = f'{PREFIX}_{gauge}'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {_number(value)}']
+        return '\n'.join(lines) + '\n'
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """The process-wide registry, configured from the SOLVER_METRICS setting."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from django.conf import settings
+            config = getattr(settings, 'SOLVER_METRICS', {})
+            _registry = MetricsRegistry(
+                time_buckets=config.get('TIME_BUCKETS', DEFAULT_TIME_BUCKETS),
+                memory_buckets=config.get('MEMORY_BUCKETS', DEFAULT_MEMORY_BUCKETS),
+            )
+        return _registry
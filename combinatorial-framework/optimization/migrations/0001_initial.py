@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:40
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ProblemInstance",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "problem",
+                    models.CharField(
+                        choices=[
+                            ("tsp", "Travelling salesman"),
+                            ("knapsack", "Knapsack"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("digest", models.CharField(db_index=True, max_length=64)),
+                ("arrays", models.JSONField(default=dict)),
+                ("options", models.JSONField(default=dict)),
+                ("size_bytes", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(auto_now_add=True, db_index=True),
+                ),
+            ],
+            options={
+                "ordering": ["last_used_at"],
+            },
+        ),
+    ]
@@ -1,3 +1,34 @@
-from django.db import models
-
-# Create your models here.
+import uuid
+from django.db import models
+
+
+class ProblemInstance(models.Model):
+    """
+    A problem instance kept on the server so it is uploaded only once.
+
+    The arrays live as .npy files in the instance store (see instances.py);
+    this row records where, what they hold and when they were last used.
+    """
+
+    PROBLEM_CHOICES = [
+        ('tsp', 'Travelling salesman'),
+        ('knapsack', 'Knapsack'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    problem = models.CharField(max_length=16, choices=PROBLEM_CHOICES)
+    # sha256 of the instance, so uploading the same data again reuses it
+    digest = models.CharField(max_length=64, db_index=True)
+    # {field: {'dtype': ..., 'shape': [...]}} for every stored array
+    arrays = models.JSONField(default=dict)
+    # Scalar fields of the instance, e.g. capacity or metric
+    options = models.JSONField(default=dict)
+    size_bytes = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['last_used_at']
+
+    def __str__(self):
+        return f'{self.problem} instance {self.id}'
@@ -0,0 +1,221 @@
+"""
+Decoding of problem payloads and encoding of solutions by media type.
+
+JSON stays the default, and any other content type is still read as JSON
+(so e.g. form-encoded curl requests keep working). Large instances can
+instead be sent in a binary format whose arrays are mapped with
+np.frombuffer straight onto the request body, without building a Python
+object per number:
+
+- application/x-npy: one .npy array. For TSP it is the distance matrix, or
+  the coordinates when the query string has field=coordinates; for knapsack
+  a (2, n) array of weights and values.
+- application/msgpack: a map of fields; arrays are maps with 'dtype' (a
+  NumPy dtype string such as '<f8'), 'shape' and 'data' (raw bytes).
+- application/vnd.apache.arrow.stream: an Arrow IPC stream whose columns
+  are fields; fixed-size-list columns become 2-D arrays and TSP coordinates
+  may be given as 'x' and 'y' columns.
+
+Standard benchmark files can be posted as they are, and are parsed by the
+chunked loaders of optimization.loaders:
+
+- application/x-tsplib: a TSPLIB .tsp file (TSP only).
+- application/x-pisinger: a file of Pisinger's knapsack instances; the one
+  named by 'name' in the query string is solved, else the first.
+
+Scalar options (strategy, capacity, metric, timeout, ...) travel in the
+query string for every non-JSON format; msgpack maps may also carry them.
+msgpack and pyarrow are optional dependencies: without them those formats
+are answered with 415 Unsupported Media Type.
+"""
+import io
+import json
+from typing import Any, Dict, Optional
+import numpy as np
+from django.http import HttpResponse, JsonResponse
+
+from .loaders import load_pisinger, load_tsplib, select_pisinger
+
+JSON = 'application/json'
+NPY = 'application/x-npy'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+TSPLIB = 'application/x-tsplib'
+PISINGER = 'application/x-pisinger'
+
+# Alternative names clients commonly send
+ALIASES = {
+    'application/x-msgpack': MSGPACK,
+    'application/vnd.msgpack': MSGPACK,
+    'text/x-tsplib': TSPLIB,
+    'text/x-pisinger': PISINGER,
+}
+
+BINARY_FORMATS = (NPY, MSGPACK, ARROW)
+
+# Accepted in requests only; solutions are never encoded in these
+FILE_FORMATS = (TSPLIB, PISINGER)
+
+# Response fields holding the solution itself, sent as the binary body
+ARRAY_FIELDS = ('path', 'selected_items')
+
+
+class UnsupportedMediaType(Exception):
+    """Raised for a binary format whose library is not installed."""
+
+
+def media_type(header: Optional[str]) -> str:
+    """The binary or file format named by a Content-Type or Accept entry, else JSON."""
+    value = (header or '').split(';')[0].strip().lower()
+    value = ALIASES.get(value, value)
+    return value if value in BINARY_FORMATS + FILE_FORMATS else JSON
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedMediaType('msgpack payloads need the msgpack package')
+    return msgpack
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError:
+        raise UnsupportedMediaType('Arrow payloads need the pyarrow package')
+    return pyarrow
+
+
+def _query_options(query) -> Dict[str, Any]:
+    """Query parameters, with JSON literals (numbers, true/false) decoded."""
+    options = {}
+    for key, value in query.items():
+        try:
+            options[key] = json.loads(value)
+        except ValueError:
+            options[key] = value
+    return options
+
+
+def load_npy(buffer) -> np.ndarray:
+    """Read-only view of a .npy payload; only the header is parsed."""
+    stream = io.BytesIO(buffer)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        raise ValueError(f'Unsupported .npy format version {version}')
+    if dtype.hasobject:
+        raise ValueError('Object arrays are not accepted')
+    count = int(np.prod(shape))
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def _typed_array(value: Any) -> Any:
+    if isinstance(value, dict) and {'dtype', 'shape', 'data'} <= value.keys():
+        dtype = np.dtype(value['dtype'])
+        if dtype.hasobject:
+            raise ValueError('Object arrays are not accepted')
+        return np.frombuffer(value['data'], dtype=dtype).reshape(value['shape'])
+    return value
+
+
+def _arrow_column(column) -> np.ndarray:
+    pyarrow = _pyarrow()
+    array = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+    if pyarrow.types.is_fixed_size_list(array.type):
+        width = array.type.list_size
+        return array.flatten().to_numpy(zero_copy_only=False).reshape(-1, width)
+    return array.to_numpy(zero_copy_only=False)
+
+
+def decode_request(request, problem: str) -> Dict[str, Any]:
+    """
+    Request data as a dictionary of fields, whatever the body's media type.
+
+    Raises UnsupportedMediaType when the format's library is missing and
+    ValueError for malformed bodies.
+    """
+    fmt = media_type(request.content_type)
+    if fmt == JSON:
+        return json.loads(request.body)
+
+    data = _query_options(request.GET)
+    if fmt == NPY:
+        array = load_npy(request.body)
+        if problem == 'knapsack':
+            if array.ndim != 2 or array.shape[0] != 2:
+                raise ValueError('Knapsack .npy payloads must be a (2, n) array of weights and values')
+            data['weights'], data['values'] = array[0], array[1]
+        else:
+            data[data.pop('field', 'distances')] = array
+    elif fmt == MSGPACK:
+        body = _msgpack().unpackb(request.body, raw=False)
+        if not isinstance(body, dict):
+            raise ValueError('msgpack payloads must be a map of fields')
+        data.update({key: _typed_array(value) for key, value in body.items()})
+    elif fmt == TSPLIB:
+        if problem != 'tsp':
+            raise ValueError('TSPLIB payloads hold TSP instances')
+        data.update(load_tsplib(request.body))
+    elif fmt == PISINGER:
+        if problem != 'knapsack':
+            raise ValueError('Pisinger payloads hold knapsack instances')
+        name = data.pop('name', None)
+        data.update(select_pisinger(load_pisinger(request.body), None if name is None else str(name)))
+    else:
+        pyarrow = _pyarrow()
+        table = pyarrow.ipc.open_stream(pyarrow.py_buffer(request.body)).read_all()
+        columns = {name: _arrow_column(table.column(name)) for name in table.column_names}
+        if 'x' in columns and 'y' in columns:
+            columns['coordinates'] = np.column_stack([columns.pop('x'), columns.pop('y')])
+        data.update(columns)
+    return data
+
+
+def response_format(request) -> str:
+    """Reply in the request's binary format when the client accepts it, else JSON."""
+    fmt = media_type(request.content_type)
+    accept = [media_type(item) for item in request.headers.get('Accept', '').split(',')]
+    return fmt if fmt in BINARY_FORMATS and fmt in accept else JSON
+
+
+def encode_response(payload: Dict[str, Any], fmt: str, status: int = 200) -> HttpResponse:
+    """
+    Encode a solution payload.
+
+    The solution array ('path' or 'selected_items') is sent as int64 data;
+    .npy responses carry the other fields as X-Solution-* headers and Arrow
+    responses as schema metadata.
+    """
+    if fmt == JSON:
+        return JsonResponse(payload, status=status)
+
+    field = next(key for key in ARRAY_FIELDS if key in payload)
+    array = np.asarray(payload[field], dtype=np.int64)
+    scalars = {key: value for key, value in payload.items() if key != field}
+
+    if fmt == NPY:
+        body = io.BytesIO()
+        np.lib.format.write_array(body, array, allow_pickle=False)
+        response = HttpResponse(body.getvalue(), content_type=NPY, status=status)
+        response['X-Solution-Field'] = field
+        for key, value in scalars.items():
+            response[f"X-Solution-{key.replace('_', '-').title()}"] = json.dumps(value)
+        return response
+    if fmt == MSGPACK:
+        body = {**scalars, field: {'dtype': array.dtype.str, 'shape': list(array.shape), 'data': array.tobytes()}}
+        return HttpResponse(_msgpack().packb(body, use_bin_type=True), content_type=MSGPACK, status=status)
+
+    pyarrow = _pyarrow()
+    table = pyarrow.table({field: array}).replace_schema_metadata(
+        {key: json.dumps(value) for key, value in scalars.items()})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return HttpResponse(sink.getvalue().to_pybytes(), content_type=ARROW, status=status)
@@ -0,0 +1,216 @@
+"""
+On-demand profiles of individual solves.
+
+A tsp/ or knapsack/ request that sends the X-Solver-Profile header (or the
+'capture' query parameter) with one of CAPTURE_MODES runs its solve under
+that profiler in the pool worker:
+
+- 'cprofile' records every call with cProfile and is saved as a .pstats
+  file, readable with pstats or snakeviz;
+- 'sampling' records the solving thread's stack every few milliseconds
+  from a second thread and is saved in the collapsed-stack format of
+  flamegraph.pl and speedscope. Its overhead does not grow with the
+  number of calls, so it suits hot paths that cProfile would distort.
+
+Captures are only accepted when enabled (by default in DEBUG) and within
+a rate limit, so they can be taken on live traffic without letting a burst
+of profiled requests slow the server down. The newest files are kept on
+local disk and served by id.
+"""
+import cProfile
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Capture mode -> extension of the saved file
+CAPTURE_MODES = {'cprofile': '.pstats', 'sampling': '.collapsed'}
+
+_CAPTURE_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class CaptureRejected(Exception):
+    """A capture that is disabled, unknown or over the rate limit; carries the HTTP status."""
+
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class SamplingProfiler:
+    """
+    Counts the stacks of the thread that entered it, sampled from a
+    background thread every ``interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _sample(self) -> None:
+        names: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = names.get(code)
+                if name is None:
+                    name = names[code] = (f'{code.co_name} '
+                                          f'({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                stack.append(name)
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def collapsed(self) -> bytes:
+        """The samples as 'frame;frame;... count' lines, outermost frame first."""
+        lines = [f'{stack} {count}' for stack, count in sorted(self.samples.items())]
+        return ('\n'.join(lines) + '\n').encode() if lines else b''
+
+
+def run_captured(mode: str, interval: float, fn: Callable, *args) -> Tuple[Any, bytes]:
+    """
+    Run fn(*args) under the profiler ``mode`` (inside the pool worker).
+
+    Returns:
+        fn's result and the capture, as the content of its file
+    """
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args)
+        profiler.create_stats()
+        # What Profile.dump_stats writes, without going through a file
+        return result, marshal.dumps(profiler.stats)
+    with SamplingProfiler(interval) as sampler:
+        result = fn(*args)
+    return result, sampler.collapsed()
+
+
+class RateLimiter:
+    """At most ``rate`` acquisitions in any ``period`` seconds."""
+
+    def __init__(self, rate: int, period: float):
+        self.rate = rate
+        self.period = period
+        self._times: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[float]:
+        """None when granted, otherwise the seconds until a slot frees up."""
+        with self._lock:
+            now = time.monotonic()
+            while self._times and now - self._times[0] >= self.period:
+                self._times.popleft()
+            if len(self._times) >= self.rate:
+                return self.period - (now - self._times[0])
+            self._times.append(now)
+            return None
+
+
+class ProfileCaptures:
+    """
+    Admission and local storage of profile captures.
+
+    Args:
+        root: Directory the capture files are written to
+        enabled: Whether captures are accepted at all
+        rate: Captures accepted per ``period`` seconds
+        period: Length of the rate limit window
+        max_files: Captures kept; the oldest are deleted
+        sample_interval: Seconds between samples of the sampling profiler
+    """
+
+    def __init__(self, root, enabled: bool = True, rate: int = 6, period: float = 60.0,
+                 max_files: int = 100, sample_interval: float = 0.005):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.max_files = max_files
+        self.sample_interval = sample_interval
+        self.limiter = RateLimiter(rate, period)
+        self._lock = threading.Lock()
+
+    def admit(self, mode: str) -> None:
+        """Take a slot for a capture in ``mode``, or raise CaptureRejected."""
+        if not self.enabled:
+            raise CaptureRejected('Profile captures are disabled on this server', 403)
+        if mode not in CAPTURE_MODES:
+            raise CaptureRejected(f'Capture mode must be one of {", ".join(CAPTURE_MODES)}', 400)
+        retry_after = self.limiter.acquire()
+        if retry_after is not None:
+            raise CaptureRejected('Too many profile captures, please retry later', 429, retry_after)
+
+    def save(self, mode: str, content: bytes) -> str:
+        """Write a capture and return its id."""
+        capture_id = uuid.uuid4().hex
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f'{capture_id}{CAPTURE_MODES[mode]}'
+        partial = path.with_name(path.name + '.tmp')
+        partial.write_bytes(content)
+        os.replace(partial, path)
+        self._prune()
+        return capture_id
+
+    def path(self, capture_id: str) -> Optional[Path]:
+        """The file of a stored capture, or None."""
+        if not _CAPTURE_ID.fullmatch(capture_id):
+            return None
+        for extension in CAPTURE_MODES.values():
+            path = self.root / f'{capture_id}{extension}'
+            if path.exists():
+                return path
+        return None
+
+    def _prune(self) -> None:
+        with self._lock:
+            files = [path for path in self.root.iterdir() if path.suffix in CAPTURE_MODES.values()]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=lambda path: path.stat().st_mtime)
+            for path in files[:len(files) - self.max_files]:
+                path.unlink(missing_ok=True)
+
+
+_captures: Optional[ProfileCaptures] = None
+_captures_lock = threading.Lock()
+
+
+def get_captures() -> ProfileCaptures:
+    """The process-wide captures, configured from the SOLVER_PROFILING setting."""
+    global _captures
+    with _captures_lock:
+        if _captures is None:
+            from django.conf import settings
+            config = getattr(settings, 'SOLVER_PROFILING', {})
+            _captures = ProfileCaptures(
+                root=config.get('ROOT', Path(settings.BASE_DIR) / 'profiles'),
+                enabled=config.get('ENABLED', settings.DEBUG),
+                rate=config.get('RATE', 6),
+                period=config.get('PERIOD', 60.0),
+                max_files=config.get('MAX_FILES', 100),
+                sample_interval=config.get('SAMPLE_INTERVAL', 0.005),
+            )
+        return _captures
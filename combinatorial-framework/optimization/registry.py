@@ -0,0 +1,337 @@
+"""
+Registry of the solver strategies, and automatic strategy selection.
+
+Every strategy is registered once per problem with:
+
+- a factory building its solver as configured in the settings, which
+  raises UnsuitableStrategy when the strategy is unsuitable for an
+  instance (too many cities for backtracking, a table over the memory
+  budget, ...);
+- a work measure: the logarithm of the size its cost grows with (cities,
+  Held-Karp states, permutations, knapsack table cells, ...);
+- flags: whether it works from coordinates alone, and whether it ends
+  with local search itself.
+
+Requests with the strategy 'auto' get the strategy chosen by select(). It
+predicts the runtime and peak memory of every suitable strategy from cost
+models: power laws in the work measure, fitted by calibrate() to the
+results of benchmarks/suite.py. The models also record each strategy's
+mean gap to the optimum in those benchmarks. Among the strategies
+expected to finish within the time budget (with a safety factor to spare)
+and memory limit, select() keeps those of the best quality and picks the
+fastest of them. Exact strategies (no gap) are a tier of their own, ahead
+of approximate ones however close those come.
+"""
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .algorithms.knapsack_solver import (
+    KnapsackGreedy, KnapsackDynamic, KnapsackBacktracking, KnapsackBranchAndBound, KnapsackFPTAS, KnapsackCore
+)
+from .algorithms.tsp_solver import (
+    TSPGreedy, TSPTwoOpt, TSPDynamic, TSPBacktracking, TSPBranchAndBound, TSPAnytime, TSPDivideAndConquer,
+    num_cities
+)
+
+# Cost models shipped with the code, calibrated with benchmarks/calibrate.py
+DEFAULT_COST_MODELS = Path(__file__).resolve().parent / 'cost_models.json'
+
+# Expected gaps to the optimum closer than this count as the same quality,
+# among approximate strategies
+GAP_TOLERANCE = 1e-4
+
+# Strategy used when no cost model applies
+FALLBACK = 'greedy'
+
+
+class UnsuitableStrategy(ValueError):
+    """A strategy that is unknown, or unsuitable for the instance it was asked to solve."""
+
+
+class Strategy:
+    """
+    A registered strategy.
+
+    Args:
+        problem: 'tsp' or 'knapsack'
+        name: Strategy name used in requests
+        factory: Builds the configured solver for an instance; raises
+            UnsuitableStrategy if the strategy is unsuitable for it
+        work: Log of the size measure the strategy's cost grows with
+        coordinates: Works from coordinates without the distance matrix
+        local_search: Ends with local search, so 'improve' is moot
+    """
+
+    def __init__(self, problem: str, name: str, factory: Callable[[Dict[str, Any]], Any],
+                 work: Callable[[Dict[str, Any]], float], coordinates: bool = False,
+                 local_search: bool = False):
+        self.problem = problem
+        self.name = name
+        self.factory = factory
+        self.work = work
+        self.coordinates = coordinates
+        self.local_search = local_search
+
+
+def _log_cities(problem_instance):
+    return math.log(max(num_cities(problem_instance), 1))
+
+
+def _log_held_karp_states(problem_instance):
+    m = max(num_cities(problem_instance) - 1, 1)
+    return m * math.log(2) + 2 * math.log(m)
+
+
+def _log_permutations(problem_instance):
+    return math.lgamma(max(num_cities(problem_instance), 1))
+
+
+def _log_tours_bound(problem_instance):
+    return num_cities(problem_instance) * math.log(2)
+
+
+def _log_items(problem_instance):
+    return math.log(max(len(problem_instance['weights']), 1))
+
+
+def _log_item_subsets(problem_instance):
+    return len(problem_instance['weights']) * math.log(2)
+
+
+def _sorting(problem_instance):
+    n = len(problem_instance['weights'])
+    return n * math.log2(n + 1)
+
+
+def _log_dp_cells(problem_instance):
+    # Sorting the items counts too: it dominates when the table is small
+    return math.log(_sorting(problem_instance) + KnapsackDynamic().table_cells(problem_instance) + 1)
+
+
+def _log_fptas_cells(problem_instance):
+    return math.log(_sorting(problem_instance) + KnapsackFPTAS().table_cells(problem_instance) + 1)
+
+
+def _max_dp_cells():
+    return getattr(settings, 'KNAPSACK_DP_MAX_CELLS', 10**9)
+
+
+def _tsp_dynamic(problem_instance):
+    n = num_cities(problem_instance)
+    solver = TSPDynamic(memory_budget=getattr(
+        settings, 'TSP_DP_MEMORY_BUDGET', TSPDynamic.DEFAULT_MEMORY_BUDGET))
+    if not solver.fits_in_budget(n):  # Dynamic programming is exponential
+        raise UnsuitableStrategy(f'Dynamic programming strategy is not suitable for {n} cities '
+                         f'within the configured memory budget')
+    return solver
+
+
+def _tsp_backtracking(problem_instance):
+    if num_cities(problem_instance) > 20:  # Backtracking is factorial time
+        raise UnsuitableStrategy('Backtracking strategy is not suitable for problems with more than 20 cities')
+    return TSPBacktracking()
+
+
+def _tsp_branch_and_bound(problem_instance):
+    if num_cities(problem_instance) > 50:  # Node expansions grow too expensive beyond this
+        raise UnsuitableStrategy('Branch and bound strategy is not suitable for problems with more than 50 cities')
+    return TSPBranchAndBound()
+
+
+def _tsp_divide_and_conquer(problem_instance):
+    if problem_instance.get('coordinates') is None:
+        raise UnsuitableStrategy('Divide and conquer strategy requires coordinates')
+    config = getattr(settings, 'TSP_DIVIDE_AND_CONQUER', {})
+    return TSPDivideAndConquer(cluster_size=config.get('CLUSTER_SIZE', 200),
+                               workers=config.get('WORKERS', 1),
+                               time_limit=config.get('TIME_LIMIT'))
+
+
+def _knapsack_dynamic(problem_instance):
+    # Work grows with items x the smaller of capacity and total value
+    solver = KnapsackDynamic()
+    if solver.table_cells(problem_instance) > _max_dp_cells():
+        raise UnsuitableStrategy('Dynamic programming strategy is not suitable for large problems')
+    return solver
+
+
+def _knapsack_backtracking(problem_instance):
+    if len(problem_instance['weights']) > 30:  # Backtracking is exponential
+        raise UnsuitableStrategy('Backtracking strategy is not suitable for problems with more than 30 items')
+    return KnapsackBacktracking()
+
+
+def _knapsack_fptas(problem_instance):
+    # The table shrinks as epsilon grows; it does not depend on capacity
+    solver = KnapsackFPTAS()
+    if solver.table_cells(problem_instance) > _max_dp_cells():
+        raise UnsuitableStrategy('FPTAS table is too large for this epsilon; use a larger one')
+    return solver
+
+
+STRATEGIES: Dict[str, Dict[str, Strategy]] = {
+    'tsp': {strategy.name: strategy for strategy in (
+        Strategy('tsp', 'greedy', lambda _: TSPGreedy(), _log_cities, coordinates=True),
+        Strategy('tsp', 'two_opt', lambda _: TSPTwoOpt(), _log_cities, coordinates=True, local_search=True),
+        Strategy('tsp', 'dynamic', _tsp_dynamic, _log_held_karp_states),
+        Strategy('tsp', 'backtrack', _tsp_backtracking, _log_permutations),
+        Strategy('tsp', 'branch_bound', _tsp_branch_and_bound, _log_tours_bound),
+        # anytime builds the matrix itself, and only for its exact phase
+        Strategy('tsp', 'anytime', lambda _: TSPAnytime(), _log_cities, coordinates=True, local_search=True),
+        Strategy('tsp', 'divide_conquer', _tsp_divide_and_conquer, _log_cities, coordinates=True,
+                 local_search=True),
+    )},
+    'knapsack': {strategy.name: strategy for strategy in (
+        Strategy('knapsack', 'greedy', lambda _: KnapsackGreedy(), _log_items),
+        Strategy('knapsack', 'dynamic', _knapsack_dynamic, _log_dp_cells),
+        Strategy('knapsack', 'backtrack', _knapsack_backtracking, _log_item_subsets),
+        Strategy('knapsack', 'branch_bound', lambda _: KnapsackBranchAndBound(), _log_items),
+        Strategy('knapsack', 'fptas', _knapsack_fptas, _log_fptas_cells),
+        Strategy('knapsack', 'core', lambda _: KnapsackCore(), _log_items),
+    )},
+}
+
+
+def _fit(log_work: np.ndarray, observed: np.ndarray) -> List[float]:
+    """[intercept, slope] of log(observed) = intercept + slope * log_work, slope >= 0."""
+    log_observed = np.log(np.maximum(observed, 1e-9))
+    slope = 1.0
+    if np.ptp(log_work) > 1e-9:
+        slope = max(float(np.polyfit(log_work, log_observed, 1)[0]), 0.0)
+    intercept = float(np.mean(log_observed - slope * log_work))
+    return [round(intercept, 6), round(slope, 6)]
+
+
+def calibrate(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fit cost models to benchmark results (benchmarks/suite.py entries).
+
+    Entries need the 'log_work' the suite records; invalid solutions are
+    ignored. Returns {problem: {strategy: model}}, each model holding the
+    'time' and 'memory' power laws as [intercept, slope] in log space
+    (memory is None without traced peaks), the mean 'gap' to the
+    reference and the number of 'samples'.
+    """
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for entry in results:
+        if entry.get('log_work') is None or not entry['valid']:
+            continue
+        groups.setdefault((entry['problem'], entry['strategy']), []).append(entry)
+
+    models: Dict[str, Dict[str, Any]] = {}
+    for (problem, strategy), entries in sorted(groups.items()):
+        log_work = np.array([entry['log_work'] for entry in entries])
+        memory = [entry['peak_memory'] for entry in entries]
+        gaps = [max(entry['gap'], 0.0) for entry in entries if entry.get('gap') is not None]
+        models.setdefault(problem, {})[strategy] = {
+            'time': _fit(log_work, np.array([entry['runtime'] for entry in entries])),
+            'memory': _fit(log_work, np.array(memory, dtype=float)) if None not in memory else None,
+            'gap': round(float(np.mean(gaps)), 6) if gaps else None,
+            'samples': len(entries),
+        }
+    return models
+
+
+class SolverRegistry:
+    """
+    The strategies of each problem and their cost models.
+
+    Args:
+        strategies: {problem: {name: Strategy}}
+        models: Cost models as returned by calibrate()
+        safety_factor: A strategy is expected to finish in budget when its
+            predicted runtime times this is within the budget
+    """
+
+    def __init__(self, strategies: Dict[str, Dict[str, Strategy]] = STRATEGIES,
+                 models: Optional[Dict[str, Dict[str, Any]]] = None, safety_factor: float = 2.0):
+        self.strategies = strategies
+        self.models = models or {}
+        self.safety_factor = safety_factor
+
+    def get(self, problem: str, name: str) -> Strategy:
+        strategy = self.strategies.get(problem, {}).get(name)
+        if strategy is None:
+            raise UnsuitableStrategy('Invalid strategy')
+        return strategy
+
+    def create(self, problem: str, name: str, problem_instance: Dict[str, Any]):
+        """The configured solver; raises UnsuitableStrategy if the strategy is unknown or unsuitable."""
+        return self.get(problem, name).factory(problem_instance)
+
+    def estimate(self, problem: str, name: str, problem_instance: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Predicted 'runtime' (s), peak 'memory' (bytes or None) and 'gap'; None without a model."""
+        model = self.models.get(problem, {}).get(name)
+        if model is None:
+            return None
+        log_work = self.get(problem, name).work(problem_instance)
+        intercept, slope = model['time']
+        estimate = {'runtime': math.exp(min(intercept + slope * log_work, 700.0)), 'memory': None,
+                    'gap': model['gap'] if model['gap'] is not None else math.inf}
+        if model.get('memory') is not None:
+            intercept, slope = model['memory']
+            estimate['memory'] = math.exp(min(intercept + slope * log_work, 700.0))
+        return estimate
+
+    def select(self, problem: str, problem_instance: Dict[str, Any], time_budget: float,
+               memory_budget: Optional[float] = None) -> Tuple[str, Any, Optional[Dict[str, Any]]]:
+        """
+        Choose a strategy for an instance.
+
+        Returns the strategy name, its solver and its estimate. When no
+        strategy is expected to fit the budgets, the one predicted to be
+        fastest is chosen; without any model, FALLBACK.
+        """
+        candidates = []
+        for name in self.strategies[problem]:
+            try:
+                estimate = self.estimate(problem, name, problem_instance)
+                if estimate is None:
+                    continue
+                solver = self.create(problem, name, problem_instance)
+            except (ValueError, MemoryError):
+                continue
+            candidates.append((name, solver, estimate))
+        if not candidates:
+            return FALLBACK, self.create(problem, FALLBACK, problem_instance), None
+
+        feasible = [
+            candidate for candidate in candidates
+            if candidate[2]['runtime'] * self.safety_factor <= time_budget
+            and (memory_budget is None or candidate[2]['memory'] is None
+                 or candidate[2]['memory'] <= memory_budget)
+        ]
+        if not feasible:
+            return min(candidates, key=lambda candidate: candidate[2]['runtime'])
+        best_gap = min(candidate[2]['gap'] for candidate in feasible)
+        tolerance = GAP_TOLERANCE if best_gap > 0 else 0.0
+        best = [candidate for candidate in feasible if candidate[2]['gap'] <= best_gap + tolerance]
+        return min(best, key=lambda candidate: candidate[2]['runtime'])
+
+
+def load_cost_models(path) -> Dict[str, Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)['models']
+
+
+_registry: Optional[SolverRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_solvers() -> SolverRegistry:
+    """The process-wide registry, configured from the SOLVER_REGISTRY setting."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            config = getattr(settings, 'SOLVER_REGISTRY', {})
+            _registry = SolverRegistry(
+                models=load_cost_models(config.get('COST_MODELS', DEFAULT_COST_MODELS)),
+                safety_factor=config.get('SAFETY_FACTOR', 2.0),
+            )
+        return _registry
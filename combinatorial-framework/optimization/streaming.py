@@ -0,0 +1,66 @@
+"""
+Helpers for streaming solver progress to HTTP clients.
+
+Progress arrives on solver pool threads; ProgressStream hands it to the
+asyncio event loop that consumes the response, without tying up a thread
+per open stream. Events are encoded either as Server-Sent Events or as
+newline-delimited JSON.
+"""
+import asyncio
+import json
+import queue
+import threading
+from typing import Any, Dict, Optional
+
+FORMATS = ('sse', 'ndjson')
+
+CONTENT_TYPES = {
+    'sse': 'text/event-stream',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ProgressStream:
+    """Thread-safe queue whose consumer waits on an event loop."""
+
+    def __init__(self):
+        self._items: 'queue.SimpleQueue[Optional[Dict[str, Any]]]' = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._waiter = None
+
+    def put(self, item: Optional[Dict[str, Any]]) -> None:
+        """Add an event (None marks the end of the stream); callable from any thread."""
+        self._items.put(item)
+        with self._lock:
+            waiter = self._waiter
+        if waiter is not None:
+            loop, ready = waiter
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # The consuming loop has already closed
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        while True:
+            try:
+                return self._items.get_nowait()
+            except queue.Empty:
+                pass
+            ready = asyncio.Event()
+            with self._lock:
+                self._waiter = (asyncio.get_running_loop(), ready)
+            try:
+                # An item may have arrived before the waiter was registered
+                if self._items.empty():
+                    await ready.wait()
+            finally:
+                with self._lock:
+                    self._waiter = None
+
+
+def encode_event(event: Dict[str, Any], fmt: str) -> str:
+    """Encode an event dictionary with a 'type' key for the wire."""
+    payload = json.dumps(event)
+    if fmt == 'ndjson':
+        return payload + '\n'
+    return f"event: {event['type']}\ndata: {payload}\n\n"
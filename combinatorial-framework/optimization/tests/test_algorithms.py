@@ -1,35 +1,73 @@
-import pytest
-import numpy as np
-from optimization.algorithms.tsp import TSPGreedy, TSPDynamic
-from optimization.algorithms.knapsack import KnapsackGreedy, KnapsackDynamic
-
-def test_tsp_greedy():
-    distances = np.array([
-        [0, 10, 15, 20],
-        [10, 0, 35, 25],
-        [15, 35, 0, 30],
-        [20, 25, 30, 0]
-    ])
-    problem_instance = {'distances': distances}
-    solver = TSPGreedy()
-    solution = solver.solve(problem_instance)
-    
-    assert solver.validate_solution(solution, problem_instance)
-    assert len(solution['path']) == len(distances) + 1  # All cities plus return to start
-    assert solution['path'][0] == solution['path'][-1] == 0  # Start and end at city 0
-
-def test_knapsack_dynamic():
-    weights = [2, 3, 4, 5]
-    values = [3, 4, 5, 6]
-    capacity = 10
-    problem_instance = {
-        'weights': weights,
-        'values': values,
-        'capacity': capacity
-    }
-    solver = KnapsackDynamic()
-    solution = solver.solve(problem_instance)
-    
-    assert solver.validate_solution(solution, problem_instance)
-    assert solution['total_weight'] <= capacity
-    assert all(i < len(weights) for i in solution['selected_items'])
\ No newline at end of file
+import pytest
+import numpy as np
+from benchmarks.generators import GENERATORS
+from benchmarks.suite import STRATEGIES, compare, exact_optimum, measure, objective, relative_gap, run, suitable
+from optimization.algorithms.tsp_solver import TSPGreedy
+from optimization.algorithms.knapsack_solver import KnapsackDynamic
+
+# Strategies guaranteed to return the optimum
+EXACT = {'tsp': {'dynamic', 'backtrack', 'branch_bound'}, 'knapsack': {'dynamic', 'backtrack', 'branch_bound'}}
+
+def test_tsp_greedy():
+    distances = np.array([
+        [0, 10, 15, 20],
+        [10, 0, 35, 25],
+        [15, 35, 0, 30],
+        [20, 25, 30, 0]
+    ])
+    problem_instance = {'distances': distances}
+    solver = TSPGreedy()
+    solution = solver.solve(problem_instance)
+    
+    assert solver.validate_solution(solution, problem_instance)
+    assert len(solution['path']) == len(distances) + 1  # All cities plus return to start
+    assert solution['path'][0] == solution['path'][-1] == 0  # Start and end at city 0
+
+def test_knapsack_dynamic():
+    weights = [2, 3, 4, 5]
+    values = [3, 4, 5, 6]
+    capacity = 10
+    problem_instance = {
+        'weights': weights,
+        'values': values,
+        'capacity': capacity
+    }
+    solver = KnapsackDynamic()
+    solution = solver.solve(problem_instance)
+    
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['total_weight'] <= capacity
+    assert all(i < len(weights) for i in solution['selected_items'])
+
+@pytest.mark.parametrize('problem, family', [
+    (problem, family) for problem, families in GENERATORS.items() for family in families
+])
+def test_every_strategy_on_every_family(problem, family):
+    n = 9 if problem == 'tsp' else 18
+    problem_instance = GENERATORS[problem][family](n, seed=1)
+    optimum = exact_optimum(problem, problem_instance)
+
+    for strategy, (factory, _) in STRATEGIES[problem].items():
+        assert suitable(problem, strategy, n, problem_instance)
+        solver = factory()
+        solution = solver.solve(problem_instance)
+        assert solver.validate_solution(solution, problem_instance), strategy
+        gap = relative_gap(problem, objective(problem, solution), optimum)
+        assert gap >= -1e-9, strategy
+        if strategy in EXACT[problem]:
+            assert gap == pytest.approx(0, abs=1e-9), strategy
+
+def test_measure_solves_at_least_once():
+    problem_instance = GENERATORS['knapsack']['uncorrelated'](10, seed=0)
+    outcome = measure(KnapsackDynamic, problem_instance, repeat=0, trace_memory=False)
+    assert outcome['valid'] and outcome['runtime'] < float('inf')
+
+def test_benchmark_comparison_flags_regressions():
+    baseline = run(['knapsack'], {'knapsack': [30]}, [0], families=['uncorrelated'],
+                   strategies=['greedy', 'dynamic'], log=lambda line: None)
+    assert compare(baseline, baseline) == []
+
+    slower = [{**entry, 'runtime': entry['runtime'] * 3 + 1} for entry in baseline]
+    worse = [{**entry, 'gap': entry['gap'] + 0.1} for entry in baseline]
+    assert len(compare(slower, baseline)) == len(baseline)
+    assert len(compare(worse, baseline)) == len(baseline)
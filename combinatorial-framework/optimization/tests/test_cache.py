@@ -0,0 +1,50 @@
+import numpy as np
+from django.core.cache import caches
+from optimization.cache import SolutionCache, cache_key
+from optimization.algorithms.tsp_solver import TSPBranchAndBound
+
+def test_key_is_canonical_and_covers_solver_settings():
+    distances = [[0, 1, 2], [1, 0, 3], [2, 3, 0]]
+    key = cache_key('tsp', 'branch_bound', TSPBranchAndBound(), {'distances': np.array(distances)})
+
+    assert key == cache_key('tsp', 'branch_bound', TSPBranchAndBound(),
+                            {'distances': np.asfortranarray(distances)})
+    # Arrays are hashed as they are, without converting them to one dtype
+    assert key != cache_key('tsp', 'branch_bound', TSPBranchAndBound(),
+                            {'distances': np.array(distances, dtype=np.float32)})
+    assert key != cache_key('tsp', 'branch_bound', TSPBranchAndBound(max_nodes=10),
+                            {'distances': np.array(distances)})
+    assert key != cache_key('tsp', 'branch_bound', TSPBranchAndBound(),
+                            {'distances': np.array(distances).T[::-1]})
+    assert key != cache_key('tsp', 'branch_bound', TSPBranchAndBound(),
+                            {'distances': np.array(distances)}, {'improve': True})
+
+def test_key_changes_with_strategy_version():
+    instance = {'distances': np.array([[0, 1], [1, 0]])}
+    solver = TSPBranchAndBound()
+    key = cache_key('tsp', 'branch_bound', solver, instance)
+
+    solver.version += 1
+    assert key != cache_key('tsp', 'branch_bound', solver, instance)
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = SolutionCache(max_bytes=60)
+    cache.set('a', {'value': 'x' * 10})
+    cache.set('b', {'value': 'y' * 10})
+    assert cache.get('a') is not None
+    cache.set('c', {'value': 'z' * 10})
+
+    assert cache.get('b') is None
+    assert cache.get('a') == {'value': 'x' * 10}
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 60
+
+def test_persistent_tier_repopulates_memory():
+    backend = caches['default']
+    backend.clear()
+    SolutionCache(backend=backend).set('key', {'total_value': 3.0})
+
+    restarted = SolutionCache(backend=backend)
+    assert restarted.get('key') == {'total_value': 3.0}
+    assert restarted.get('key') == {'total_value': 3.0}
+    assert (restarted.persistent_hits, restarted.hits, restarted.misses) == (1, 1, 0)
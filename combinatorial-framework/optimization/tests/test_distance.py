@@ -0,0 +1,31 @@
+import pytest
+import numpy as np
+from optimization.algorithms.distance import distance_matrix
+
+def test_euclidean_matches_loop_for_any_block_size():
+    coords = np.random.default_rng(1).uniform(0, 100, size=(37, 2))
+    expected = np.zeros((37, 37))
+    for i in range(37):
+        for j in range(37):
+            expected[i, j] = np.sqrt(np.sum((coords[i] - coords[j]) ** 2))
+
+    for block_size in (1, 5, 37, None):
+        np.testing.assert_allclose(distance_matrix(coords, block_size=block_size), expected)
+    np.testing.assert_allclose(distance_matrix(coords, dtype=np.float32), expected, rtol=1e-5)
+
+def test_metrics():
+    coords = [[0, 0], [3, 4], [1.2, 1.2]]
+
+    assert distance_matrix(coords, 'sqeuclidean')[0, 1] == 25
+    assert distance_matrix(coords, 'manhattan')[0, 1] == 7
+    # TSPLIB rounding: sqrt(2.88) = 1.70 is reported as 2
+    assert distance_matrix(coords, 'euc_2d')[0, 2] == 2
+    assert distance_matrix(coords, 'ceil_2d')[1, 2] == np.ceil(np.hypot(1.8, 2.8))
+
+    # Paris -> London is roughly 344 km
+    cities = [[48.8566, 2.3522], [51.5074, -0.1278]]
+    assert distance_matrix(cities, 'haversine')[0, 1] == pytest.approx(344, abs=2)
+
+def test_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        distance_matrix([[0, 0], [1, 1]], 'chebyshev')
@@ -0,0 +1,62 @@
+import os
+import time
+import pytest
+from concurrent.futures import CancelledError
+from optimization.executor import SolverPool, PoolSaturated, SolverTimeout, WorkerCrashed
+
+def square(x):
+    return x * x
+
+def sleep_then_return(seconds, value):
+    time.sleep(seconds)
+    return value
+
+def fail(message):
+    raise ValueError(message)
+
+def crash():
+    os._exit(3)
+
+@pytest.fixture
+def pool():
+    pool = SolverPool(max_workers=1, max_queue=1, default_timeout=10)
+    yield pool
+    pool.shutdown()
+
+def test_run_returns_result_and_reuses_worker(pool):
+    assert pool.run(square, 7) == 49
+    assert pool.run(square, 8) == 64
+    assert len(pool._workers) == 1
+
+def test_solver_exception_is_reraised(pool):
+    with pytest.raises(ValueError, match='bad instance'):
+        pool.run(fail, 'bad instance')
+
+def test_timeout_kills_worker_and_pool_recovers(pool):
+    start = time.monotonic()
+    with pytest.raises(SolverTimeout):
+        pool.run(sleep_then_return, 30, None, timeout=0.5)
+    assert time.monotonic() - start < 10
+    assert pool.run(square, 3) == 9
+
+def test_crashed_worker_is_reported(pool):
+    with pytest.raises(WorkerCrashed):
+        pool.run(crash)
+    assert pool.run(square, 4) == 16
+
+def test_full_queue_rejects_submissions(pool):
+    running = pool.submit(sleep_then_return, 30, None)
+    queued = pool.submit(square, 2)
+    with pytest.raises(PoolSaturated):
+        pool.submit(square, 3)
+    running.cancel()
+    with pytest.raises(CancelledError):
+        running.result()
+    assert queued.result(timeout=30) == 4
+
+def test_requested_limits_are_capped():
+    pool = SolverPool(max_workers=0, max_timeout=60, memory_limit=1024)
+    assert pool.effective_timeout(None) == pool.default_timeout
+    assert pool.effective_timeout(600) == 60
+    assert pool.effective_memory_limit(4096) == 1024
+    assert pool.run(square, 5) == 25
@@ -0,0 +1,96 @@
+import json
+import pickle
+import pytest
+import numpy as np
+from django.test import RequestFactory, TestCase
+from optimization import views
+from optimization.cache import cache_key
+from optimization.executor import SolverPool
+from optimization.instances import InstanceStore, UnknownInstance
+from optimization.algorithms.tsp_solver import TSPDynamic
+
+def request(view, payload, *args, method='post'):
+    factory = RequestFactory()
+    if method == 'post':
+        response = view(factory.post('/', data=json.dumps(payload), content_type='application/json'), *args)
+    else:
+        response = view(getattr(factory, method)('/'), *args)
+    return response.status_code, json.loads(response.content)
+
+@pytest.mark.usefixtures('django_db_setup', 'inline_pool', 'fresh_cache')
+class InstanceStoreTests(TestCase):
+    @pytest.fixture(autouse=True)
+    def use_store(self, tmp_path, monkeypatch):
+        self.root = tmp_path
+        self.store = InstanceStore(tmp_path / 'store', max_bytes=10 * 1024 * 1024)
+        monkeypatch.setattr(views, 'get_store', lambda: self.store)
+
+    def test_solve_by_instance_id_matches_inline_data(self):
+        coordinates = np.random.default_rng(0).uniform(0, 100, size=(8, 2)).tolist()
+        status, created = request(views.create_instance, {'problem': 'tsp', 'coordinates': coordinates})
+        assert status == 201
+        # Uploading the same data again reuses the stored instance
+        assert request(views.create_instance, {'problem': 'tsp', 'coordinates': coordinates})[1]['instance_id'] \
+            == created['instance_id']
+
+        for strategy in ('greedy', 'dynamic'):
+            _, stored = request(views.solve_tsp, {'instance_id': created['instance_id'], 'strategy': strategy})
+            _, inline = request(views.solve_tsp, {'coordinates': coordinates, 'strategy': strategy})
+            assert stored['distance'] == pytest.approx(inline['distance'])
+
+    def test_request_fields_override_stored_options(self):
+        _, created = request(views.create_instance, {
+            'problem': 'knapsack', 'weights': [2, 3, 4], 'values': [3, 4, 5], 'capacity': 9})
+
+        _, body = request(views.solve_knapsack, {'instance_id': created['instance_id'], 'capacity': 5,
+                                                 'strategy': 'dynamic'})
+        assert body['total_value'] == 7
+        status, body = request(views.solve_tsp, {'instance_id': created['instance_id']})
+        assert status == 400
+
+    def test_stored_arrays_reach_workers_by_reference(self):
+        distances = np.random.default_rng(1).uniform(1, 10, size=(300, 300))
+        record = self.store.save('tsp', {'distances': distances})
+        _, problem_instance = self.store.open(record.id)
+
+        assert len(pickle.dumps(problem_instance)) < 1024
+        small = self.store.save('tsp', {'distances': distances[:9, :9].copy()})
+        _, small_instance = self.store.open(small.id)
+        pool = SolverPool(max_workers=1)
+        try:
+            solution, _, valid, _ = pool.run(views._run_tsp, TSPDynamic(), small_instance, False)
+        finally:
+            pool.shutdown()
+        assert valid
+        assert solution['distance'] == pytest.approx(
+            TSPDynamic().solve({'distances': distances[:9, :9]})['distance'])
+
+    def test_stored_instances_are_cache_keyed_by_record(self):
+        distances = np.random.default_rng(2).uniform(1, 10, size=(50, 50))
+        record = self.store.save('tsp', {'distances': distances})
+        key = lambda problem_instance: cache_key('tsp', 'greedy', TSPDynamic(), problem_instance)
+
+        stored = key(views._parse_tsp({'instance_id': str(record.id)}))
+        assert stored == key(views._parse_tsp({'instance_id': str(record.id)}))
+        # The stored file is named in the key in place of its data
+        assert stored != key({'distances': distances})
+
+    def test_least_recently_used_instances_are_evicted(self):
+        root = self.root / 'small'
+        store = InstanceStore(root, max_bytes=2 * 8000)
+        first, second = (store.save('knapsack', {'weights': np.full(500, float(i)), 'values': np.ones(500),
+                                                 'capacity': 1.0}) for i in (1, 2))
+        store.open(first.id)
+        store.save('knapsack', {'weights': np.full(500, 3.0), 'values': np.ones(500), 'capacity': 1.0})
+
+        store.get(first.id)
+        with pytest.raises(UnknownInstance):
+            store.get(second.id)
+        assert not (root / str(second.id)).exists()
+        assert store.total_bytes() <= store.max_bytes
+
+    def test_unknown_and_deleted_instances_are_not_found(self):
+        assert request(views.instance_detail, None, 'not-a-uuid', method='get')[0] == 404
+        _, created = request(views.create_instance, {'problem': 'tsp', 'distances': [[0, 1], [1, 0]]})
+        assert request(views.instance_detail, None, created['instance_id'], method='delete')[0] == 200
+        assert request(views.instance_detail, None, created['instance_id'], method='get')[0] == 404
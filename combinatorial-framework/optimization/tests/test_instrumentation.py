@@ -0,0 +1,76 @@
+import json
+import pytest
+import numpy as np
+from django.test import RequestFactory
+from optimization import views
+from optimization.algorithms.instrumentation import Instrumentation
+from optimization.algorithms.knapsack_solver import KnapsackBranchAndBound
+from optimization.algorithms.tsp_solver import TSPBranchAndBound, TSPTwoOpt
+from optimization.metrics import MetricsRegistry
+
+@pytest.fixture
+def metrics(monkeypatch, inline_pool, fresh_cache):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(views, 'get_metrics', lambda: registry)
+    return registry
+
+def test_nested_phases_and_counters_accumulate():
+    instrumentation = Instrumentation()
+    for _ in range(2):
+        with instrumentation.phase('solve'):
+            with instrumentation.phase('matrix'):
+                pass
+    instrumentation.count(pruned=3)
+    instrumentation.merge({'counters': {'pruned': 2}, 'memory': {'peak_rss_bytes': 10}})
+
+    assert set(instrumentation.phases) == {'solve', 'solve/matrix'}
+    assert instrumentation.phases['solve'] >= instrumentation.phases['solve/matrix']
+    assert instrumentation.counters == {'pruned': 5}
+    assert instrumentation.to_dict()['memory'] == {'peak_rss_bytes': 10}
+
+def test_strategies_without_instrumentation_still_solve():
+    points = np.random.default_rng(0).random((9, 2))
+    distances = np.linalg.norm(points[:, None] - points[None], axis=-1)
+    solver = TSPTwoOpt()
+    assert solver.solve({'distances': distances})['path'][0] == 0
+    with solver.phase('anything'):
+        solver.count(moves=1)
+
+def test_branch_and_bound_reports_search_counters():
+    points = np.random.default_rng(1).random((9, 2))
+    tsp = TSPBranchAndBound()
+    tsp.set_instrumentation(Instrumentation())
+    tsp.solve({'distances': np.linalg.norm(points[:, None] - points[None], axis=-1)})
+    assert tsp.instrumentation.counters['nodes_expanded'] > 0
+    assert 'states_stored' in tsp.instrumentation.counters
+
+    knapsack = KnapsackBranchAndBound()
+    knapsack.set_instrumentation(Instrumentation())
+    knapsack.solve({'values': np.array([6, 10, 12, 7]), 'weights': np.array([1, 2, 3, 2]), 'capacity': 5})
+    assert knapsack.instrumentation.counters['nodes_expanded'] > 0
+
+def test_profiled_response_and_metrics_endpoint(metrics):
+    factory = RequestFactory()
+    body = {'values': [6, 10, 12, 7], 'weights': [1, 2, 3, 2], 'capacity': 5, 'strategy': 'branch_bound'}
+    response = views.solve_knapsack(factory.post('/', data=json.dumps({**body, 'profile': True}),
+                                                 content_type='application/json'))
+    assert response.status_code == 200
+    profile = json.loads(response.content)['profile']
+    assert {'parse', 'cache', 'solve', 'validate', 'serialize'} <= set(profile['phases'])
+    assert profile['counters']['nodes_expanded'] > 0
+    assert profile['memory']['traced_peak_bytes'] > 0
+
+    # Solved again rather than answered from the cache, to observe a second solve
+    plain = views.solve_knapsack(factory.post('/', data=json.dumps({**body, 'cache': False}),
+                                              content_type='application/json'))
+    assert 'profile' not in json.loads(plain.content)
+
+    exposition = views.metrics(factory.get('/metrics')).content.decode()
+    assert 'combi_opt_solves_total{problem="knapsack",strategy="branch_bound",outcome="ok"} 2' in exposition
+    assert ('combi_opt_phase_seconds_count{problem="knapsack",strategy="branch_bound",phase="serialize"} 2'
+            in exposition)
+    assert 'combi_opt_solver_events_total{problem="knapsack",strategy="branch_bound",counter="pruned"}' \
+        in exposition
+    assert 'combi_opt_phase_seconds_bucket{problem="knapsack",strategy="branch_bound",phase="solve",le="+Inf"} 2' \
+        in exposition
+    assert '# TYPE combi_opt_cache_misses gauge' in exposition
@@ -0,0 +1,50 @@
+import time
+import pytest
+from optimization.executor import SolverPool
+from optimization.jobs import JobRegistry
+from optimization.algorithms.tsp_solver import TSPBacktracking
+from optimization.views import _run_tsp
+from optimization.tests.test_tsp_solver import random_distances
+
+@pytest.fixture
+def registry():
+    pool = SolverPool(max_workers=1, max_queue=2)
+    yield JobRegistry(pool)
+    pool.shutdown()
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+def test_backtracking_publishes_improving_incumbents():
+    updates = []
+    solver = TSPBacktracking()
+    solver.set_progress_callback(updates.append)
+    solution = solver.solve({'distances': random_distances(7, seed=2)})
+
+    distances = [update['incumbent']['distance'] for update in updates]
+    assert distances == sorted(distances, reverse=True)
+    assert distances[-1] == pytest.approx(solution['distance'])
+
+def test_job_reports_incumbent_then_completes(registry):
+    problem_instance = {'distances': random_distances(9, seed=1)}
+    job = registry.submit('tsp', 'backtrack', _run_tsp, TSPBacktracking(), problem_instance, False, True,
+                          finalize=lambda outcome: {'distance': outcome[0]['distance']})
+    wait_until(lambda: job.finished_at is not None)
+
+    state = job.to_dict()
+    assert state['status'] == 'completed'
+    assert state['incumbent']['distance'] == pytest.approx(state['result']['distance'])
+    assert registry.get(job.id) is job
+
+def test_cancel_kills_running_job(registry):
+    problem_instance = {'distances': random_distances(16, seed=3, symmetric=False)}
+    job = registry.submit('tsp', 'backtrack', _run_tsp, TSPBacktracking(), problem_instance, False, True)
+    wait_until(lambda: job.status == 'running')
+
+    registry.cancel(job.id)
+    assert job.status == 'cancelled'
+    wait_until(lambda: job.finished_at is not None, timeout=5)
+    assert job.status == 'cancelled' and job.result is None
@@ -0,0 +1,135 @@
+import itertools
+import pytest
+import numpy as np
+from optimization.algorithms.knapsack_solver import KnapsackDynamic, KnapsackBranchAndBound, KnapsackFPTAS, KnapsackCore
+
+def brute_force_value(weights, values, capacity):
+    best = 0
+    for r in range(len(weights) + 1):
+        for combo in itertools.combinations(range(len(weights)), r):
+            if sum(weights[i] for i in combo) <= capacity:
+                best = max(best, sum(values[i] for i in combo))
+    return best
+
+def random_instance(n, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, 30, size=n).astype(float)
+    values = rng.integers(1, 50, size=n).astype(float)
+    return {'weights': weights, 'values': values, 'capacity': float(weights.sum() // 2)}
+
+@pytest.mark.parametrize('solver', [
+    KnapsackDynamic(),
+    KnapsackDynamic(memory_budget=1),  # forces divide-and-conquer reconstruction
+    KnapsackDynamic(method='table'),
+    KnapsackDynamic(method='value'),
+])
+def test_dynamic_methods_are_optimal(solver):
+    for seed in range(5):
+        problem_instance = random_instance(12, seed)
+        solution = solver.solve(problem_instance)
+
+        assert solver.validate_solution(solution, problem_instance)
+        assert solution['total_value'] == brute_force_value(
+            problem_instance['weights'], problem_instance['values'], problem_instance['capacity'])
+
+def test_rolling_rounds_fractional_weights_up():
+    problem_instance = {'weights': [2.5, 2.5], 'values': [3, 4], 'capacity': 5.5}
+    solution = KnapsackDynamic(method='rolling').solve(problem_instance)
+
+    assert solution['selected_items'] == [1]
+    assert solution['total_weight'] <= problem_instance['capacity']
+
+def test_value_indexed_method_is_exact_for_huge_real_weights():
+    rng = np.random.default_rng(6)
+    weights = rng.uniform(1e6, 1e8, size=14)
+    values = rng.integers(1, 40, size=14).astype(float)
+    problem_instance = {'weights': weights, 'values': values, 'capacity': float(weights.sum() / 2)}
+    solver = KnapsackDynamic()
+    solution = solver.solve(problem_instance)
+
+    assert solver.choose_method(problem_instance) == solution['method'] == 'value'
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['total_value'] == brute_force_value(weights, values, problem_instance['capacity'])
+
+@pytest.mark.parametrize('memory_budget', [KnapsackDynamic.DEFAULT_MEMORY_BUDGET, 1])
+def test_bitset_method_solves_subset_sum(memory_budget):
+    weights = np.random.default_rng(7).integers(1, 10**6, size=13).astype(float)
+    problem_instance = {'weights': weights, 'values': weights.copy(), 'capacity': float(weights.sum() // 3)}
+    solver = KnapsackDynamic(memory_budget=memory_budget)
+    solution = solver.solve(problem_instance)
+
+    assert solver.choose_method(problem_instance) == 'bitset'
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['total_value'] == brute_force_value(weights, weights, problem_instance['capacity'])
+    assert solver.table_cells(problem_instance) < len(weights) * problem_instance['capacity'] / 32
+
+def test_rolling_reports_gap_when_weights_are_rounded():
+    assert KnapsackDynamic().solve(random_instance(12))['bound_gap'] == 0
+    solution = KnapsackDynamic(method='table').solve({'weights': [2.5, 2.5], 'values': [3.5, 4.5], 'capacity': 5.5})
+
+    assert solution['selected_items'] == [1]
+    assert solution['bound_gap'] == pytest.approx(1 - 4.5 / 8)
+
+@pytest.mark.parametrize('epsilon', [0.5, 0.2, 0.05])
+def test_fptas_meets_its_guarantee(epsilon):
+    rng = np.random.default_rng(11)
+    for _ in range(10):
+        weights = rng.uniform(0.5, 1e6, size=12)
+        values = rng.uniform(1, 100, size=12)
+        problem_instance = {'weights': weights, 'values': values, 'capacity': float(weights.sum() / 3),
+                            'epsilon': epsilon}
+        solver = KnapsackFPTAS()
+        solution = solver.solve(problem_instance)
+        optimum = brute_force_value(weights, values, problem_instance['capacity'])
+
+        assert solver.validate_solution(solution, problem_instance)
+        assert solution['total_value'] >= (1 - epsilon) * optimum - 1e-9
+        assert optimum * (1 - solution['bound_gap']) <= solution['total_value'] + 1e-9
+        assert solution['bound_gap'] <= epsilon
+
+@pytest.mark.parametrize('core_size', [2, 6, 20])
+def test_core_bound_gap_brackets_optimum(core_size):
+    rng = np.random.default_rng(12)
+    for _ in range(10):
+        weights = rng.uniform(0.5, 20, size=14)
+        values = weights + rng.uniform(0, 5, size=14)
+        problem_instance = {'weights': weights, 'values': values, 'capacity': float(weights.sum() / 2)}
+        solver = KnapsackCore(core_size=core_size)
+        solution = solver.solve(problem_instance)
+        optimum = brute_force_value(weights, values, problem_instance['capacity'])
+
+        assert solver.validate_solution(solution, problem_instance)
+        assert optimum * (1 - solution['bound_gap']) <= solution['total_value'] + 1e-9
+        if core_size >= 14 or solution['bound_gap'] == 0:
+            assert solution['total_value'] == pytest.approx(optimum)
+
+def test_branch_and_bound_is_optimal_with_real_weights():
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        weights = rng.uniform(0.5, 20, size=10)
+        values = rng.uniform(1, 30, size=10)
+        problem_instance = {'weights': weights, 'values': values, 'capacity': float(rng.uniform(10, 60))}
+        solver = KnapsackBranchAndBound()
+        solution = solver.solve(problem_instance)
+
+        assert solver.validate_solution(solution, problem_instance)
+        assert solution['total_value'] == pytest.approx(brute_force_value(weights, values, problem_instance['capacity']))
+        assert solution['bound_gap'] == 0
+
+def test_branch_and_bound_matches_dynamic_on_large_instance():
+    problem_instance = random_instance(500, seed=9)
+    solution = KnapsackBranchAndBound().solve(problem_instance)
+
+    assert solution['total_value'] == KnapsackDynamic().solve(problem_instance)['total_value']
+
+def test_solve_batch_matches_individual_solves():
+    problem_instances = [random_instance(n, seed) for seed, n in enumerate([1, 3, 8, 12, 12, 5])]
+    problem_instances.append({'weights': [2.5, 40.0], 'values': [3.0, 9.0], 'capacity': 2.0})
+    problem_instances.append({'weights': [1.0, 2.0], 'values': [-1.0, 4.0], 'capacity': 3.0})
+
+    batched = KnapsackDynamic.solve_batch(problem_instances)
+
+    for problem_instance, solution in zip(problem_instances, batched):
+        expected = KnapsackDynamic(method='rolling').solve(problem_instance)
+        assert solution['total_value'] == expected['total_value']
+        assert KnapsackDynamic().validate_solution(solution, problem_instance)
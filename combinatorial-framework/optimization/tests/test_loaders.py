@@ -0,0 +1,132 @@
+import json
+import pytest
+import numpy as np
+from django.test import RequestFactory
+from optimization import views
+from optimization.loaders import load_pisinger, load_tsplib, load_tsplib_tour
+from optimization.payloads import PISINGER, TSPLIB
+
+pytestmark = pytest.mark.usefixtures('inline_pool', 'fresh_cache')
+
+def tsplib_coordinates(coordinates, order, weight_type='EUC_2D'):
+    lines = ['NAME : sample', 'COMMENT : nodes listed out of order', 'TYPE : TSP',
+             f'DIMENSION : {len(coordinates)}', f'EDGE_WEIGHT_TYPE : {weight_type}', 'NODE_COORD_SECTION']
+    lines += [f'{i + 1} {coordinates[i][0]:.6e} {coordinates[i][1]:g}' for i in order]
+    return ('\r\n'.join(lines + ['EOF']) + '\r\n').encode()
+
+def tsplib_explicit(matrix, layout):
+    n = len(matrix)
+    rows, cols = {
+        'FULL_MATRIX': np.indices((n, n)).reshape(2, -1),
+        'UPPER_ROW': np.triu_indices(n, 1),
+        'LOWER_ROW': np.tril_indices(n, -1),
+        'UPPER_DIAG_ROW': np.triu_indices(n),
+        'LOWER_DIAG_ROW': np.tril_indices(n),
+        'UPPER_COL': np.tril_indices(n, -1)[::-1],
+    }[layout]
+    weights = matrix[rows, cols].astype(int)
+    # Split the weights across lines of varying length, as TSPLIB files do
+    lines = [' '.join(map(str, weights[i:i + 7])) for i in range(0, len(weights), 7)]
+    header = ['NAME: explicit', 'TYPE: TSP', f'DIMENSION: {n}', 'EDGE_WEIGHT_TYPE: EXPLICIT',
+              f'EDGE_WEIGHT_FORMAT: {layout}', 'EDGE_WEIGHT_SECTION']
+    return '\n'.join(header + lines + ['DISPLAY_DATA_SECTION', '1 0 0', 'EOF']).encode()
+
+@pytest.mark.parametrize('chunk_size', [16, 1 << 22])
+def test_tsplib_coordinates_load_in_node_order(chunk_size):
+    rng = np.random.default_rng(0)
+    coordinates = rng.integers(0, 1000, size=(300, 2)).astype(float)
+    loaded = load_tsplib(tsplib_coordinates(coordinates, rng.permutation(300)), chunk_size=chunk_size)
+
+    assert loaded['metric'] == 'euc_2d'
+    assert np.array_equal(loaded['coordinates'], coordinates)
+
+@pytest.mark.parametrize('layout', ['FULL_MATRIX', 'UPPER_ROW', 'LOWER_ROW', 'UPPER_DIAG_ROW',
+                                    'LOWER_DIAG_ROW', 'UPPER_COL'])
+def test_tsplib_explicit_layouts(layout):
+    rng = np.random.default_rng(1)
+    matrix = rng.integers(1, 100, size=(9, 9))
+    matrix = np.triu(matrix, 1) + np.triu(matrix, 1).T
+
+    loaded = load_tsplib(tsplib_explicit(matrix, layout), chunk_size=32)
+    assert np.array_equal(loaded['distances'], matrix)
+
+@pytest.mark.parametrize('content, message', [
+    (b'TYPE: TSP\nDIMENSION: 2\nEDGE_WEIGHT_TYPE: EUC_2D\nNODE_COORD_SECTION\n1 0 0\nEOF\n', 'NODE_COORD_SECTION'),
+    (b'TYPE: TSP\nDIMENSION: 2\nEDGE_WEIGHT_TYPE: EUC_2D\nNODE_COORD_SECTION\n1 0 0\n1 3 4\nEOF\n', 'ids'),
+    (b'TYPE: TSP\nDIMENSION: 1\nEDGE_WEIGHT_TYPE: EUC_2D\nNODE_COORD_SECTION\n1 0 0,5\nEOF\n', 'character'),
+    (b'TYPE: TSP\nDIMENSION: 1\nEDGE_WEIGHT_TYPE: GEO\nNODE_COORD_SECTION\n1 0 0\nEOF\n', 'GEO'),
+    (b'TYPE: CVRP\nDIMENSION: 1\n', 'CVRP'),
+])
+def test_malformed_tsplib_is_rejected(content, message):
+    with pytest.raises(ValueError, match=message):
+        load_tsplib(content)
+
+def test_tsplib_tour_is_a_closed_zero_based_path():
+    content = b'NAME : sample.opt.tour\nTYPE : TOUR\nDIMENSION : 5\nTOUR_SECTION\n1\n3\n5 4\n2\n-1\nEOF\n'
+    assert load_tsplib_tour(content).tolist() == [0, 2, 4, 3, 1, 0]
+    with pytest.raises(ValueError):
+        load_tsplib_tour(content.replace(b'5 4', b'5 3'))
+
+PISINGER_FILE = b"""knapPI_1_4_1000_1
+n 4
+c 10
+z 13
+time 0.00
+1,3,2,1
+2,4,3,1
+3,5,4,0
+4,6,5,1
+-----
+
+knapPI_1_4_1000_2
+n 4
+c 5
+z 7
+time 0.00
+1,3,2,1
+2,4,3,1
+3,5,4,0
+4,6,5,0
+-----
+"""
+
+def test_pisinger_benchmark_file_with_several_instances():
+    first, second = load_pisinger(PISINGER_FILE, chunk_size=8)
+
+    assert first['name'] == 'knapPI_1_4_1000_1'
+    assert first['problem_instance']['values'].tolist() == [3, 4, 5, 6]
+    assert first['problem_instance']['weights'].tolist() == [2, 3, 4, 5]
+    assert first['problem_instance']['capacity'] == 10
+    assert first['optimum'] == 13 and first['selected_items'].tolist() == [0, 1, 3]
+    assert second['name'] == 'knapPI_1_4_1000_2'
+    assert second['problem_instance']['capacity'] == 5 and second['optimum'] == 7
+
+def test_pisinger_generator_output():
+    [entry] = load_pisinger(b'3\n 1 10 5\n 2 20 9\n 3 15 6\n12\n')
+
+    assert entry['name'] is None and entry['optimum'] is None
+    assert entry['problem_instance']['values'].tolist() == [10, 20, 15]
+    assert entry['problem_instance']['weights'].tolist() == [5, 9, 6]
+    assert entry['problem_instance']['capacity'] == 12
+
+def test_standard_files_can_be_posted_to_the_solve_views():
+    factory = RequestFactory()
+    coordinates = np.random.default_rng(2).integers(0, 100, size=(8, 2)).astype(float)
+    tsp = views.solve_tsp(factory.post('/?strategy=dynamic', data=tsplib_coordinates(coordinates, range(8)),
+                                       content_type=TSPLIB, HTTP_ACCEPT=TSPLIB))
+    plain = views.solve_tsp(factory.post('/', data=json.dumps({
+        'coordinates': coordinates.tolist(), 'metric': 'euc_2d', 'strategy': 'dynamic'}),
+        content_type='application/json'))
+
+    assert tsp.status_code == plain.status_code == 200
+    assert tsp['Content-Type'] == 'application/json'  # solutions are not sent back as TSPLIB
+    assert json.loads(tsp.content)['distance'] == json.loads(plain.content)['distance']
+
+    knapsack = views.solve_knapsack(factory.post('/?strategy=dynamic&name=knapPI_1_4_1000_2',
+                                                 data=PISINGER_FILE, content_type=PISINGER))
+    assert knapsack.status_code == 200
+    assert json.loads(knapsack.content)['total_value'] == 7
+
+    wrong = views.solve_knapsack(factory.post('/', data=tsplib_coordinates(coordinates, range(8)),
+                                              content_type=TSPLIB))
+    assert wrong.status_code == 400
@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+from optimization.algorithms.distance import distance_matrix
+from optimization.algorithms.local_search import improve_tour
+from optimization.algorithms.tsp_solver import TSPGreedy, TSPTwoOpt
+
+def tour_length(path, distances):
+    return sum(distances[a][b] for a, b in zip(path, path[1:]))
+
+@pytest.mark.parametrize('moves', [('2opt',), ('oropt',), ('2opt', 'oropt')])
+def test_improve_tour_tracks_cost_exactly(moves):
+    rng = np.random.default_rng(7)
+    coords = rng.uniform(0, 100, size=(60, 2))
+    distances = distance_matrix(coords)
+    start = [0] + rng.permutation(np.arange(1, 60)).tolist() + [0]
+
+    result = improve_tour(start, {'distances': distances}, k=6, moves=moves)
+
+    assert result['path'][0] == result['path'][-1] == 0
+    assert sorted(result['path'][:-1]) == list(range(60))
+    assert result['distance'] == pytest.approx(tour_length(result['path'], distances))
+    assert result['distance'] < tour_length(start, distances)
+    assert result['moves'] > 0
+
+def test_two_opt_strategy_beats_greedy_on_coordinates():
+    coords = np.random.default_rng(3).uniform(0, 1000, size=(300, 2))
+    problem_instance = {'distances': distance_matrix(coords), 'coordinates': coords}
+    solver = TSPTwoOpt()
+    solution = solver.solve(problem_instance)
+
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['distance'] < TSPGreedy().solve(problem_instance)['distance']
+    assert solution['distance'] == pytest.approx(tour_length(solution['path'], problem_instance['distances']))
+
+def test_active_cities_limit_where_search_starts():
+    coords = np.random.default_rng(5).uniform(0, 100, size=(200, 2))
+    optimized = TSPTwoOpt().solve({'coordinates': coords})['path']
+    # Break the tour locally: swap two consecutive cities
+    broken = optimized[:]
+    broken[50], broken[51] = broken[51], broken[50]
+    problem_instance = {'coordinates': coords}
+
+    assert improve_tour(broken, problem_instance, active=[])['moves'] == 0
+    repaired = improve_tour(broken, problem_instance, active=broken[49:53])
+    assert repaired['moves'] > 0
+    assert repaired['distance'] <= TSPTwoOpt().solve(problem_instance)['distance'] + 1e-9
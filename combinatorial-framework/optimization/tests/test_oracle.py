@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+from optimization.algorithms import oracle as oracle_module
+from optimization.algorithms.distance import distance_matrix
+from optimization.algorithms.local_search import improve_tour
+from optimization.algorithms.oracle import CoordinateOracle, DenseOracle, NeighborGraphOracle, make_oracle
+from optimization.algorithms.tsp_solver import (
+    TSPGreedy, TSPTwoOpt, TSPDynamic, TSPBacktracking, TSPBranchAndBound, TSPAnytime
+)
+
+def coordinates(n, seed=0):
+    return np.random.default_rng(seed).uniform(0, 100, size=(n, 2))
+
+@pytest.mark.parametrize('metric', ['euclidean', 'manhattan'])
+def test_backends_agree(metric):
+    coords = coordinates(60)
+    dense = DenseOracle(distance_matrix(coords, metric))
+    computed = CoordinateOracle(coords, metric, cache_rows=4)
+    graph = NeighborGraphOracle.from_oracle(computed, k=5)
+
+    pairs = [(0, 1), (5, 17), (59, 3), (8, 8)]
+    for backend in (computed, graph):
+        dist = backend.distance_function()
+        assert [dist(i, j) for i, j in pairs] == pytest.approx([dense.distance_function()(i, j) for i, j in pairs])
+        assert np.allclose(backend.row(7), dense.row(7))
+        assert np.array_equal(backend.neighbors(5), dense.neighbors(5))
+    path = list(range(60)) + [0]
+    assert computed.tour_length(path) == pytest.approx(dense.tour_length(path))
+    assert len(computed._rows) <= 4
+
+def test_graph_without_fallback_only_knows_its_edges():
+    graph = NeighborGraphOracle([[1], [0], [1]], [[2.0], [2.0], [3.0]])
+    dist = graph.distance_function()
+
+    assert (dist(0, 1), dist(1, 2), dist(0, 2)) == (2.0, 3.0, float('inf'))
+    assert graph.row(2).tolist() == [np.inf, 3.0, 0.0]
+
+@pytest.mark.parametrize('solver', [TSPDynamic(), TSPBacktracking(), TSPBranchAndBound(), TSPAnytime()])
+def test_exact_solvers_accept_coordinates(solver):
+    coords = coordinates(9, seed=2)
+    from_coordinates = solver.solve({'coordinates': coords})
+    from_matrix = solver.solve({'distances': distance_matrix(coords)})
+
+    assert solver.validate_solution(from_coordinates, {'coordinates': coords})
+    assert from_coordinates['distance'] == pytest.approx(from_matrix['distance'])
+
+def test_heuristics_never_build_the_matrix(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError('dense matrix requested')
+    monkeypatch.setattr(CoordinateOracle, 'dense', refuse)
+    monkeypatch.setattr(oracle_module, 'distance_matrix', refuse)
+    problem_instance = {'coordinates': coordinates(3000, seed=3)}
+
+    for solver in (TSPTwoOpt(), TSPAnytime(exact_limit=0)):
+        solution = solver.solve(problem_instance)
+        assert solver.validate_solution(solution, problem_instance)
+    # Non-planar points go through the oracle's rows instead of the grid
+    greedy = TSPGreedy().solve({'coordinates': coordinates(500, seed=4), 'metric': 'haversine'})
+    assert len(greedy['path']) == 501
+
+def test_local_search_on_a_candidate_graph():
+    coords = coordinates(200, seed=5)
+    graph = NeighborGraphOracle.from_oracle(make_oracle({'coordinates': coords}), k=10)
+    initial = TSPGreedy().solve({'coordinates': coords})
+
+    improved = improve_tour(initial['path'], {'oracle': graph})
+
+    assert improved['distance'] < initial['distance']
+    assert improved['distance'] == pytest.approx(CoordinateOracle(coords).tour_length(improved['path']))
@@ -0,0 +1,58 @@
+import io
+import json
+import importlib.util
+import pytest
+import numpy as np
+from django.test import RequestFactory
+from optimization import views
+from optimization.payloads import load_npy, NPY, MSGPACK
+
+pytestmark = pytest.mark.usefixtures('inline_pool', 'fresh_cache')
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize('array', [
+    np.arange(12, dtype=np.float32).reshape(3, 4),
+    np.asfortranarray(np.arange(12, dtype='>i8').reshape(4, 3)),
+])
+def test_load_npy_maps_the_buffer(array):
+    payload = npy_bytes(array)
+    loaded = load_npy(payload)
+
+    assert np.array_equal(loaded, array)
+    assert loaded.dtype == array.dtype
+    assert not loaded.flags.writeable  # a view of the request body, not a copy
+
+def test_npy_request_matches_json_request():
+    rng = np.random.default_rng(0)
+    coordinates = rng.uniform(0, 100, size=(8, 2))
+    distances = np.linalg.norm(coordinates[:, None] - coordinates[None], axis=-1)
+    factory = RequestFactory()
+
+    binary = views.solve_tsp(factory.post('/?strategy=dynamic', data=npy_bytes(distances), content_type=NPY,
+                                          HTTP_ACCEPT=NPY))
+    plain = views.solve_tsp(factory.post('/', data=json.dumps({'distances': distances.tolist(),
+                                                                'strategy': 'dynamic'}),
+                                         content_type='application/json'))
+
+    assert binary.status_code == plain.status_code == 200
+    assert binary['Content-Type'] == NPY
+    expected = json.loads(plain.content)
+    assert load_npy(binary.content).tolist() == expected['path']
+    assert json.loads(binary['X-Solution-Distance']) == pytest.approx(expected['distance'])
+
+def test_knapsack_npy_request_is_answered_in_json_by_default():
+    items = np.array([[2, 3, 4, 5], [3, 4, 5, 6]], dtype=np.float64)
+    request = RequestFactory().post('/?capacity=5&strategy=dynamic', data=npy_bytes(items), content_type=NPY)
+    response = views.solve_knapsack(request)
+
+    assert response.status_code == 200
+    assert json.loads(response.content)['total_value'] == 7
+
+@pytest.mark.skipif(importlib.util.find_spec('msgpack') is not None, reason='msgpack is installed')
+def test_missing_optional_format_is_unsupported_media_type():
+    request = RequestFactory().post('/', data=b'\x80', content_type=MSGPACK)
+    assert views.solve_tsp(request).status_code == 415
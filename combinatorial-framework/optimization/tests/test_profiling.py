@@ -0,0 +1,62 @@
+import json
+import time
+import pstats
+import pytest
+from django.test import RequestFactory
+from optimization import views
+from optimization.profiling import ProfileCaptures, SamplingProfiler
+
+KNAPSACK = json.dumps({'values': [6, 10, 12, 7], 'weights': [1, 2, 3, 2], 'capacity': 5,
+                       'strategy': 'branch_bound'})
+
+@pytest.fixture
+def captures(monkeypatch, tmp_path, inline_pool, fresh_cache):
+    captures = ProfileCaptures(tmp_path, rate=2, period=60)
+    monkeypatch.setattr(views, 'get_captures', lambda: captures)
+    return captures
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_sampling_profiler_collapses_stacks():
+    with SamplingProfiler(interval=0.001) as sampler:
+        spin(0.05)
+    lines = sampler.collapsed().decode().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    frame = f';spin (test_profiling.py:{spin.__code__.co_firstlineno})'
+    assert any(line.rsplit(' ', 1)[0].endswith(frame) for line in lines)
+
+def test_cprofile_capture_is_saved_and_served(captures):
+    factory = RequestFactory()
+    response = views.solve_knapsack(factory.post('/', data=KNAPSACK, content_type='application/json',
+                                                 HTTP_X_SOLVER_PROFILE='cprofile'))
+    assert response.status_code == 200
+    capture = json.loads(response.content)['capture']
+    assert capture['mode'] == 'cprofile'
+
+    path = captures.path(capture['id'])
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert 'solve' in functions
+
+    download = views.profile_capture(factory.get(capture['url']), capture['id'])
+    assert download.status_code == 200
+    assert b''.join(download.streaming_content) == path.read_bytes()
+    assert views.profile_capture(factory.get('/'), '0' * 32).status_code == 404
+
+def test_captures_are_gated_and_rate_limited(captures):
+    factory = RequestFactory()
+    solve = lambda query: views.solve_knapsack(factory.post(f'/?{query}', data=KNAPSACK,
+                                                            content_type='application/json'))
+    assert solve('capture=perf').status_code == 400
+    assert solve('capture=sampling').status_code == 200
+    # Captured solves bypass the cache even when an answer is cached
+    assert json.loads(solve('capture=sampling').content)['cached'] is False
+
+    limited = solve('capture=sampling')
+    assert limited.status_code == 429 and int(limited['Retry-After']) > 0
+    assert 'capture' not in json.loads(solve('').content)
+
+    captures.enabled = False
+    assert solve('capture=cprofile').status_code == 403
@@ -0,0 +1,82 @@
+import json
+import math
+import pytest
+import numpy as np
+from django.test import RequestFactory
+from optimization import views
+from optimization.registry import DEFAULT_COST_MODELS, GAP_TOLERANCE, STRATEGIES, SolverRegistry, calibrate, load_cost_models
+
+def model(seconds_per_work, gap, slope=1.0):
+    return {'time': [math.log(seconds_per_work), slope], 'memory': None, 'gap': gap, 'samples': 1}
+
+# Exact strategies are slow, greedy is fast and poor, two_opt in between
+MODELS = {'tsp': {
+    'greedy': model(1e-6, 0.2),
+    'two_opt': model(1e-4, 0.05),
+    'dynamic': model(1e-6, 0.0),
+    'branch_bound': model(1e-3, 0.0),
+}}
+
+def coordinates(n):
+    return {'coordinates': np.random.default_rng(n).random((n, 2)), 'metric': 'euclidean'}
+
+def test_calibration_recovers_power_laws():
+    results = [{'problem': 'tsp', 'strategy': 'greedy', 'log_work': math.log(n), 'runtime': 2e-6 * n ** 1.5,
+                'peak_memory': 64 * n, 'gap': 0.1, 'valid': True} for n in (10, 100, 1000)]
+    results.append({**results[0], 'valid': False, 'runtime': 100.0})
+    fitted = calibrate(results)['tsp']['greedy']
+
+    assert fitted['time'] == pytest.approx([math.log(2e-6), 1.5], abs=1e-4)
+    assert fitted['memory'] == pytest.approx([math.log(64), 1.0], abs=1e-4)
+    assert fitted['gap'] == pytest.approx(0.1) and fitted['samples'] == 3
+
+def test_selection_prefers_quality_within_budget():
+    registry = SolverRegistry(models=MODELS)
+    small, large = coordinates(10), coordinates(60)
+
+    # Held-Karp: 2^9 * 81 states at 1e-6 s, well in budget and exact
+    assert registry.select('tsp', small, time_budget=10)[0] == 'dynamic'
+    # Exact strategies are unsuitable for 60 cities; two_opt beats greedy on quality
+    assert registry.select('tsp', large, time_budget=10)[0] == 'two_opt'
+    # With too little time for two_opt (counting the safety factor) greedy is chosen
+    assert registry.select('tsp', large, time_budget=0.01)[0] == 'greedy'
+    # Nothing fits: the fastest prediction wins
+    name, solver, estimate = registry.select('tsp', large, time_budget=1e-9)
+    assert name == 'greedy' and estimate['runtime'] == pytest.approx(60e-6)
+
+def test_exact_strategies_outrank_near_exact_ones():
+    registry = SolverRegistry(models=load_cost_models(DEFAULT_COST_MODELS))
+    weights = np.random.default_rng(0).integers(1, 1000, size=1000).astype(float)
+    instance = {'weights': weights, 'values': weights + 100, 'capacity': weights.sum() / 2}
+
+    # The core heuristic is predicted fastest and within the gap tolerance
+    # of exact, but an exact strategy fits the budget too
+    assert 0 < registry.estimate('knapsack', 'core', instance)['gap'] < GAP_TOLERANCE
+    name, _, estimate = registry.select('knapsack', instance, time_budget=1)
+    assert name in ('dynamic', 'branch_bound') and estimate['gap'] == 0
+
+def test_every_registered_strategy_has_a_shipped_cost_model():
+    models = load_cost_models(DEFAULT_COST_MODELS)
+    for problem, strategies in STRATEGIES.items():
+        assert set(models[problem]) == set(strategies)
+
+@pytest.fixture
+def registry(monkeypatch, inline_pool, fresh_cache):
+    registry = SolverRegistry(models=MODELS)
+    monkeypatch.setattr(views, 'get_solvers', lambda: registry)
+    return registry
+
+def test_auto_strategy_requests(registry):
+    factory = RequestFactory()
+    solve = lambda body: views.solve_tsp(factory.post('/', data=json.dumps(body), content_type='application/json'))
+    points = coordinates(8)['coordinates'].tolist()
+
+    exact = solve({'coordinates': points, 'strategy': 'auto'})
+    assert exact.status_code == 200
+    assert json.loads(exact.content)['strategy'] == 'dynamic'
+
+    hurried = solve({'coordinates': points, 'strategy': 'auto', 'time_budget': 1e-4})
+    assert json.loads(hurried.content)['strategy'] == 'greedy'
+
+    assert solve({'coordinates': points, 'strategy': 'auto', 'time_budget': 0}).status_code == 400
+    assert solve({'coordinates': points, 'strategy': 'simulated_annealing'}).status_code == 400
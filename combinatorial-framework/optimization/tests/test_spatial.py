@@ -0,0 +1,28 @@
+import numpy as np
+from optimization.algorithms.spatial import GridIndex, karp_partition
+
+def test_grid_nearest_matches_brute_force_while_deleting():
+    rng = np.random.default_rng(11)
+    coords = rng.uniform(0, 50, size=(400, 2))
+    index = GridIndex(coords)
+    alive = np.ones(len(coords), dtype=bool)
+
+    for i in rng.permutation(len(coords))[:390]:
+        query = rng.uniform(-10, 60, size=2)
+        expected = np.min(np.hypot(*(coords[alive] - query).T))
+        found = index.nearest(*query)
+        assert np.hypot(*(coords[found] - query)) == expected
+        index.remove(int(i))
+        alive[i] = False
+
+    assert index.size == 10
+    assert sorted(index.nearest(*coords[j]) for j in np.flatnonzero(alive)) == sorted(np.flatnonzero(alive))
+
+def test_karp_partition_covers_points_with_bounded_cells():
+    coords = np.random.default_rng(2).uniform(0, 100, size=(1000, 2))
+    cells = karp_partition(coords, 70)
+
+    assert sorted(np.concatenate(cells).tolist()) == list(range(1000))
+    assert all(35 <= len(cell) <= 70 for cell in cells)
+    # Cells are compact: far smaller than the whole square
+    assert max(np.ptp(coords[cell], axis=0).max() for cell in cells) < 50
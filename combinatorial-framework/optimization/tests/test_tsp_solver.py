@@ -0,0 +1,103 @@
+import itertools
+import pytest
+import numpy as np
+from optimization.algorithms.distance import distance_matrix
+from optimization.algorithms.tsp_solver import (
+    TSPGreedy, TSPTwoOpt, TSPDynamic, TSPBranchAndBound, TSPAnytime, TSPDivideAndConquer
+)
+
+def brute_force_distance(distances):
+    n = len(distances)
+    return min(
+        sum(distances[a][b] for a, b in zip((0,) + perm, perm + (0,)))
+        for perm in itertools.permutations(range(1, n))
+    )
+
+def random_distances(n, seed=0, symmetric=True):
+    rng = np.random.default_rng(seed)
+    distances = rng.uniform(1, 100, size=(n, n))
+    if symmetric:
+        distances = (distances + distances.T) / 2
+    np.fill_diagonal(distances, 0)
+    return distances
+
+@pytest.mark.parametrize('metric', ['euclidean', 'manhattan', 'haversine'])
+def test_greedy_from_coordinates_matches_matrix_greedy(metric):
+    coords = np.random.default_rng(4).uniform(0, 80, size=(150, 2))
+    from_coordinates = TSPGreedy().solve({'coordinates': coords, 'metric': metric})
+    from_matrix = TSPGreedy().solve({'distances': distance_matrix(coords, metric)})
+
+    assert TSPGreedy().validate_solution(from_coordinates, {'coordinates': coords})
+    assert from_coordinates['path'] == from_matrix['path']
+    assert from_coordinates['distance'] == pytest.approx(from_matrix['distance'])
+
+@pytest.mark.parametrize('n', [2, 3, 5, 8])
+def test_dynamic_matches_brute_force(n):
+    distances = random_distances(n, seed=n, symmetric=False)
+    problem_instance = {'distances': distances}
+    solver = TSPDynamic()
+    solution = solver.solve(problem_instance)
+
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['distance'] == pytest.approx(brute_force_distance(distances))
+
+def test_dynamic_respects_memory_budget():
+    solver = TSPDynamic(memory_budget=1024)
+    assert solver.fits_in_budget(6)
+    assert not solver.fits_in_budget(12)
+    with pytest.raises(MemoryError):
+        solver.solve({'distances': random_distances(12)})
+
+@pytest.mark.parametrize('symmetric', [True, False])
+def test_branch_and_bound_matches_dynamic(symmetric):
+    distances = random_distances(11, seed=3, symmetric=symmetric)
+    problem_instance = {'distances': distances}
+    solver = TSPBranchAndBound()
+    solution = solver.solve(problem_instance)
+
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['distance'] == pytest.approx(TSPDynamic().solve(problem_instance)['distance'])
+    assert solution['bound_gap'] == 0
+    assert solution['nodes_expanded'] > 0
+
+def test_branch_and_bound_reports_gap_when_node_limit_hit():
+    distances = random_distances(14, seed=5, symmetric=False)
+    solution = TSPBranchAndBound(max_nodes=1, ascent_iterations=0).solve({'distances': distances})
+
+    assert solution['nodes_expanded'] == 1
+    assert solution['bound_gap'] > 0
+
+def test_anytime_reports_improving_phases_and_ends_optimal():
+    coords = np.random.default_rng(8).uniform(0, 100, size=(14, 2))
+    updates = []
+    solver = TSPAnytime()
+    solver.set_progress_callback(updates.append)
+    solution = solver.solve({'coordinates': coords})
+
+    assert solver.validate_solution(solution, {'coordinates': coords})
+    assert updates[0]['phase'] == 'greedy'
+    incumbents = [update['incumbent']['distance'] for update in updates if 'incumbent' in update]
+    assert incumbents == sorted(incumbents, reverse=True)
+    assert solution['distance'] == pytest.approx(TSPDynamic().solve({'distances': distance_matrix(coords)})['distance'])
+
+def test_divide_and_conquer_stays_close_to_two_opt():
+    coords = np.random.default_rng(6).uniform(0, 1000, size=(3000, 2))
+    problem_instance = {'coordinates': coords}
+    solver = TSPDivideAndConquer(cluster_size=150)
+    solution = solver.solve(problem_instance)
+
+    assert solver.validate_solution(solution, problem_instance)
+    assert solution['clusters'] > 1
+    assert solution['distance'] == pytest.approx(distance_matrix(coords)[solution['path'][:-1], solution['path'][1:]].sum())
+    assert solution['distance'] < 1.05 * TSPTwoOpt().solve(problem_instance)['distance']
+
+def test_divide_and_conquer_workers_match_serial_solve():
+    coords = np.random.default_rng(7).uniform(0, 100, size=(600, 2))
+    serial = TSPDivideAndConquer(cluster_size=50).solve({'coordinates': coords})
+    parallel = TSPDivideAndConquer(cluster_size=50, workers=2).solve({'coordinates': coords})
+
+    assert parallel['path'] == serial['path']
+
+def test_divide_and_conquer_requires_coordinates():
+    with pytest.raises(ValueError):
+        TSPDivideAndConquer().solve({'distances': random_distances(5)})
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import time
+import pytest
+import numpy as np
+from django.test import RequestFactory
+from optimization import views
+from optimization.algorithms.tsp_solver import TSPGreedy
+from optimization.executor import SolverPool, PoolSaturated
+
+pytestmark = pytest.mark.usefixtures('inline_pool', 'fresh_cache')
+
+def post(view, payload):
+    request = RequestFactory().post('/', data=json.dumps(payload), content_type='application/json')
+    response = view(request)
+    return response.status_code, json.loads(response.content)
+
+def test_compare_tsp_builds_matrix_once(monkeypatch):
+    calls = []
+    build = views.distance_matrix
+    monkeypatch.setattr(views, 'distance_matrix', lambda *a, **kw: calls.append(1) or build(*a, **kw))
+    coordinates = np.random.default_rng(0).uniform(0, 100, size=(9, 2)).tolist()
+
+    status, body = post(views.compare, {
+        'problem': 'tsp',
+        'coordinates': coordinates,
+        'strategies': ['greedy', 'dynamic', 'branch_bound', 'two_opt']
+    })
+
+    assert status == 200
+    assert len(calls) == 1
+    assert [result['strategy'] for result in body['results']] == ['greedy', 'dynamic', 'branch_bound', 'two_opt']
+    dynamic, branch_bound = body['results'][1], body['results'][2]
+    assert dynamic['distance'] == pytest.approx(branch_bound['distance'])
+    assert all(result['distance'] >= dynamic['distance'] - 1e-9 for result in body['results'])
+
+def test_compare_reports_unsuitable_strategy_in_place():
+    status, body = post(views.compare, {
+        'problem': 'knapsack',
+        'weights': list(range(1, 41)),
+        'values': list(range(2, 42)),
+        'capacity': 50,
+        'strategies': ['backtrack', 'dynamic', 'unknown']
+    })
+
+    assert status == 200
+    backtrack, dynamic, unknown = body['results']
+    assert backtrack['status'] == 400 and 'error' in backtrack
+    assert unknown['error'] == 'Invalid strategy'
+    assert dynamic['total_weight'] <= 50
+
+@pytest.mark.parametrize('payload', [
+    {'problem': 'tsp', 'coordinates': [[0, 0], [1, 1]]},
+    {'problem': 'tsp', 'coordinates': [[0, 0], [1, 1]], 'strategies': []},
+    {'problem': 'sat', 'strategies': ['greedy']},
+])
+def test_compare_rejects_malformed_requests(payload):
+    status, body = post(views.compare, payload)
+    assert status == 400
+    assert 'error' in body
+
+def test_only_request_errors_map_to_bad_request(monkeypatch):
+    payload = {'coordinates': [[0, 0], [3, 4], [6, 0]], 'strategy': 'greedy'}
+    assert post(views.solve_tsp, {**payload, 'metric': 'chebyshev'})[0] == 400
+    assert post(views.solve_tsp, {**payload, 'timeout': 'soon'})[0] == 400
+
+    def broken(self, problem_instance):
+        raise ValueError('solver bug')
+    monkeypatch.setattr(TSPGreedy, 'solve', broken)
+    status, body = post(views.solve_tsp, payload)
+    assert status == 500
+    assert 'solver bug' in body['error'] and 'Traceback' in body['error']
+
+def test_repeated_request_is_served_from_cache(fresh_cache):
+    payload = {'weights': [2, 3, 4, 5], 'values': [3, 4, 5, 6], 'capacity': 10, 'strategy': 'dynamic'}
+    first_status, first = post(views.solve_knapsack, payload)
+    # Same data with a different numeric encoding hits the same entry
+    second_status, second = post(views.solve_knapsack, {**payload, 'capacity': 10.0})
+
+    assert first_status == second_status == 200
+    assert (first['cached'], second['cached']) == (False, True)
+    assert second['selected_items'] == first['selected_items']
+    assert (fresh_cache.hits, fresh_cache.misses) == (1, 1)
+
+@pytest.mark.parametrize('weights, values', [
+    ([-1, 2], [100, 3]),
+    ([1, 2], [float('nan'), 3]),
+    ([1, 2], [1, float('inf')]),
+])
+def test_knapsack_rejects_negative_or_non_finite_items(weights, values):
+    status, body = post(views.solve_knapsack, {'weights': weights, 'values': values, 'capacity': 3,
+                                               'strategy': 'dynamic'})
+    assert status == 400
+    assert 'error' in body
+
+def test_approximate_knapsack_strategies_accept_large_real_capacities():
+    rng = np.random.default_rng(3)
+    weights = rng.uniform(1, 1e6, size=20000)
+    payload = {'weights': weights.tolist(), 'values': (weights * rng.uniform(0.5, 1.5, size=20000)).tolist(),
+               'capacity': float(weights.sum() / 4), 'epsilon': 0.05}
+
+    assert post(views.solve_knapsack, {**payload, 'strategy': 'dynamic'})[0] == 400
+    for strategy in ('fptas', 'core'):
+        status, body = post(views.solve_knapsack, {**payload, 'strategy': strategy})
+        assert status == 200
+        assert body['total_weight'] <= payload['capacity']
+        assert 0 <= body['bound_gap'] <= 0.05
+    assert post(views.solve_knapsack, {**payload, 'strategy': 'fptas', 'epsilon': 2})[0] == 400
+
+def test_compare_only_solves_uncached_strategies(inline_pool, monkeypatch):
+    coordinates = [[0, 0], [3, 0], [3, 4], [0, 4], [1, 2]]
+    post(views.solve_tsp, {'coordinates': coordinates, 'strategy': 'dynamic'})
+    submitted = []
+    submit = inline_pool.submit
+    monkeypatch.setattr(inline_pool, 'submit', lambda fn, solver, *a, **kw: submitted.append(solver) or submit(fn, solver, *a, **kw))
+
+    status, body = post(views.compare, {'problem': 'tsp', 'coordinates': coordinates,
+                                        'strategies': ['dynamic', 'greedy']})
+
+    assert status == 200
+    assert [result['cached'] for result in body['results']] == [True, False]
+    assert [type(solver).__name__ for solver in submitted] == ['TSPGreedy']
+
+def test_stream_emits_progress_before_result():
+    coordinates = np.random.default_rng(2).uniform(0, 100, size=(12, 2)).tolist()
+    request = RequestFactory().post('/', data=json.dumps({'problem': 'tsp', 'coordinates': coordinates,
+                                                          'format': 'ndjson'}),
+                                    content_type='application/json')
+
+    async def collect():
+        response = await views.stream_solve(request)
+        return [json.loads(line) async for chunk in response.streaming_content
+                for line in chunk.decode().splitlines()]
+
+    events = asyncio.run(collect())
+    assert [event['type'] for event in events][-1] == 'result'
+    assert events[0]['phase'] == 'greedy'
+    incumbents = [event['incumbent']['distance'] for event in events if 'incumbent' in event]
+    assert incumbents == sorted(incumbents, reverse=True)
+    assert events[-1]['distance'] == pytest.approx(incumbents[-1])
+    assert events[-1]['bound_gap'] == 0
+
+def post_async(view, payload):
+    request = RequestFactory().post('/', data=json.dumps(payload), content_type='application/json')
+    response = asyncio.run(view(request))
+    return response.status_code, json.loads(response.content)
+
+def test_async_views_match_sync_views():
+    payload = {'weights': [4, 3, 2, 5], 'values': [5, 4, 3, 7], 'capacity': 9, 'strategy': 'branch_bound'}
+    assert post_async(views.solve_knapsack_async, payload)[1]['selected_items'] == \
+        post(views.solve_knapsack, {**payload, 'cache': False})[1]['selected_items']
+
+    coordinates = [[0, 0], [3, 0], [3, 4], [0, 4], [1, 2]]
+    status, body = post_async(views.solve_tsp_async, {'coordinates': coordinates, 'strategy': 'dynamic'})
+    assert status == 200 and body['cached'] is False
+    assert post_async(views.solve_tsp_async, {'coordinates': coordinates, 'strategy': 'dynamic'})[1]['cached']
+
+def test_async_view_times_out_and_cancels(monkeypatch):
+    pool = SolverPool(max_workers=1, max_queue=0)
+    monkeypatch.setattr(views, 'get_pool', lambda: pool)
+    distances = np.random.default_rng(0).uniform(1, 100, size=(16, 16)).tolist()
+    try:
+        status, body = post_async(views.solve_tsp_async, {'distances': distances, 'strategy': 'backtrack',
+                                                          'timeout': 0.3})
+        assert status == 504
+        # The cancelled job releases its slot once its worker is killed
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                assert pool.run(abs, -3) == 3
+                break
+            except PoolSaturated:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+    finally:
+        pool.shutdown()
+
+def batch(problem, payload):
+    request = RequestFactory().post('/', data=json.dumps(payload), content_type='application/json')
+    response = views.solve_batch(request, problem)
+    return response.status_code, json.loads(response.content)
+
+def test_batch_keeps_input_order_and_isolates_errors():
+    status, body = batch('knapsack', {
+        'strategy': 'dynamic',
+        'chunk_size': 2,
+        'instances': [
+            {'weights': [2, 3, 4], 'values': [3, 4, 5], 'capacity': 5},
+            {'weights': [1], 'values': [1, 2], 'capacity': 5},
+            {'weights': [5, 4], 'values': [10, 1], 'capacity': 5, 'strategy': 'greedy'},
+            'not an instance',
+            {'weights': [1, 2, 3], 'values': [6, 10, 12], 'capacity': 5},
+        ]
+    })
+
+    assert status == 200
+    first, mismatched, greedy, malformed, last = body['results']
+    assert (first['total_value'], last['total_value']) == (7, 22)
+    assert greedy['strategy'] == 'greedy' and greedy['total_value'] == 10
+    assert mismatched['status'] == malformed['status'] == 400
+    assert (body['succeeded'], body['failed']) == (3, 2)
+
+def test_bad_instance_does_not_fail_the_vectorized_chunk(monkeypatch):
+    good = {'weights': [2, 3, 4], 'values': [3, 4, 5], 'capacity': 5}
+    payload = {'strategy': 'dynamic', 'cache': False,
+               'instances': [good, {'weights': [-1, 2], 'values': [100, 3], 'capacity': 3}, good]}
+    _, body = batch('knapsack', payload)
+    first, bad, last = body['results']
+    assert first['total_value'] == last['total_value'] == 7
+    assert bad['status'] == 400
+
+    # Should the vectorized solve itself fail, the chunk is solved item by item
+    def broken(problem_instances):
+        raise IndexError('vectorized DP failed')
+    monkeypatch.setattr(views.KnapsackDynamic, 'solve_batch', broken)
+    _, body = batch('knapsack', {**payload, 'instances': [good, good]})
+    assert [result['total_value'] for result in body['results']] == [7, 7]
+
+def test_batch_tsp_matches_single_requests():
+    rng = np.random.default_rng(3)
+    instances = [{'coordinates': rng.uniform(0, 100, size=(n, 2)).tolist()} for n in (4, 7, 6)]
+
+    status, body = batch('tsp', {'strategy': 'dynamic', 'instances': instances, 'cache': False})
+
+    assert status == 200
+    for instance, result in zip(instances, body['results']):
+        _, single = post(views.solve_tsp, {**instance, 'strategy': 'dynamic', 'cache': False})
+        assert result['distance'] == pytest.approx(single['distance'])
+
+@pytest.mark.parametrize('payload', [{}, {'instances': []}, {'instances': [{}], 'chunk_size': 0}])
+def test_batch_rejects_malformed_requests(payload):
+    status, body = batch('tsp', payload)
+    assert status == 400
+    assert 'error' in body
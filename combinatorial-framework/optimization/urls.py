@@ -1,10 +1,24 @@
-from django.urls import path
-from . import views
-
-app_name = 'optimization'
-
-urlpatterns = [
-    path('', views.index, name='index'),
-    path('tsp/', views.solve_tsp, name='solve_tsp'),
-    path('knapsack/', views.solve_knapsack, name='solve_knapsack'),
+from django.urls import path
+from . import views
+
+app_name = 'optimization'
+
+urlpatterns = [
+    path('', views.index, name='index'),
+    path('tsp/', views.solve_tsp, name='solve_tsp'),
+    path('knapsack/', views.solve_knapsack, name='solve_knapsack'),
+    # Async variants for ASGI servers (combi_opt.asgi)
+    path('async/tsp/', views.solve_tsp_async, name='solve_tsp_async'),
+    path('async/knapsack/', views.solve_knapsack_async, name='solve_knapsack_async'),
+    path('batch/tsp/', views.solve_batch, {'problem': 'tsp'}, name='solve_tsp_batch'),
+    path('batch/knapsack/', views.solve_batch, {'problem': 'knapsack'}, name='solve_knapsack_batch'),
+    path('compare/', views.compare, name='compare'),
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
+    path('metrics', views.metrics, name='metrics'),
+    path('profiles/<str:capture_id>/', views.profile_capture, name='profile_capture'),
+    path('instances/', views.create_instance, name='create_instance'),
+    path('instances/<str:instance_id>/', views.instance_detail, name='instance_detail'),
+    path('jobs/', views.create_job, name='create_job'),
+    path('jobs/<str:job_id>/', views.job_detail, name='job_detail'),
+    path('stream/', views.stream_solve, name='stream_solve'),
 ]
\ No newline at end of file
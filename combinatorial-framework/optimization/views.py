@@ -1,156 +1,1024 @@
-from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-import json
-import numpy as np
-import time
-import traceback
-
-from .algorithms.tsp_solver import TSPGreedy, TSPDynamic, TSPBacktracking
-from .algorithms.knapsack_solver import KnapsackGreedy, KnapsackDynamic, KnapsackBacktracking
-
-def index(request):
-    """Render the main application page."""
-    return render(request, 'optimization/index.html')
-
-@csrf_exempt
-def solve_tsp(request):
-    """Handle TSP problem solving requests."""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
-    
-    try:
-        data = json.loads(request.body)
-        if 'distances' in data:
-            distances = np.array(data.get('distances', []))
-        elif 'coordinates' in data:
-            coords = np.array(data['coordinates'])
-            n = len(coords)
-            distances = np.zeros((n, n))
-            for i in range(n):
-                for j in range(n):
-                    distances[i, j] = np.sqrt(np.sum((coords[i] - coords[j]) ** 2))
-        else:
-            return JsonResponse({'error': 'Either distance matrix or coordinates are required'}, status=400)
-        
-        strategy = data.get('strategy', 'greedy')
-        
-        if distances.size == 0:
-            return JsonResponse({'error': 'Invalid input data'}, status=400)
-        
-        problem_instance = {'distances': distances}
-        
-        # Time the solution
-        start_time = time.time()
-        
-        if strategy == 'greedy':
-            solver = TSPGreedy()
-        elif strategy == 'dynamic':
-            if len(distances) > 15:  # Dynamic programming is exponential
-                return JsonResponse({
-                    'error': 'Dynamic programming strategy is not suitable for problems with more than 15 cities'
-                }, status=400)
-            solver = TSPDynamic()
-        elif strategy == 'backtrack':
-            if len(distances) > 20:  # Backtracking is factorial time
-                return JsonResponse({
-                    'error': 'Backtracking strategy is not suitable for problems with more than 20 cities'
-                }, status=400)
-            solver = TSPBacktracking()
-        else:
-            return JsonResponse({'error': 'Invalid strategy'}, status=400)
-        
-        try:
-            solution = solver.solve(problem_instance)
-            runtime = time.time() - start_time
-            
-            if not solver.validate_solution(solution, problem_instance):
-                return JsonResponse({'error': 'Invalid solution produced'}, status=500)
-            
-            return JsonResponse({
-                'path': solution['path'],
-                'distance': float(solution['distance']),
-                'runtime': runtime,
-                'strategy': strategy
-            })
-        except MemoryError:
-            return JsonResponse({
-                'error': 'Problem too large for selected strategy'
-            }, status=400)
-        except Exception as e:
-            return JsonResponse({
-                'error': f'Solver error: {str(e)}\n{traceback.format_exc()}'
-            }, status=500)
-            
-    except Exception as e:
-        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
-
-@csrf_exempt
-def solve_knapsack(request):
-    """Handle Knapsack problem solving requests."""
-    if request.method != 'POST':
-        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
-    
-    try:
-        data = json.loads(request.body)
-        weights = np.array(data.get('weights', []), dtype=float)
-        values = np.array(data.get('values', []), dtype=float)
-        capacity = float(data.get('capacity', 0))
-        strategy = data.get('strategy', 'greedy')
-        
-        if len(weights) == 0 or len(values) == 0 or capacity <= 0:
-            return JsonResponse({'error': 'Valid weights, values, and capacity are required'}, status=400)
-        
-        if len(weights) != len(values):
-            return JsonResponse({'error': 'Number of weights must match number of values'}, status=400)
-        
-        problem_instance = {
-            'weights': weights,
-            'values': values,
-            'capacity': capacity
-        }
-        
-        start_time = time.time()
-        
-        if strategy == 'greedy':
-            solver = KnapsackGreedy()
-        elif strategy == 'dynamic':
-            if len(weights) > 1000 or capacity > 10000:  # Limit problem size for dynamic programming
-                return JsonResponse({
-                    'error': 'Dynamic programming strategy is not suitable for large problems'
-                }, status=400)
-            solver = KnapsackDynamic()
-        elif strategy == 'backtrack':
-            if len(weights) > 30:  # Backtracking is exponential
-                return JsonResponse({
-                    'error': 'Backtracking strategy is not suitable for problems with more than 30 items'
-                }, status=400)
-            solver = KnapsackBacktracking()
-        else:
-            return JsonResponse({'error': 'Invalid strategy'}, status=400)
-        
-        try:
-            solution = solver.solve(problem_instance)
-            runtime = time.time() - start_time
-            
-            if not solver.validate_solution(solution, problem_instance):
-                return JsonResponse({'error': 'Invalid solution produced'}, status=500)
-            
-            return JsonResponse({
-                'selected_items': solution['selected_items'],
-                'total_value': float(solution['total_value']),
-                'total_weight': float(solution['total_weight']),
-                'runtime': runtime,
-                'strategy': strategy
-            })
-        except MemoryError:
-            return JsonResponse({
-                'error': 'Problem too large for selected strategy'
-            }, status=400)
-        except Exception as e:
-            return JsonResponse({
-                'error': f'Solver error: {str(e)}\n{traceback.format_exc()}'
-            }, status=500)
-            
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=400)
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.shortcuts import render
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+import asyncio
+import json
+import math
+import numpy as np
+import queue
+import time
+import traceback
+
+from .algorithms.tsp_solver import num_cities
+from .algorithms.local_search import improve_tour
+from .algorithms.instrumentation import Instrumentation
+from .algorithms.knapsack_solver import KnapsackDynamic
+from .algorithms.distance import distance_matrix, METRICS
+from .cache import cache_key, get_cache
+from .executor import (
+    get_pool, publish_progress, PoolSaturated, SolverTimeout, WorkerCrashed, RemoteTraceback
+)
+from .instances import get_store, UnknownInstance
+from .jobs import get_registry, FAILED
+from .metrics import get_metrics
+from .profiling import CaptureRejected, get_captures, run_captured
+from .registry import STRATEGIES, get_solvers, UnsuitableStrategy
+from .payloads import decode_request, encode_response, response_format, UnsupportedMediaType, JSON
+from .streaming import ProgressStream, encode_event, FORMATS, CONTENT_TYPES
+
+# TSP strategies that never need the n x n distance matrix
+COORDINATE_STRATEGIES = tuple(name for name, strategy in STRATEGIES['tsp'].items() if strategy.coordinates)
+
+# TSP strategies that end with local search themselves, so 'improve' is moot
+LOCAL_SEARCH_STRATEGIES = tuple(name for name, strategy in STRATEGIES['tsp'].items() if strategy.local_search)
+
+# Seconds a client is asked to wait when the solver pool is saturated
+RETRY_AFTER = 5
+
+# Async views enforce the time limit with asyncio.wait_for and cancel the
+# job themselves; the pool's own limit is this much later, as a backstop
+ASYNC_TIMEOUT_GRACE = 1.0
+
+class InvalidRequest(ValueError):
+    """Raised when request data is malformed or out of range (answered with 400)."""
+
+class InvalidSolution(Exception):
+    """Raised when a solver returns a solution that fails validation."""
+
+def _run_tsp(solver, problem_instance, improve, progress=False, profile=False):
+    """
+    Solve (and optionally improve) a TSP instance inside a pool worker.
+
+    Returns (solution, runtime, valid, instrumentation), the last being the
+    phase timings, search counters and peak memory of the worker's part;
+    ``profile`` also traces Python allocations, which is slower.
+    """
+    if progress:
+        solver.set_progress_callback(publish_progress)
+    instrumentation = Instrumentation(trace_memory=profile)
+    solver.set_instrumentation(instrumentation)
+    with instrumentation.measure_memory():
+        with instrumentation.phase('solve'):
+            solution = solver.solve(problem_instance)
+        if improve:
+            with instrumentation.phase('improve'):
+                improved = improve_tour(solution['path'], problem_instance)
+            instrumentation.count(moves=improved['moves'])
+            solution = {**solution, 'path': improved['path'], 'distance': improved['distance'],
+                        'initial_distance': solution['distance']}
+        with instrumentation.phase('validate'):
+            valid = solver.validate_solution(solution, problem_instance)
+    runtime = instrumentation.phases['solve'] + instrumentation.phases.get('improve', 0.0)
+    return solution, runtime, valid, instrumentation.to_dict()
+
+def _run_knapsack(solver, problem_instance, progress=False, profile=False):
+    """Solve a knapsack instance inside a pool worker (returns what _run_tsp does)."""
+    if progress:
+        solver.set_progress_callback(publish_progress)
+    instrumentation = Instrumentation(trace_memory=profile)
+    solver.set_instrumentation(instrumentation)
+    with instrumentation.measure_memory():
+        with instrumentation.phase('solve'):
+            solution = solver.solve(problem_instance)
+        with instrumentation.phase('validate'):
+            valid = solver.validate_solution(solution, problem_instance)
+    return solution, instrumentation.phases['solve'], valid, instrumentation.to_dict()
+
+def _run_batch(problem, items):
+    """
+    Solve a chunk of batch items inside a pool worker.
+
+    Items are (strategy, solver, problem_instance, improve) tuples. Small
+    knapsacks solved by dynamic programming are vectorized across the chunk;
+    the rest are solved one by one. Returns one ('ok', outcome) or
+    ('error', exception, traceback) entry per item, so a failing item does
+    not take the chunk down with it.
+    """
+    outcomes = [None] * len(items)
+    if problem == 'knapsack':
+        vectorized = [k for k, (_, solver, problem_instance, _) in enumerate(items)
+                      if type(solver) is KnapsackDynamic and KnapsackDynamic.batchable(problem_instance)
+                      and solver.choose_method(problem_instance) == 'rolling']
+        if vectorized:
+            start_time = time.perf_counter()
+            try:
+                solutions = KnapsackDynamic.solve_batch([items[k][2] for k in vectorized])
+            except Exception:
+                # Solved one by one below, so only the failing items report errors
+                solutions = []
+            runtime = (time.perf_counter() - start_time) / len(vectorized)
+            for k, solution in zip(vectorized, solutions):
+                _, solver, problem_instance, _ = items[k]
+                instrumentation = Instrumentation()
+                instrumentation.phases['solve'] = runtime
+                with instrumentation.phase('validate'):
+                    valid = solver.validate_solution(solution, problem_instance)
+                outcomes[k] = ('ok', (solution, runtime, valid, instrumentation.to_dict()))
+
+    for k, (strategy, solver, problem_instance, improve) in enumerate(items):
+        if outcomes[k] is not None:
+            continue
+        try:
+            if problem == 'tsp':
+                outcome = _run_tsp(solver, _tsp_instance_for(problem_instance, strategy), improve)
+            else:
+                outcome = _run_knapsack(solver, problem_instance)
+            outcomes[k] = ('ok', outcome)
+        except Exception as exc:
+            outcomes[k] = ('error', exc, traceback.format_exc())
+    return outcomes
+
+def _pool_limits(data):
+    """Per-request time and memory limits; the pool caps both."""
+    timeout = data.get('timeout')
+    memory_limit_mb = data.get('memory_limit_mb')
+    try:
+        return {
+            'timeout': float(timeout) if timeout is not None else None,
+            'memory_limit': int(float(memory_limit_mb) * 1024 * 1024) if memory_limit_mb else None
+        }
+    except (TypeError, ValueError):
+        raise InvalidRequest('timeout and memory_limit_mb must be numbers')
+
+def _error_response(message, status):
+    response = JsonResponse({'error': message}, status=status)
+    if status == 503:
+        response['Retry-After'] = str(RETRY_AFTER)
+    return response
+
+def _solver_error(error):
+    """Map an exception raised while solving to an (error message, HTTP status) pair."""
+    if isinstance(error, PoolSaturated):
+        return 'Server is busy, please retry shortly', 503
+    if isinstance(error, SolverTimeout):
+        return str(error), 504
+    if isinstance(error, WorkerCrashed):
+        return str(error), 500
+    if isinstance(error, InvalidSolution):
+        return 'Invalid solution produced', 500
+    if isinstance(error, MemoryError):
+        return 'Problem too large for selected strategy', 400
+    # Only errors in the request itself; a ValueError raised while solving
+    # is a solver bug and reported with its traceback below
+    if isinstance(error, (InvalidRequest, UnsuitableStrategy)):
+        return str(error), 400
+    # Prefer the worker's traceback over the one of the re-raise
+    cause = error.__cause__
+    tb = cause.tb if isinstance(cause, RemoteTraceback) else traceback.format_exc()
+    return f'Solver error: {str(error)}\n{tb}', 500
+
+def _with_stored_instance(data, problem):
+    """
+    Fill in the stored instance named by 'instance_id', if any.
+
+    Its arrays stay memory-mapped (the parsers use np.asanyarray to keep
+    them so) and reach pool workers as file references; fields given in
+    the request take precedence over stored ones such as capacity.
+    """
+    if 'instance_id' not in data:
+        return data
+    stored_problem, problem_instance = get_store().open(data['instance_id'])
+    if stored_problem != problem:
+        raise InvalidRequest(f"Instance {data['instance_id']} is a {stored_problem} instance")
+    return {**problem_instance, **data}
+
+def _parse_tsp(data):
+    """Build a TSP problem instance from request data."""
+    data = _with_stored_instance(data, 'tsp')
+    if 'distances' in data:
+        problem_instance = {'distances': np.asanyarray(data.get('distances', []))}
+    elif 'coordinates' in data:
+        problem_instance = {
+            'coordinates': np.asanyarray(data['coordinates'], dtype=float),
+            'metric': data.get('metric', 'euclidean')
+        }
+    else:
+        raise InvalidRequest('Either distance matrix or coordinates are required')
+
+    if num_cities(problem_instance) == 0:
+        raise InvalidRequest('Invalid input data')
+    # Checked here so that the solvers only ever fail on well-formed input
+    if 'distances' in problem_instance:
+        shape = problem_instance['distances'].shape
+        if len(shape) != 2 or shape[0] != shape[1]:
+            raise InvalidRequest('Distance matrix must be square')
+    else:
+        coordinates, metric = problem_instance['coordinates'], problem_instance['metric']
+        if coordinates.ndim != 2:
+            raise InvalidRequest('Coordinates must be a 2-D array of points')
+        if metric not in METRICS:
+            raise InvalidRequest(f'Metric must be one of {", ".join(METRICS)}')
+        if metric in ('haversine', 'euc_2d', 'ceil_2d') and coordinates.shape[1] != 2:
+            raise InvalidRequest(f'Metric {metric} requires 2-D points')
+    return problem_instance
+
+def _improve_requested(data, strategy):
+    return bool(data.get('improve')) and strategy not in LOCAL_SEARCH_STRATEGIES
+
+def _tsp_instance_for(problem_instance, strategy):
+    """
+    Greedy and local search work from coordinates directly; the other
+    strategies need the full matrix, which is built at most once.
+    """
+    if strategy in COORDINATE_STRATEGIES or 'distances' in problem_instance:
+        return problem_instance
+    problem_instance['distances'] = distance_matrix(
+        problem_instance['coordinates'], metric=problem_instance['metric'])
+    return problem_instance
+
+def _tsp_response(solution, runtime, strategy):
+    response = {
+        'path': solution['path'],
+        'distance': float(solution['distance']),
+        'runtime': runtime,
+        'strategy': strategy
+    }
+    # Search statistics and the pre-improvement distance, when available
+    for key in ('nodes_expanded', 'bound_gap', 'initial_distance'):
+        if key in solution:
+            response[key] = solution[key]
+    return response
+
+def _parse_knapsack(data):
+    """Build a knapsack problem instance from request data."""
+    data = _with_stored_instance(data, 'knapsack')
+    weights = np.asanyarray(data.get('weights', []), dtype=float)
+    values = np.asanyarray(data.get('values', []), dtype=float)
+    capacity = float(data.get('capacity', 0))
+
+    if len(weights) == 0 or len(values) == 0 or capacity <= 0:
+        raise InvalidRequest('Valid weights, values, and capacity are required')
+
+    if len(weights) != len(values):
+        raise InvalidRequest('Number of weights must match number of values')
+
+    if not (np.isfinite(weights).all() and np.isfinite(values).all() and math.isfinite(capacity)) \
+            or (weights < 0).any() or (values < 0).any():
+        raise InvalidRequest('Weights, values and capacity must be finite and not negative')
+
+    problem_instance = {
+        'weights': weights,
+        'values': values,
+        'capacity': capacity
+    }
+    # Accuracy of the 'fptas' strategy
+    if data.get('epsilon') is not None:
+        problem_instance['epsilon'] = float(data['epsilon'])
+        if not 0 < problem_instance['epsilon'] < 1:
+            raise InvalidRequest('epsilon must be between 0 and 1')
+    return problem_instance
+
+def _knapsack_response(solution, runtime, strategy):
+    response = {
+        'selected_items': solution['selected_items'],
+        'total_value': float(solution['total_value']),
+        'total_weight': float(solution['total_weight']),
+        'runtime': runtime,
+        'strategy': strategy
+    }
+    # Search statistics and optimality bounds reported by the strategies
+    for key in ('method', 'epsilon', 'core_size', 'nodes_expanded', 'bound_gap'):
+        if key in solution:
+            response[key] = solution[key]
+    return response
+
+def _select_strategy(problem, problem_instance, data):
+    """
+    The strategy (and its solver) chosen for 'auto' requests.
+
+    The time budget is the request's 'time_budget' in seconds, or else its
+    time limit; the memory budget is its worker memory limit.
+    """
+    limits = _pool_limits(data)
+    pool = get_pool()
+    time_budget = data.get('time_budget')
+    time_budget = float(time_budget) if time_budget is not None else pool.effective_timeout(limits['timeout'])
+    if time_budget <= 0:
+        raise InvalidRequest('time_budget must be positive')
+    strategy, solver, _ = get_solvers().select(problem, problem_instance, time_budget,
+                                               pool.effective_memory_limit(limits['memory_limit']))
+    return strategy, solver
+
+def _prepare_single(data, default_strategy='greedy'):
+    """
+    Parse a request naming its 'problem' and one 'strategy' (jobs, streams).
+
+    The strategy 'auto' picks one by the instance size and time budget
+    (see registry.py). Returns (problem, strategy, solver,
+    problem_instance, improve).
+    """
+    problem = data.get('problem', 'tsp')
+    strategy = data.get('strategy', default_strategy)
+    if problem == 'tsp':
+        problem_instance = _parse_tsp(data)
+    elif problem == 'knapsack':
+        problem_instance = _parse_knapsack(data)
+    else:
+        raise InvalidRequest('Problem must be either "tsp" or "knapsack"')
+    if strategy == 'auto':
+        strategy, solver = _select_strategy(problem, problem_instance, data)
+    else:
+        solver = get_solvers().create(problem, strategy, problem_instance)
+    improve = _improve_requested(data, strategy) if problem == 'tsp' else False
+    return problem, strategy, solver, problem_instance, improve
+
+def _pool_call(problem, strategy, solver, problem_instance, improve, progress=False, instrumentation=None,
+               profile=False):
+    """
+    The (fn, args) pair that runs a prepared request on the solver pool.
+
+    Building the distance matrix here is timed as the 'matrix' phase of
+    ``instrumentation``, when given.
+    """
+    if problem == 'tsp':
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        with instrumentation.phase('matrix'):
+            problem_instance = _tsp_instance_for(problem_instance, strategy)
+        return _run_tsp, (solver, problem_instance, improve, progress, profile)
+    return _run_knapsack, (solver, problem_instance, progress, profile)
+
+def _cache_lookup(problem, strategy, solver, problem_instance, improve, data):
+    """Cache key of a prepared request and the cached response, if any."""
+    options = {'improve': improve} if problem == 'tsp' else None
+    key = cache_key(problem, strategy, solver, problem_instance, options)
+    return key, get_cache().get(key) if data.get('cache', True) else None
+
+def _finish(problem, strategy, key, outcome, instrumentation=None):
+    """
+    Turn a pool outcome into the response payload, cache it and record its
+    metrics. The worker's phases and counters are merged into
+    ``instrumentation`` (the request's own, when given).
+    """
+    solution, runtime, valid, worker = outcome
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    instrumentation.merge(worker)
+    if not valid:
+        raise InvalidSolution()
+    to_response = _tsp_response if problem == 'tsp' else _knapsack_response
+    response = to_response(solution, runtime, strategy)
+    get_cache().set(key, response)
+    get_metrics().observe_solve(problem, strategy, 'ok', instrumentation.to_dict())
+    return response
+
+def _respond(problem, strategy, payload, data, fmt, instrumentation):
+    """
+    Encode a single-solve response, timed as the 'serialize' phase.
+
+    With 'profile' in the request, the timings, counters and memory peaks
+    of the request are added as a 'profile' field; the payload is then
+    encoded a second time, so the reported serialization is that of the
+    plain response.
+    """
+    with instrumentation.phase('serialize'):
+        response = encode_response(payload, fmt)
+    get_metrics().observe_phase(problem, strategy, 'serialize', instrumentation.phases['serialize'])
+    if data.get('profile'):
+        response = encode_response({**payload, 'profile': instrumentation.to_dict()}, fmt)
+    return response
+
+def _offload(fn):
+    """Wrap blocking work (parsing, hashing, matrix building) to run off the event loop."""
+    return sync_to_async(fn, thread_sensitive=False)
+
+def index(request):
+    """Render the main application page."""
+    return render(request, 'optimization/index.html')
+
+@csrf_exempt
+def solve_tsp(request):
+    """
+    Handle TSP problem solving requests.
+
+    The body is JSON or one of the binary formats of payloads.py, chosen by
+    Content-Type; the solution is returned in that format too when the
+    client accepts it. Sending the X-Solver-Profile header (or the 'capture'
+    query parameter) set to 'cprofile' or 'sampling' profiles the solve,
+    where enabled (see profiling.py), and adds the saved capture's id and
+    url to the response as 'capture'.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    instrumentation = Instrumentation()
+    try:
+        with instrumentation.phase('parse'):
+            data = decode_request(request, 'tsp')
+            prepared = _prepare_single({**data, 'problem': 'tsp'})
+    except UnsupportedMediaType as e:
+        return JsonResponse({'error': str(e)}, status=415)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+    return _solve(prepared, data, response_format(request), instrumentation, _capture_mode(request))
+
+@csrf_exempt
+def solve_knapsack(request):
+    """Handle Knapsack problem solving requests (JSON or binary, as solve_tsp)."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    instrumentation = Instrumentation()
+    try:
+        with instrumentation.phase('parse'):
+            data = decode_request(request, 'knapsack')
+            prepared = _prepare_single({**data, 'problem': 'knapsack'})
+    except UnsupportedMediaType as e:
+        return JsonResponse({'error': str(e)}, status=415)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return _solve(prepared, data, response_format(request), instrumentation, _capture_mode(request))
+
+def _capture_mode(request):
+    """The profiler a solve request asks to be captured with, if any."""
+    mode = request.headers.get('X-Solver-Profile') or request.GET.get('capture')
+    return mode.strip().lower() if mode else None
+
+def _admit_capture(capture, data):
+    """
+    Admit a requested profile capture. Returns the request data to solve
+    with (captured solves bypass the cache, or there would be nothing to
+    profile) and an error response when the capture is refused.
+    """
+    if capture is None:
+        return data, None
+    try:
+        get_captures().admit(capture)
+    except CaptureRejected as e:
+        response = _error_response(str(e), e.status)
+        if e.retry_after is not None:
+            response['Retry-After'] = str(math.ceil(e.retry_after))
+        return data, response
+    return {**data, 'cache': False}, None
+
+def _captured_call(capture, fn, args):
+    """Wrap a pool call so the worker runs it under the capture's profiler."""
+    if capture is None:
+        return fn, args
+    return run_captured, (capture, get_captures().sample_interval, fn) + tuple(args)
+
+def _save_capture(capture, outcome):
+    """Store the profile of a captured pool outcome; returns the bare outcome and the capture's description."""
+    if capture is None:
+        return outcome, None
+    outcome, content = outcome
+    capture_id = get_captures().save(capture, content)
+    return outcome, {'id': capture_id, 'mode': capture,
+                     'url': reverse('optimization:profile_capture', args=[capture_id])}
+
+def _solve(prepared, data, fmt=JSON, instrumentation=None, capture=None):
+    """
+    Answer a prepared single-strategy request from the cache or the pool.
+
+    ``instrumentation`` carries the phases timed before (parsing) and
+    collects the rest of the request's. ``capture`` names the profiler to
+    run the solve under; the response then describes the saved capture.
+    """
+    problem, strategy, solver, problem_instance, improve = prepared
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    data, refused = _admit_capture(capture, data)
+    if refused is not None:
+        return refused
+    with instrumentation.phase('cache'):
+        key, cached = _cache_lookup(problem, strategy, solver, problem_instance, improve, data)
+    if cached is not None:
+        get_metrics().observe_solve(problem, strategy, 'cached', instrumentation.to_dict())
+        return _respond(problem, strategy, {**cached, 'cached': True}, data, fmt, instrumentation)
+
+    try:
+        limits = _pool_limits(data)
+        fn, args = _pool_call(problem, strategy, solver, problem_instance, improve,
+                              instrumentation=instrumentation, profile=bool(data.get('profile')))
+        fn, args = _captured_call(capture, fn, args)
+        outcome, captured = _save_capture(capture, get_pool().run(fn, *args, **limits))
+        response = _finish(problem, strategy, key, outcome, instrumentation)
+    except Exception as e:
+        get_metrics().observe_solve(problem, strategy, 'error', instrumentation.to_dict())
+        return _error_response(*_solver_error(e))
+    if captured is not None:
+        response = {**response, 'capture': captured}
+    return _respond(problem, strategy, {**response, 'cached': False}, data, fmt, instrumentation)
+
+async def _asolve(prepared, data, fmt=JSON, instrumentation=None, capture=None):
+    """Async counterpart of _solve: awaits the pool instead of blocking on it."""
+    problem, strategy, solver, problem_instance, improve = prepared
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    data, refused = _admit_capture(capture, data)
+    if refused is not None:
+        return refused
+    started = time.perf_counter()
+    key, cached = await _offload(_cache_lookup)(problem, strategy, solver, problem_instance, improve, data)
+    instrumentation.phases['cache'] = time.perf_counter() - started
+    if cached is not None:
+        get_metrics().observe_solve(problem, strategy, 'cached', instrumentation.to_dict())
+        return await _offload(_respond)(problem, strategy, {**cached, 'cached': True}, data, fmt,
+                                        instrumentation)
+
+    try:
+        limits = _pool_limits(data)
+        pool = get_pool()
+        timeout = pool.effective_timeout(limits['timeout'])
+        fn, args = await _offload(_pool_call)(problem, strategy, solver, problem_instance, improve,
+                                              instrumentation=instrumentation,
+                                              profile=bool(data.get('profile')))
+        fn, args = _captured_call(capture, fn, args)
+        job = pool.submit(fn, *args, timeout=timeout + ASYNC_TIMEOUT_GRACE, memory_limit=limits['memory_limit'])
+        try:
+            outcome = await asyncio.wait_for(job.asyncio_future(), timeout)
+        except asyncio.TimeoutError:
+            raise SolverTimeout(f'Solver exceeded the {timeout:g} s time limit')
+        finally:
+            # Also runs when the client disconnects and the request task is cancelled
+            if not job.done():
+                job.cancel()
+        outcome, captured = await _offload(_save_capture)(capture, outcome)
+        response = await _offload(_finish)(problem, strategy, key, outcome, instrumentation)
+    except Exception as e:
+        get_metrics().observe_solve(problem, strategy, 'error', instrumentation.to_dict())
+        return _error_response(*_solver_error(e))
+    if captured is not None:
+        response = {**response, 'capture': captured}
+    return await _offload(_respond)(problem, strategy, {**response, 'cached': False}, data, fmt,
+                                    instrumentation)
+
+@csrf_exempt
+async def solve_tsp_async(request):
+    """
+    Async variant of solve_tsp for ASGI deployments.
+
+    Parsing and other blocking preparation run in a thread and the solve is
+    awaited on the pool, so the event loop keeps serving other requests.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    instrumentation = Instrumentation()
+    started = time.perf_counter()
+    try:
+        data = await _offload(decode_request)(request, 'tsp')
+        prepared = await _offload(_prepare_single)({**data, 'problem': 'tsp'})
+    except UnsupportedMediaType as e:
+        return JsonResponse({'error': str(e)}, status=415)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+    instrumentation.phases['parse'] = time.perf_counter() - started
+    return await _asolve(prepared, data, response_format(request), instrumentation, _capture_mode(request))
+
+@csrf_exempt
+async def solve_knapsack_async(request):
+    """Async variant of solve_knapsack for ASGI deployments."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    instrumentation = Instrumentation()
+    started = time.perf_counter()
+    try:
+        data = await _offload(decode_request)(request, 'knapsack')
+        prepared = await _offload(_prepare_single)({**data, 'problem': 'knapsack'})
+    except UnsupportedMediaType as e:
+        return JsonResponse({'error': str(e)}, status=415)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    instrumentation.phases['parse'] = time.perf_counter() - started
+    return await _asolve(prepared, data, response_format(request), instrumentation, _capture_mode(request))
+
+@csrf_exempt
+def compare(request):
+    """
+    Run several strategies on one problem instance.
+
+    The instance is parsed (and for TSP the distance matrix built) once, then
+    every strategy is submitted to the solver pool so they run concurrently.
+    Per-strategy failures are reported in place of that strategy's result.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        problem = data.get('problem', 'tsp')
+        strategies = data.get('strategies')
+        if problem not in ('tsp', 'knapsack'):
+            raise InvalidRequest('Problem must be either "tsp" or "knapsack"')
+        if not isinstance(strategies, list) or not strategies:
+            raise InvalidRequest('A non-empty list of strategies is required')
+        if len(set(strategies)) != len(strategies):
+            raise InvalidRequest('Strategies must not repeat')
+
+        limits = _pool_limits(data)
+        profile = bool(data.get('profile'))
+
+        start_time = time.time()
+        problem_instance = _parse_tsp(data) if problem == 'tsp' else _parse_knapsack(data)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+
+    # Select every solver first so the shared matrix is complete before any
+    # job is handed to the pool
+    results = {}
+    solvers = {}
+    for strategy in strategies:
+        try:
+            solvers[strategy] = get_solvers().create(problem, strategy, problem_instance)
+        except UnsuitableStrategy as e:
+            results[strategy] = {'strategy': strategy, 'error': str(e), 'status': 400}
+
+    # Answer what we can from the cache; only the rest is solved (and only
+    # the rest can make building the distance matrix necessary)
+    cache = get_cache()
+    keys = {}
+    for strategy, solver in list(solvers.items()):
+        options = {'improve': _improve_requested(data, strategy)} if problem == 'tsp' else None
+        keys[strategy] = cache_key(problem, strategy, solver, problem_instance, options)
+        cached = cache.get(keys[strategy]) if data.get('cache', True) else None
+        if cached is not None:
+            results[strategy] = {**cached, 'cached': True}
+            del solvers[strategy]
+
+    if problem == 'tsp':
+        coordinate_instance = dict(problem_instance)
+        for strategy in solvers:
+            _tsp_instance_for(problem_instance, strategy)
+        if 'coordinates' not in coordinate_instance:
+            coordinate_instance = problem_instance
+
+    jobs = {}
+    pool = get_pool()
+    try:
+        for strategy, solver in solvers.items():
+            if problem == 'tsp':
+                instance = coordinate_instance if strategy in COORDINATE_STRATEGIES else problem_instance
+                improve = _improve_requested(data, strategy)
+                jobs[strategy] = pool.submit(_run_tsp, solver, instance, improve, False, profile, **limits)
+            else:
+                jobs[strategy] = pool.submit(_run_knapsack, solver, problem_instance, False, profile, **limits)
+    except PoolSaturated as e:
+        # Partial comparisons are not useful; free the slots we did get
+        for job in jobs.values():
+            job.cancel()
+        return _error_response(*_solver_error(e))
+    preprocessing_time = time.time() - start_time
+
+    to_response = _tsp_response if problem == 'tsp' else _knapsack_response
+    metrics = get_metrics()
+    for strategy, job in jobs.items():
+        try:
+            solution, runtime, valid, instrumentation = job.result()
+        except Exception as e:
+            message, status = _solver_error(e)
+            results[strategy] = {'strategy': strategy, 'error': message, 'status': status}
+            metrics.observe_solve(problem, strategy, 'error')
+            continue
+        if not valid:
+            results[strategy] = {'strategy': strategy, 'error': 'Invalid solution produced', 'status': 500}
+            metrics.observe_solve(problem, strategy, 'error', instrumentation)
+        else:
+            response = to_response(solution, runtime, strategy)
+            cache.set(keys[strategy], response)
+            results[strategy] = {**response, 'cached': False}
+            metrics.observe_solve(problem, strategy, 'ok', instrumentation)
+            if profile:
+                results[strategy]['profile'] = instrumentation
+
+    return JsonResponse({
+        'problem': problem,
+        'results': [results[strategy] for strategy in strategies],
+        'preprocessing_time': preprocessing_time,
+        'runtime': time.time() - start_time
+    })
+
+def _batch_settings():
+    config = getattr(settings, 'SOLVER_BATCH', {})
+    return config.get('MAX_INSTANCES', 10000), config.get('CHUNK_SIZE', 500)
+
+@csrf_exempt
+def solve_batch(request, problem):
+    """
+    Solve a list of independent instances of one problem type.
+
+    'instances' holds objects with the fields of the tsp/ or knapsack/
+    endpoint; 'strategy', 'improve', 'metric' and 'cache' given at the top
+    level apply to every instance that does not set them itself. Instances
+    are split into chunks (at most 'chunk_size' each) that run on the solver
+    pool concurrently; 'timeout' and 'memory_limit_mb' apply per chunk.
+    Results come back in input order, and an instance that cannot be parsed
+    or solved gets an 'error' and 'status' in place of its result.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        instances = data.get('instances')
+        max_instances, max_chunk_size = _batch_settings()
+        if not isinstance(instances, list) or not instances:
+            raise InvalidRequest('A non-empty list of instances is required')
+        if len(instances) > max_instances:
+            raise InvalidRequest(f'At most {max_instances} instances are accepted per batch')
+        chunk_size = int(data.get('chunk_size', max_chunk_size))
+        if chunk_size < 1:
+            raise InvalidRequest('chunk_size must be positive')
+        limits = _pool_limits(data)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+
+    start_time = time.time()
+    defaults = {key: data[key] for key in ('strategy', 'improve', 'metric', 'cache') if key in data}
+    results = [None] * len(instances)
+    pending = []
+    for index, item in enumerate(instances):
+        try:
+            if not isinstance(item, dict):
+                raise InvalidRequest('Each instance must be an object')
+            item = {**defaults, **item, 'problem': problem}
+            _, strategy, solver, problem_instance, improve = _prepare_single(item)
+            key, cached = _cache_lookup(problem, strategy, solver, problem_instance, improve, item)
+        except Exception as e:
+            results[index] = {'error': str(e), 'status': 400}
+            continue
+        if cached is not None:
+            results[index] = {**cached, 'cached': True}
+        else:
+            pending.append((index, key, (strategy, solver, problem_instance, improve)))
+
+    # Spread the work over every worker, but keep chunks small enough that
+    # one slow instance only holds up its own chunk
+    pool = get_pool()
+    if pending:
+        chunk_size = min(chunk_size, math.ceil(len(pending) / max(pool.max_workers, 1)))
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    def fail(chunk, error):
+        message, status = _solver_error(error)
+        for index, _, spec in chunk:
+            results[index] = {'error': message, 'status': status}
+            if spec is not None:
+                get_metrics().observe_solve(problem, spec[0], 'error')
+
+    finished = queue.SimpleQueue()
+    in_flight = {}
+    submitted = 0
+    while submitted < len(chunks) or in_flight:
+        # Keep as many chunks queued as the pool accepts; when it is full,
+        # wait for one of ours to finish before submitting the next
+        while submitted < len(chunks):
+            chunk = chunks[submitted]
+            try:
+                job = pool.submit(_run_batch, problem, [item for _, _, item in chunk], **limits)
+            except PoolSaturated as e:
+                if in_flight:
+                    break
+                if submitted == 0:
+                    return _error_response(*_solver_error(e))
+                for chunk in chunks[submitted:]:
+                    fail(chunk, e)
+                submitted = len(chunks)
+                break
+            in_flight[job] = chunk
+            job.add_done_callback(finished.put)
+            submitted += 1
+        if not in_flight:
+            break
+
+        job = finished.get()
+        chunk = in_flight.pop(job)
+        try:
+            outcomes = job.result()
+        except Exception as e:
+            fail(chunk, e)
+            continue
+        for (index, key, (strategy, _, _, _)), outcome in zip(chunk, outcomes):
+            try:
+                if outcome[0] == 'error':
+                    _, exc, tb = outcome
+                    exc.__cause__ = RemoteTraceback(tb)
+                    raise exc
+                results[index] = {**_finish(problem, strategy, key, outcome[1]), 'cached': False}
+            except Exception as e:
+                fail([(index, key, (strategy,))], e)
+
+    failed = sum(1 for result in results if 'error' in result)
+    return JsonResponse({
+        'problem': problem,
+        'results': results,
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'runtime': time.time() - start_time
+    })
+
+def cache_stats(request):
+    """Report solution cache hit/miss counters and occupancy."""
+    return JsonResponse(get_cache().stats())
+
+def metrics(request):
+    """
+    Solver metrics in the Prometheus text format: solves by outcome, phase
+    duration and peak memory histograms, search counters, and cache gauges.
+    """
+    if not getattr(settings, 'SOLVER_METRICS', {}).get('ENABLED', True):
+        return JsonResponse({'error': 'Metrics are disabled'}, status=404)
+    stats = get_cache().stats()
+    gauges = {
+        'cache_hits': ('Solution cache hits, in process and persistent.',
+                       stats['hits'] + stats['persistent_hits']),
+        'cache_misses': ('Solution cache misses.', stats['misses']),
+        'cache_entries': ('Entries in the in-process solution cache.', stats['entries']),
+        'cache_bytes': ('Size of the in-process solution cache entries.', stats['bytes']),
+    }
+    return HttpResponse(get_metrics().render(gauges), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def profile_capture(request, capture_id):
+    """Download a saved profile capture (.pstats or collapsed stacks)."""
+    captures = get_captures()
+    path = captures.path(capture_id) if captures.enabled else None
+    if path is None:
+        return JsonResponse({'error': 'Unknown capture'}, status=404)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name,
+                        content_type='application/octet-stream')
+
+def _instance_response(record, status=200):
+    return JsonResponse({
+        'instance_id': str(record.id),
+        'problem': record.problem,
+        'arrays': record.arrays,
+        'options': record.options,
+        'size_bytes': record.size_bytes,
+        'created_at': record.created_at.isoformat(),
+        'last_used_at': record.last_used_at.isoformat(),
+        'url': reverse('optimization:instance_detail', args=[record.id]),
+    }, status=status)
+
+@csrf_exempt
+def create_instance(request):
+    """
+    Store a problem instance on the server and return its 'instance_id'.
+
+    The body is what tsp/ or knapsack/ accept (JSON or binary), naming the
+    'problem' in it or in the query string. Solve requests of any endpoint
+    can then send 'instance_id' instead of the data, plus their options.
+    Uploading an instance that is already stored returns the existing id.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    try:
+        problem = request.GET.get('problem', 'tsp')
+        data = decode_request(request, problem)
+        problem = data.get('problem', problem)
+        if problem == 'tsp':
+            problem_instance = _parse_tsp(data)
+        elif problem == 'knapsack':
+            problem_instance = _parse_knapsack(data)
+        else:
+            raise InvalidRequest('Problem must be either "tsp" or "knapsack"')
+        record = get_store().save(problem, problem_instance)
+    except UnsupportedMediaType as e:
+        return JsonResponse({'error': str(e)}, status=415)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+    return _instance_response(record, status=201)
+
+@csrf_exempt
+def instance_detail(request, instance_id):
+    """Describe (GET) or delete (DELETE) a stored instance."""
+    if request.method not in ('GET', 'DELETE'):
+        return JsonResponse({'error': 'Only GET and DELETE methods are supported'}, status=405)
+
+    store = get_store()
+    try:
+        record = store.get(instance_id)
+        if request.method == 'DELETE':
+            store.delete(instance_id)
+    except UnknownInstance as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    return _instance_response(record)
+
+def _job_response(job, status=200):
+    payload = job.to_dict()
+    if payload['status'] == FAILED:
+        payload['error'], payload['error_status'] = _solver_error(job.error)
+    return JsonResponse(payload, status=status)
+
+@csrf_exempt
+def create_job(request):
+    """
+    Start a solve in the background and return its job id at once.
+
+    Takes the same fields as the tsp/ and knapsack/ endpoints plus 'problem'.
+    Poll GET jobs/<id>/ for the status, incumbent, bound and result; DELETE
+    it to cancel.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        problem, strategy, solver, problem_instance, improve = _prepare_single(data)
+        limits = _pool_limits(data)
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+
+    registry = get_registry()
+    key, cached = _cache_lookup(problem, strategy, solver, problem_instance, improve, data)
+
+    def finalize(outcome):
+        return {**_finish(problem, strategy, key, outcome), 'cached': False}
+
+    try:
+        if cached is not None:
+            job = registry.completed(problem, strategy, {**cached, 'cached': True})
+        else:
+            fn, args = _pool_call(problem, strategy, solver, problem_instance, improve, progress=True)
+            job = registry.submit(problem, strategy, fn, *args, finalize=finalize, **limits)
+    except Exception as e:
+        return _error_response(*_solver_error(e))
+
+    payload = job.to_dict()
+    payload['url'] = reverse('optimization:job_detail', args=[job.id])
+    return JsonResponse(payload, status=202)
+
+@csrf_exempt
+def job_detail(request, job_id):
+    """Report (GET) or cancel (DELETE) a background job."""
+    if request.method not in ('GET', 'DELETE'):
+        return JsonResponse({'error': 'Only GET and DELETE methods are supported'}, status=405)
+
+    registry = get_registry()
+    job = registry.cancel(job_id) if request.method == 'DELETE' else registry.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Unknown job'}, status=404)
+    return _job_response(job)
+
+@csrf_exempt
+async def stream_solve(request):
+    """
+    Stream progress events while one strategy solves an instance.
+
+    Takes the same fields as jobs/; 'strategy' defaults to 'anytime' for TSP
+    and 'branch_bound' for knapsack. Emits 'progress' events carrying the
+    incumbents and bounds the solver publishes, then a single 'result' or
+    'error' event. Events are Server-Sent Events unless 'format' is 'ndjson'
+    or the client accepts application/x-ndjson. Closing the connection
+    cancels the solve.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Only POST method is supported'}, status=405)
+
+    try:
+        data = await _offload(json.loads)(request.body)
+        default_strategy = 'anytime' if data.get('problem', 'tsp') == 'tsp' else 'branch_bound'
+        problem, strategy, solver, problem_instance, improve = await _offload(_prepare_single)(
+            data, default_strategy)
+        limits = _pool_limits(data)
+        accepts_ndjson = 'application/x-ndjson' in request.headers.get('Accept', '')
+        fmt = data.get('format') or ('ndjson' if accepts_ndjson else 'sse')
+        if fmt not in FORMATS:
+            raise InvalidRequest(f'Format must be one of {", ".join(FORMATS)}')
+    except Exception as e:
+        return JsonResponse({'error': f'Request error: {str(e)}'}, status=400)
+
+    key, cached = await _offload(_cache_lookup)(problem, strategy, solver, problem_instance, improve, data)
+    events = ProgressStream()
+    handle = None
+
+    if cached is not None:
+        events.put({'type': 'result', **cached, 'cached': True})
+        events.put(None)
+    else:
+        try:
+            fn, args = await _offload(_pool_call)(problem, strategy, solver, problem_instance, improve,
+                                                  progress=True)
+            handle = get_pool().submit(fn, *args, on_progress=lambda progress: events.put(
+                {'type': 'progress', **progress}), **limits)
+        except Exception as e:
+            return _error_response(*_solver_error(e))
+        handle.add_done_callback(lambda _: events.put(None))
+
+    async def stream():
+        try:
+            while (event := await events.get()) is not None:
+                yield encode_event(event, fmt)
+            if handle is None:
+                return
+            try:
+                result = await _offload(_finish)(problem, strategy, key, handle.result())
+            except Exception as e:
+                message, status = _solver_error(e)
+                get_metrics().observe_solve(problem, strategy, 'error')
+                yield encode_event({'type': 'error', 'error': message, 'status': status}, fmt)
+                return
+            yield encode_event({'type': 'result', **result, 'cached': False}, fmt)
+        finally:
+            # Stops the solver when the client disconnects mid-stream
+            if handle is not None and not handle.done():
+                handle.cancel()
+
+    response = StreamingHttpResponse(stream(), content_type=CONTENT_TYPES[fmt])
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response